@@ -0,0 +1,113 @@
+import asyncio
+import math
+import os
+
+from fastapi import HTTPException
+
+# group -> (concurrent limit, queue size, queue-time budget in seconds).
+# The limits add up to well under AnyIO's 40 worker threads, so ungated
+# cheap reads always find a free thread.
+ADMISSION_GROUPS = {
+    "suggestions": (8, 16, 2.0),
+    "reports": (8, 32, 1.0),
+    "bulk": (4, 8, 5.0),
+}
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded wait queue for one route group."""
+
+    def __init__(
+        self, name: str, *, limit: int, queue_size: int, queue_timeout: float
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def _reject(self, detail: str) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(self.queue_timeout)))},
+        )
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked():
+            if self.queued >= self.queue_size:
+                self.rejected_queue_full += 1
+                raise self._reject(f"Too many queued {self.name} requests")
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                self.rejected_timeout += 1
+                raise self._reject(
+                    f"Timed out waiting for a {self.name} slot"
+                ) from None
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+_gates: dict[str, AdmissionGate] = {}
+
+
+def get_admission_gate(group: str) -> AdmissionGate:
+    gate = _gates.get(group)
+    if gate is None:
+        limit, queue_size, queue_timeout = ADMISSION_GROUPS[group]
+        prefix = f"ADMISSION_{group.upper()}"
+        gate = AdmissionGate(
+            group,
+            limit=int(os.environ.get(f"{prefix}_LIMIT", limit)),
+            queue_size=int(os.environ.get(f"{prefix}_QUEUE_SIZE", queue_size)),
+            queue_timeout=float(
+                os.environ.get(f"{prefix}_QUEUE_TIMEOUT_SECONDS", queue_timeout)
+            ),
+        )
+        _gates[group] = gate
+    return gate
+
+
+def admission_stats() -> dict[str, dict[str, int | float]]:
+    return {group: get_admission_gate(group).stats() for group in ADMISSION_GROUPS}
+
+
+def admit(group: str):
+    """Dependency that holds a `group` slot for the lifetime of the request."""
+    if group not in ADMISSION_GROUPS:
+        raise ValueError(f"Unknown admission group: {group}")
+
+    async def dependency():
+        gate = get_admission_gate(group)
+        await gate.acquire()
+        try:
+            yield
+        finally:
+            gate.release()
+
+    return dependency
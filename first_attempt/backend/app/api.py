@@ -1,67 +1,135 @@
-import calendar
-from datetime import date
+import asyncio
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+from datetime import date, timedelta
 from decimal import ROUND_HALF_UP, Decimal
+from tempfile import SpooledTemporaryFile
+from typing import Literal
 from uuid import UUID
 
-import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, func, select
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    case,
+    cast,
+    desc,
+    extract,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
+from app.admission import admit
+from app.cache import content_key, get_review_cache, get_suggestion_cache
+from app.completions import (
+    check_completions,
+    completed_dates,
+    toggle_completion,
+    uncheck_completions,
+)
 from app.db import get_db
-from app.models import Category, Habit, HabitCompletion, Label, Transaction
+from app.export import EXPORT_BATCH_ROWS, EXPORT_COLUMNS, iter_csv, iter_ndjson
+from app.habit_schedule import (
+    Schedule,
+    compile_schedule,
+    days_in_month,
+    encode_bitmap,
+    values_to_mask,
+)
+from app.habit_stats import (
+    current_streak,
+    due_count,
+    record_toggle,
+    refresh_habit_stats,
+)
+from app.ingest import (
+    MAX_REPORTED_ERRORS,
+    import_statement,
+    ingest_transaction_rows,
+)
+from app.jobs import JobsBusy, SuggestionJob, get_suggestion_jobs
+from app.mcp_client import MCPError, get_mcp_client
+from app.models import (
+    Category,
+    Habit,
+    HabitCompletion,
+    HabitOccurrence,
+    HabitStats,
+    Label,
+    SpendingDailyTotal,
+    Transaction,
+)
+from app.occurrences import materialise_occurrences, occurrence_horizon
+from app.rollups import add_to_daily_totals
 from app.schemas import (
     CategoryOut,
+    HabitCalendarEntryOut,
+    HabitCalendarOut,
     HabitCompletionsOut,
     HabitCreate,
+    HabitDueOut,
     HabitForDateOut,
     HabitOut,
+    HabitStatsOut,
+    HabitToggleBulkError,
+    HabitToggleBulkIn,
+    HabitToggleBulkOut,
     HabitToggleIn,
     HabitToggleOut,
     LabelCreate,
     LabelOut,
+    ReviewPeriodOut,
+    ReviewPeriodsOut,
+    ReviewPeriodSuggestionOut,
+    ReviewPeriodSuggestionsOut,
+    SuggestionJobOut,
+    TransactionBulkIn,
+    TransactionBulkOut,
     TransactionCreate,
+    TransactionImportOut,
     TransactionOut,
     WeeklyReviewOut,
     WeeklyReviewSuggestionOut,
 )
+from app.singleflight import get_single_flight
 
 router = APIRouter()
 
-
-def _days_in_month(year: int, month: int) -> int:
-    return calendar.monthrange(year, month)[1]
+TRANSACTIONS_PAGE_SIZE = 100
+TRANSACTIONS_PAGE_SIZE_MAX = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+IMPORT_SPOOL_MAX_MEMORY = 1024 * 1024
+IMPORT_READ_CHUNK_BYTES = 64 * 1024
+REVIEW_PERIODS_MAX_DAYS = 366 * 5
+SUGGESTION_BATCH_SIZE = 100
+SUGGESTION_PAYLOAD_VERSION = 1
+SUGGESTION_JOB_KEEPALIVE_SECONDS = 15.0
+SUGGESTION_JOB_RETRY_AFTER_SECONDS = 1
+HABIT_CALENDAR_MAX_DAYS = 366
 
 
 def _is_habit_due(habit: Habit, target_date: date) -> bool:
-    if target_date < habit.start_date:
-        return False
-    if habit.end_date and target_date > habit.end_date:
-        return False
-    if habit.interval < 1:
-        return False
-
-    if habit.unit == "day":
-        delta_days = (target_date - habit.start_date).days
-        return delta_days % habit.interval == 0
-
-    if habit.unit == "week":
-        delta_days = (target_date - habit.start_date).days
-        return delta_days % (7 * habit.interval) == 0
-
-    if habit.unit == "month":
-        month_diff = (target_date.year - habit.start_date.year) * 12 + (
-            target_date.month - habit.start_date.month
-        )
-        if month_diff % habit.interval != 0:
-            return False
-        due_day = min(
-            habit.start_date.day,
-            _days_in_month(target_date.year, target_date.month),
-        )
-        return target_date.day == due_day
-
-    return False
+    return compile_schedule(Schedule.of(habit)).is_due(target_date)
 
 
 @router.get("/categories", response_model=list[CategoryOut])
@@ -100,16 +168,140 @@ def create_label(
     return label
 
 
+def _encode_transaction_cursor(transaction: Transaction) -> str:
+    raw = f"{transaction.occurred_at.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_transaction_cursor(cursor: str) -> tuple[date, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        occurred_at, transaction_id = raw.split("|", 1)
+        return date.fromisoformat(occurred_at), UUID(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _transactions_query(
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    label_id: UUID | None = None,
+    category_id: UUID | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    after: tuple[date, UUID] | None = None,
+):
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=422,
+            detail="start_date must be on or before end_date",
+        )
+    if (
+        min_amount is not None
+        and max_amount is not None
+        and min_amount > max_amount
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail="min_amount must be less than or equal to max_amount",
+        )
+
+    query = select(Transaction)
+    if start_date is not None:
+        query = query.where(Transaction.occurred_at >= start_date)
+    if end_date is not None:
+        query = query.where(Transaction.occurred_at <= end_date)
+    if label_id is not None:
+        query = query.where(Transaction.label_id == label_id)
+    if category_id is not None:
+        query = query.where(
+            Transaction.label_id.in_(
+                select(Label.id).where(Label.category_id == category_id)
+            )
+        )
+    if min_amount is not None:
+        query = query.where(Transaction.amount >= min_amount)
+    if max_amount is not None:
+        query = query.where(Transaction.amount <= max_amount)
+    if after is not None:
+        query = query.where(tuple_(Transaction.occurred_at, Transaction.id) < after)
+    return query.order_by(Transaction.occurred_at.desc(), Transaction.id.desc())
+
+
 @router.get("/transactions", response_model=list[TransactionOut])
-def list_transactions(db: Session = Depends(get_db)) -> list[TransactionOut]:
-    transactions = (
-        db.execute(select(Transaction).order_by(Transaction.occurred_at.desc()))
-        .scalars()
-        .all()
+def list_transactions(
+    response: Response,
+    limit: int = Query(
+        TRANSACTIONS_PAGE_SIZE, ge=1, le=TRANSACTIONS_PAGE_SIZE_MAX
+    ),
+    cursor: str | None = Query(None, description="Opaque X-Next-Cursor value"),
+    start_date: date | None = Query(None, description="YYYY-MM-DD"),
+    end_date: date | None = Query(None, description="YYYY-MM-DD"),
+    label_id: UUID | None = None,
+    category_id: UUID | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    db: Session = Depends(get_db),
+) -> list[TransactionOut]:
+    after = _decode_transaction_cursor(cursor) if cursor is not None else None
+    query = _transactions_query(
+        start_date=start_date,
+        end_date=end_date,
+        label_id=label_id,
+        category_id=category_id,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        after=after,
     )
+    transactions = db.execute(query.limit(limit + 1)).scalars().all()
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_transaction_cursor(
+            transactions[-1]
+        )
     return transactions
 
 
+@router.get(
+    "/transactions/export",
+    dependencies=[Depends(admit("bulk"))],
+)
+def export_transactions(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    start_date: date | None = Query(None, description="YYYY-MM-DD"),
+    end_date: date | None = Query(None, description="YYYY-MM-DD"),
+    label_id: UUID | None = None,
+    category_id: UUID | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    query = _transactions_query(
+        start_date=start_date,
+        end_date=end_date,
+        label_id=label_id,
+        category_id=category_id,
+        min_amount=min_amount,
+        max_amount=max_amount,
+    ).with_only_columns(*(getattr(Transaction, name) for name in EXPORT_COLUMNS))
+    result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_ROWS))
+    if export_format == "csv":
+        body, media_type = iter_csv(result), "text/csv"
+    else:
+        body, media_type = iter_ndjson(result), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="transactions.{export_format}"'
+            )
+        },
+    )
+
+
 @router.post(
     "/transactions",
     response_model=TransactionOut,
@@ -129,11 +321,95 @@ def create_transaction(
         label_id=payload.label_id,
     )
     db.add(transaction)
+    add_to_daily_totals(
+        db,
+        [(payload.occurred_at, label.id, label.category_id, payload.amount)],
+    )
     db.commit()
+    get_review_cache().invalidate()
     db.refresh(transaction)
     return transaction
 
 
+@router.post(
+    "/transactions/bulk",
+    response_model=TransactionBulkOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit("bulk"))],
+)
+def create_transactions_bulk(
+    payload: TransactionBulkIn,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> TransactionBulkOut:
+    try:
+        inserted, errors = ingest_transaction_rows(db, payload.items)
+        db.commit()
+        if inserted:
+            get_review_cache().invalidate()
+    except DBAPIError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail="Transactions rejected by the database; nothing was inserted",
+        ) from exc
+
+    if inserted == 0:
+        response.status_code = 422 if errors else status.HTTP_200_OK
+    return TransactionBulkOut(
+        inserted=inserted,
+        failed=len(errors),
+        errors=errors[:MAX_REPORTED_ERRORS],
+    )
+
+
+async def _spool_request_body(request: Request) -> SpooledTemporaryFile:
+    # The whole body is read before any response is sent: once a streaming
+    # response starts, Starlette's disconnect listener owns receive().
+    spool = SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        await run_in_threadpool(spool.write, chunk)
+    await run_in_threadpool(spool.seek, 0)
+    return spool
+
+
+def _iter_spooled_chunks(spool: SpooledTemporaryFile) -> Iterator[bytes]:
+    while chunk := spool.read(IMPORT_READ_CHUNK_BYTES):
+        yield chunk
+
+
+def _drain(events: Iterator[TransactionImportOut]) -> TransactionImportOut:
+    result = next(events)
+    for result in events:
+        pass
+    return result
+
+
+@router.post(
+    "/transactions/import",
+    response_model=TransactionImportOut,
+    dependencies=[Depends(admit("bulk"))],
+)
+async def import_transactions(
+    request: Request,
+    source_format: Literal["csv", "ofx"] = Query("csv", alias="format"),
+    progress: bool = Query(False, description="Stream NDJSON progress events"),
+    db: Session = Depends(get_db),
+):
+    spool = await _spool_request_body(request)
+    events = import_statement(db, _iter_spooled_chunks(spool), source_format)
+    if progress:
+        return StreamingResponse(
+            (event.model_dump_json() + "\n" for event in events),
+            media_type="application/x-ndjson",
+            background=BackgroundTask(spool.close),
+        )
+    try:
+        return await run_in_threadpool(_drain, events)
+    finally:
+        spool.close()
+
+
 @router.get("/habits", response_model=list[HabitOut])
 def list_habits(db: Session = Depends(get_db)) -> list[HabitOut]:
     habits = db.execute(select(Habit).order_by(Habit.name)).scalars().all()
@@ -155,38 +431,347 @@ def create_habit(
         end_date=payload.end_date,
         interval=payload.interval,
         unit=payload.unit,
+        weekday_mask=values_to_mask(payload.weekdays),
+        month_day_mask=values_to_mask(payload.month_days, first=1),
+        set_position=payload.set_position,
     )
     db.add(habit)
+    db.flush()
+    materialise_occurrences(db, habit, occurrence_horizon())
     db.commit()
     db.refresh(habit)
     return habit
 
 
+def _completed_habit_ids_query(target_date: date):
+    return select(HabitCompletion.habit_id).where(HabitCompletion.date == target_date)
+
+
 @router.get("/habits/completions", response_model=HabitCompletionsOut)
 def list_habit_completions(
     date: date = Query(..., description="YYYY-MM-DD"),
     db: Session = Depends(get_db),
 ) -> HabitCompletionsOut:
-    completed_ids = (
-        db.execute(select(HabitCompletion.habit_id).where(HabitCompletion.date == date))
-        .scalars()
-        .all()
-    )
+    completed_ids = db.execute(_completed_habit_ids_query(date)).scalars().all()
     return HabitCompletionsOut(date=date, completed_habit_ids=completed_ids)
 
 
+@router.get("/habits/calendar", response_model=HabitCalendarOut)
+def habit_calendar(
+    start_date: date = Query(..., description="YYYY-MM-DD"),
+    end_date: date = Query(..., description="YYYY-MM-DD"),
+    db: Session = Depends(get_db),
+) -> HabitCalendarOut:
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=422,
+            detail="start_date must be on or before end_date",
+        )
+    days = (end_date - start_date).days + 1
+    if days > HABIT_CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range must be at most {HABIT_CALENDAR_MAX_DAYS} days",
+        )
+
+    habits = db.execute(
+        select(Habit)
+        .where(Habit.start_date <= end_date)
+        .where((Habit.end_date.is_(None)) | (Habit.end_date >= start_date))
+        .order_by(Habit.name, Habit.id)
+    ).scalars().all()
+    completed = completed_dates(db, start_date, end_date)
+
+    return HabitCalendarOut(
+        start_date=start_date,
+        end_date=end_date,
+        days=days,
+        habits=[
+            HabitCalendarEntryOut(
+                id=habit.id,
+                name=habit.name,
+                due=encode_bitmap(
+                    (
+                        (due - start_date).days
+                        for due in compile_schedule(Schedule.of(habit)).expand(
+                            start_date, end_date
+                        )
+                    ),
+                    days,
+                ),
+                completed=encode_bitmap(
+                    (
+                        (completed_on - start_date).days
+                        for completed_on in completed.get(habit.id, ())
+                    ),
+                    days,
+                ),
+            )
+            for habit in habits
+        ],
+    )
+
+
+@router.get("/habits/due", response_model=list[HabitDueOut])
+def list_habits_due(
+    start_date: date = Query(..., description="YYYY-MM-DD"),
+    end_date: date = Query(..., description="YYYY-MM-DD"),
+    db: Session = Depends(get_db),
+) -> list[HabitDueOut]:
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=422,
+            detail="start_date must be on or before end_date",
+        )
+    if (end_date - start_date).days + 1 > HABIT_CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range must be at most {HABIT_CALENDAR_MAX_DAYS} days",
+        )
+
+    rows = db.execute(
+        select(
+            HabitOccurrence.due_date,
+            Habit.id,
+            Habit.name,
+            HabitCompletion.id.is_not(None),
+        )
+        .join(Habit, Habit.id == HabitOccurrence.habit_id)
+        .outerjoin(
+            HabitCompletion,
+            and_(
+                HabitCompletion.habit_id == HabitOccurrence.habit_id,
+                HabitCompletion.date == HabitOccurrence.due_date,
+            ),
+        )
+        .where(HabitOccurrence.due_date >= start_date)
+        .where(HabitOccurrence.due_date <= end_date)
+    ).all()
+    due = [
+        HabitDueOut(date=day, id=habit_id, name=name, checked=checked)
+        for day, habit_id, name, checked in rows
+    ]
+
+    # Days past a habit's materialised horizon are computed instead.
+    behind = db.execute(
+        select(Habit)
+        .where(Habit.start_date <= end_date)
+        .where(
+            or_(
+                Habit.occurrences_through.is_(None),
+                Habit.occurrences_through < end_date,
+            )
+        )
+    ).scalars().all()
+    if behind:
+        completed = completed_dates(db, start_date, end_date)
+        for habit in behind:
+            low = start_date
+            if habit.occurrences_through is not None:
+                low = max(low, habit.occurrences_through + timedelta(days=1))
+            checked_days = set(completed.get(habit.id, ()))
+            due.extend(
+                HabitDueOut(
+                    date=day, id=habit.id, name=habit.name, checked=day in checked_days
+                )
+                for day in compile_schedule(Schedule.of(habit)).expand(low, end_date)
+            )
+
+    due.sort(key=lambda item: (item.date, item.name, item.id))
+    return due
+
+
+@router.get("/habits/stats", response_model=list[HabitStatsOut])
+def habit_stats(
+    as_of: date | None = Query(
+        None, alias="date", description="YYYY-MM-DD, defaults to today"
+    ),
+    db: Session = Depends(get_db),
+) -> list[HabitStatsOut]:
+    as_of = as_of or date.today()
+    rows = db.execute(
+        select(Habit, HabitStats)
+        .outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+        .order_by(Habit.name, Habit.id)
+    ).all()
+    missing = [habit for habit, stats in rows if stats is None]
+    if missing:
+        # Counters are created lazily the first time a habit is reported.
+        created = {habit.id: refresh_habit_stats(db, habit) for habit in missing}
+        db.commit()
+        rows = [(habit, stats or created[habit.id]) for habit, stats in rows]
+
+    results = []
+    for habit, stats in rows:
+        due = due_count(habit, as_of)
+        results.append(
+            HabitStatsOut(
+                id=habit.id,
+                name=habit.name,
+                completed=stats.completed_count,
+                due=due,
+                adherence=round(min(stats.completed_count / due, 1.0), 4)
+                if due
+                else 0.0,
+                current_streak=current_streak(habit, stats, as_of),
+                longest_streak=stats.longest_streak,
+            )
+        )
+    return results
+
+
 @router.get("/habits/for-date", response_model=list[HabitForDateOut])
 def list_habits_for_date(
     date: date = Query(..., description="YYYY-MM-DD"),
     db: Session = Depends(get_db),
 ) -> list[HabitForDateOut]:
-    habits = db.execute(select(Habit).order_by(Habit.name)).scalars().all()
-    due_habits = [habit for habit in habits if _is_habit_due(habit, date)]
-    completed_ids = set(
-        db.execute(select(HabitCompletion.habit_id).where(HabitCompletion.date == date))
-        .scalars()
-        .all()
+    return get_single_flight().do(
+        ("habits/for-date", date.isoformat()),
+        lambda: _habits_for_date(db, date),
+    )
+
+
+def _start_weekday(dialect: str):
+    """Weekday of `Habit.start_date` in SQL, 0 = Monday."""
+    if dialect == "postgresql":
+        return cast(extract("isodow", Habit.start_date), Integer) - 1
+    return (cast(func.strftime("%w", Habit.start_date), Integer) + 6) % 7
+
+
+def _weekday_rank(counts: list[int]):
+    """Sum of `counts[k]` over the weekdays `k` set in `Habit.weekday_mask`."""
+    return sum(
+        case((Habit.weekday_mask.op("&")(1 << weekday) != 0, count), else_=0)
+        for weekday, count in enumerate(counts)
+        if count
+    )
+
+
+def _habit_due_predicate(dialect: str, target_date: date):
+    """SQL form of `_is_habit_due` for a fixed `target_date`.
+
+    Everything that depends only on `target_date` (its weekday and how many
+    of each weekday fall before and after it in its month) is computed here,
+    so the optional weekday, month-day and position rules cost a few bit
+    tests per row.
+    """
+    if dialect == "postgresql":
+        elapsed_days = literal(target_date, Date) - Habit.start_date
+    else:
+        elapsed_days = cast(
+            func.julianday(target_date.isoformat()) - func.julianday(Habit.start_date),
+            Integer,
+        )
+    elapsed_months = (target_date.year * 12 + target_date.month) - (
+        extract("year", Habit.start_date) * 12 + extract("month", Habit.start_date)
+    )
+    # Plain monthly habits fall on their start day, clamped to the month's length.
+    month_length = days_in_month(target_date.year, target_date.month)
+    start_day = extract("day", Habit.start_date)
+    if target_date.day == month_length:
+        on_due_day = start_day >= month_length
+    else:
+        on_due_day = start_day == target_date.day
+
+    weekday = target_date.weekday()
+    on_weekday = Habit.weekday_mask.op("&")(1 << weekday) != 0
+    weekday_ok = or_(Habit.weekday_mask.is_(None), on_weekday)
+    month_day_ok = or_(
+        Habit.month_day_mask.is_(None),
+        Habit.month_day_mask.op("&")(1 << (target_date.day - 1)) != 0,
     )
+    # Per weekday, the days of this month up to and from `target_date`.
+    first_weekday = date(target_date.year, target_date.month, 1).weekday()
+    through, remaining = [0] * 7, [0] * 7
+    for day in range(1, month_length + 1):
+        counts = through if day <= target_date.day else remaining
+        counts[(first_weekday + day - 1) % 7] += 1
+    remaining[weekday] += 1
+    position_ok = or_(
+        Habit.set_position.is_(None),
+        Habit.set_position == _weekday_rank(through),
+        Habit.set_position == -_weekday_rank(remaining),
+    )
+
+    return and_(
+        Habit.start_date <= target_date,
+        or_(Habit.end_date.is_(None), Habit.end_date >= target_date),
+        Habit.interval >= 1,
+        or_(
+            and_(Habit.unit == "day", elapsed_days % Habit.interval == 0, weekday_ok),
+            and_(
+                Habit.unit == "week",
+                Habit.weekday_mask.is_(None),
+                elapsed_days % (7 * Habit.interval) == 0,
+            ),
+            and_(
+                Habit.unit == "week",
+                on_weekday,
+                # Whole weeks between the Mondays of the start and target weeks.
+                (elapsed_days + _start_weekday(dialect) - weekday)
+                % (7 * Habit.interval)
+                == 0,
+            ),
+            and_(
+                Habit.unit == "month",
+                elapsed_months % Habit.interval == 0,
+                or_(
+                    and_(
+                        Habit.weekday_mask.is_(None),
+                        Habit.month_day_mask.is_(None),
+                        on_due_day,
+                    ),
+                    and_(
+                        or_(
+                            Habit.weekday_mask.is_not(None),
+                            Habit.month_day_mask.is_not(None),
+                        ),
+                        weekday_ok,
+                        month_day_ok,
+                        position_ok,
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def _habit_due_clause(dialect: str, target_date: date):
+    """Habits due on `target_date`.
+
+    Habits materialised that far are an indexed `habit_occurrences` lookup;
+    the computed predicate only covers days past a habit's horizon.
+    """
+    return or_(
+        and_(
+            Habit.occurrences_through >= target_date,
+            Habit.id.in_(
+                select(HabitOccurrence.habit_id).where(
+                    HabitOccurrence.due_date == target_date
+                )
+            ),
+        ),
+        and_(
+            or_(
+                Habit.occurrences_through.is_(None),
+                Habit.occurrences_through < target_date,
+            ),
+            _habit_due_predicate(dialect, target_date),
+        ),
+    )
+
+
+def _habits_for_date(db: Session, date: date) -> list[HabitForDateOut]:
+    dialect = db.get_bind().dialect.name
+    rows = db.execute(
+        select(Habit, HabitCompletion.id.is_not(None).label("checked"))
+        .outerjoin(
+            HabitCompletion,
+            and_(HabitCompletion.habit_id == Habit.id, HabitCompletion.date == date),
+        )
+        .where(_habit_due_clause(dialect, date))
+        .order_by(Habit.name)
+    ).all()
 
     return [
         HabitForDateOut(
@@ -196,9 +781,12 @@ def list_habits_for_date(
             end_date=habit.end_date,
             interval=habit.interval,
             unit=habit.unit,
-            checked=habit.id in completed_ids,
+            weekdays=habit.weekdays,
+            month_days=habit.month_days,
+            set_position=habit.set_position,
+            checked=checked,
         )
-        for habit in due_habits
+        for habit, checked in rows
     ]
 
 
@@ -208,33 +796,89 @@ def toggle_habit_completion(
     payload: HabitToggleIn,
     db: Session = Depends(get_db),
 ) -> HabitToggleOut:
+    due_clause = _habit_due_clause(db.get_bind().dialect.name, payload.date)
+    toggled = toggle_completion(db, habit_id, payload.date, due_clause)
+    if toggled is not None:
+        record_toggle(db, db.get(Habit, habit_id), payload.date, toggled == "checked")
+        db.commit()
+        return HabitToggleOut(status=toggled)
+
+    # Nothing changed: work out why only on this uncommon path.
     habit = db.get(Habit, habit_id)
     if habit is None:
         raise HTTPException(status_code=404, detail="Habit not found")
-    if not _is_habit_due(habit, payload.date):
+    due = db.execute(select(Habit.id).where(Habit.id == habit_id, due_clause)).first()
+    if due is None:
         raise HTTPException(
             status_code=400,
             detail="Habit not scheduled for this date",
         )
+    # A concurrent toggle inserted the same completion first.
+    return HabitToggleOut(status="checked")
 
-    completion = (
-        db.execute(
-            select(HabitCompletion).where(
-                HabitCompletion.habit_id == habit_id,
-                HabitCompletion.date == payload.date,
-            )
-        )
+
+@router.post("/habits/toggle/bulk", response_model=HabitToggleBulkOut)
+def toggle_habit_completions_bulk(
+    payload: HabitToggleBulkIn,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> HabitToggleBulkOut:
+    # The last change for a (habit, date) pair wins.
+    desired: dict[tuple[UUID, date], tuple[int, bool]] = {}
+    for index, item in enumerate(payload.items):
+        desired[(item.habit_id, item.date)] = (index, item.checked)
+
+    habit_ids = {habit_id for habit_id, _ in desired}
+    habits = {
+        habit.id: habit
+        for habit in db.execute(select(Habit).where(Habit.id.in_(habit_ids)))
         .scalars()
-        .first()
-    )
-    if completion:
-        db.delete(completion)
+        .all()
+    }
+    schedules = {
+        habit_id: compile_schedule(Schedule.of(habit))
+        for habit_id, habit in habits.items()
+    }
+    errors: list[HabitToggleBulkError] = []
+    to_check: list[tuple[UUID, date]] = []
+    to_uncheck: list[tuple[UUID, date]] = []
+    for (habit_id, day), (index, checked) in desired.items():
+        habit = habits.get(habit_id)
+        if habit is None:
+            errors.append(HabitToggleBulkError(index=index, detail="Habit not found"))
+        elif not checked:
+            to_uncheck.append((habit_id, day))
+        elif not schedules[habit_id].is_due(day):
+            errors.append(
+                HabitToggleBulkError(
+                    index=index, detail="Habit not scheduled for this date"
+                )
+            )
+        else:
+            to_check.append((habit_id, day))
+
+    try:
+        checked_count = check_completions(db, to_check)
+        unchecked_count = uncheck_completions(db, to_uncheck)
+        for habit_id in {habit_id for habit_id, _ in to_check + to_uncheck}:
+            refresh_habit_stats(db, habits[habit_id])
         db.commit()
-        return HabitToggleOut(status="unchecked")
+    except DBAPIError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail="Habit changes rejected by the database; nothing was applied",
+        ) from exc
 
-    db.add(HabitCompletion(habit_id=habit_id, date=payload.date))
-    db.commit()
-    return HabitToggleOut(status="checked")
+    if payload.items and len(errors) == len(desired):
+        response.status_code = 422
+    errors.sort(key=lambda error: error.index)
+    return HabitToggleBulkOut(
+        checked=checked_count,
+        unchecked=unchecked_count,
+        failed=len(errors),
+        errors=errors[:MAX_REPORTED_ERRORS],
+    )
 
 
 def _format_amount(value: Decimal | None) -> str:
@@ -242,6 +886,20 @@ def _format_amount(value: Decimal | None) -> str:
     return str(amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
 
 
+def _weekly_review_totals_query(start_date: date, end_date: date):
+    return (
+        select(
+            Category.key.label("category_key"),
+            func.sum(SpendingDailyTotal.total).label("total_amount"),
+        )
+        .join(SpendingDailyTotal, SpendingDailyTotal.category_id == Category.id)
+        .where(SpendingDailyTotal.day >= start_date)
+        .where(SpendingDailyTotal.day <= end_date)
+        .group_by(Category.key)
+        .order_by(desc(func.sum(SpendingDailyTotal.total)))
+    )
+
+
 def _weekly_review_summary(
     db: Session,
     start_date: date,
@@ -253,20 +911,7 @@ def _weekly_review_summary(
             detail="start_date must be on or before end_date",
         )
 
-    total_by_category = (
-        select(
-            Category.key.label("category_key"),
-            func.sum(Transaction.amount).label("total_amount"),
-        )
-        .join(Label, Label.category_id == Category.id)
-        .join(Transaction, Transaction.label_id == Label.id)
-        .where(Transaction.occurred_at >= start_date)
-        .where(Transaction.occurred_at <= end_date)
-        .group_by(Category.key)
-        .order_by(desc(func.sum(Transaction.amount)))
-    )
-
-    rows = db.execute(total_by_category).all()
+    rows = db.execute(_weekly_review_totals_query(start_date, end_date)).all()
     total_amount = sum((row.total_amount or Decimal("0")) for row in rows)
 
     return WeeklyReviewOut(
@@ -283,65 +928,215 @@ def _weekly_review_summary(
     )
 
 
-def _weekly_review_prompt(summary: WeeklyReviewOut) -> str:
-    lines = [f"Total: {summary.total_amount}"]
-    for entry in summary.by_category:
-        lines.append(f"{entry.category_key}: {entry.total_amount}")
-    return "Weekly totals:\\n" + "\\n".join(lines)
+def _cached_weekly_review_summary(
+    db: Session,
+    start_date: date,
+    end_date: date,
+) -> WeeklyReviewOut:
+    cache = get_review_cache()
+    key = f"{start_date.isoformat()}:{end_date.isoformat()}"
+    # Read the generation before the rows: a write committed during the
+    # computation bumps it, and the result is then stored where nobody looks.
+    generation = cache.generation()
+    cached = cache.get(key, generation)
+    if cached is not None:
+        return WeeklyReviewOut.model_validate_json(cached)
+
+    def compute() -> WeeklyReviewOut:
+        summary = _weekly_review_summary(db, start_date, end_date)
+        cache.set(key, summary.model_dump_json(), generation)
+        return summary
+
+    return get_single_flight().do(("reviews/weekly", generation, key), compute)
+
+
+def _period_start(day: date, bucket: str) -> date:
+    if bucket == "month":
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def _next_period_start(day: date, bucket: str) -> date:
+    if bucket == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=7)
+
+
+def _period_bucket_expression(dialect: str, bucket: str):
+    day = SpendingDailyTotal.day
+    if dialect == "postgresql":
+        # Inline the unit: a bound parameter would differ between SELECT and
+        # GROUP BY and Postgres would reject the grouping.
+        return cast(func.date_trunc(literal_column(f"'{bucket}'"), day), Date)
+    # SQLite: 'weekday 0' moves to the next Sunday (or stays), -6 days lands
+    # on that week's Monday, matching Postgres' ISO date_trunc('week').
+    if bucket == "month":
+        return func.date(day, "start of month")
+    return func.date(day, "weekday 0", "-6 days")
+
+
+def _review_periods_query(
+    dialect: str,
+    start_date: date,
+    end_date: date,
+    bucket: str,
+):
+    period = _period_bucket_expression(dialect, bucket).label("period_start")
+    return (
+        select(
+            period,
+            Category.key.label("category_key"),
+            func.sum(SpendingDailyTotal.total).label("total_amount"),
+        )
+        .join(Category, Category.id == SpendingDailyTotal.category_id)
+        .where(SpendingDailyTotal.day >= start_date)
+        .where(SpendingDailyTotal.day <= end_date)
+        .group_by(period, Category.key)
+        .order_by(period, desc(func.sum(SpendingDailyTotal.total)))
+    )
+
+
+def _weekly_review_payload(summary: WeeklyReviewOut | ReviewPeriodOut) -> dict:
+    return {
+        "version": SUGGESTION_PAYLOAD_VERSION,
+        "total_amount": float(summary.total_amount),
+        "categories": {
+            entry.category_key: float(entry.total_amount)
+            for entry in summary.by_category
+        },
+    }
+
+
+def _payload_key(payload: dict) -> str:
+    return content_key(json.dumps(payload, sort_keys=True, separators=(",", ":")))
+
+
+def _suggestion_from_response(data) -> str:
+    suggestion = data.get("suggestion") if isinstance(data, dict) else None
+    if not suggestion:
+        raise HTTPException(
+            status_code=502,
+            detail="MCP response missing suggestion",
+        )
+    return suggestion
 
 
 def fetch_weekly_suggestion(summary: WeeklyReviewOut) -> str:
-    payload = {"input": _weekly_review_prompt(summary)}
-    urls = [
-        "http://localhost:8001/suggest-weekly-review",
-        "http://mcp_server:8001/suggest-weekly-review",
-        "https://ai-dev-tools-zoomcamp-project-1.onrender.com/suggest-weekly-review",
-    ]
-    last_error: Exception | None = None
+    payload = _weekly_review_payload(summary)
+    cache = get_suggestion_cache()
+    key = _payload_key(payload)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def request() -> str:
+        try:
+            data = get_mcp_client().post_json(
+                "/suggest-weekly-review", {"summary": payload}
+            )
+        except MCPError as exc:
+            raise HTTPException(status_code=502, detail=exc.detail) from exc
+        suggestion = _suggestion_from_response(data)
+        cache.set(key, suggestion)
+        return suggestion
+
+    return get_single_flight().do(("suggestion", key), request)
+
+
+async def afetch_weekly_suggestion(summary: WeeklyReviewOut) -> str:
+    """Event-loop variant of `fetch_weekly_suggestion` used by suggestion jobs."""
+    payload = _weekly_review_payload(summary)
+    cache = get_suggestion_cache()
+    key = _payload_key(payload)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def request() -> str:
+        try:
+            data = await get_mcp_client().apost_json(
+                "/suggest-weekly-review", {"summary": payload}
+            )
+        except MCPError as exc:
+            raise HTTPException(status_code=502, detail=exc.detail) from exc
+        suggestion = _suggestion_from_response(data)
+        cache.set(key, suggestion)
+        return suggestion
+
+    return await get_single_flight().ado(("suggestion", key), request)
 
-    for url in urls:
+
+def fetch_period_suggestions(summaries: list[ReviewPeriodOut]) -> list[str]:
+    """Return one suggestion per summary, batching cache misses to MCP."""
+    cache = get_suggestion_cache()
+    keys = []
+    suggestions: dict[str, str] = {}
+    payloads: dict[str, dict] = {}
+    for summary in summaries:
+        payload = _weekly_review_payload(summary)
+        key = _payload_key(payload)
+        keys.append(key)
+        if key in suggestions or key in payloads:
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            suggestions[key] = cached
+        else:
+            payloads[key] = payload
+
+    missing = list(payloads)
+    client = get_mcp_client()
+    for offset in range(0, len(missing), SUGGESTION_BATCH_SIZE):
+        batch = missing[offset : offset + SUGGESTION_BATCH_SIZE]
         try:
-            response = httpx.post(url, json=payload, timeout=5.0)
-            response.raise_for_status()
-            data = response.json()
-            suggestion = data.get("suggestion") if isinstance(data, dict) else None
+            data = client.post_json(
+                "/suggest-weekly-review/batch",
+                {"summaries": [payloads[key] for key in batch]},
+            )
+        except MCPError as exc:
+            raise HTTPException(status_code=502, detail=exc.detail) from exc
+        results = data.get("suggestions") if isinstance(data, dict) else None
+        if not isinstance(results, list) or len(results) != len(batch):
+            raise HTTPException(
+                status_code=502,
+                detail="MCP response missing suggestions",
+            )
+        for key, suggestion in zip(batch, results):
             if not suggestion:
                 raise HTTPException(
                     status_code=502,
                     detail="MCP response missing suggestion",
                 )
-            return suggestion
-        except httpx.RequestError as exc:
-            last_error = exc
-            continue
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(
-                status_code=502,
-                detail="MCP server error",
-            ) from exc
+            cache.set(key, suggestion)
+            suggestions[key] = suggestion
 
-    raise HTTPException(
-        status_code=502,
-        detail="MCP server unavailable",
-    ) from last_error
+    return [suggestions[key] for key in keys]
 
 
-@router.get("/reviews/weekly", response_model=WeeklyReviewOut)
+@router.get(
+    "/reviews/weekly",
+    response_model=WeeklyReviewOut,
+    dependencies=[Depends(admit("reports"))],
+)
 def weekly_review(
     start_date: date = Query(..., description="YYYY-MM-DD"),
     end_date: date = Query(..., description="YYYY-MM-DD"),
     db: Session = Depends(get_db),
 ) -> WeeklyReviewOut:
-    return _weekly_review_summary(db, start_date, end_date)
+    return _cached_weekly_review_summary(db, start_date, end_date)
 
 
-@router.get("/reviews/weekly/suggestion", response_model=WeeklyReviewSuggestionOut)
+@router.get(
+    "/reviews/weekly/suggestion",
+    response_model=WeeklyReviewSuggestionOut,
+    dependencies=[Depends(admit("suggestions"))],
+)
 def weekly_review_suggestion(
     start_date: date = Query(..., description="YYYY-MM-DD"),
     end_date: date = Query(..., description="YYYY-MM-DD"),
     db: Session = Depends(get_db),
 ) -> WeeklyReviewSuggestionOut:
-    summary = _weekly_review_summary(db, start_date, end_date)
+    summary = _cached_weekly_review_summary(db, start_date, end_date)
     suggestion = fetch_weekly_suggestion(summary)
     return WeeklyReviewSuggestionOut(
         start_date=start_date,
@@ -349,3 +1144,192 @@ def weekly_review_suggestion(
         summary=summary,
         suggestion=suggestion,
     )
+
+
+def _review_periods_summary(
+    db: Session, start_date: date, end_date: date, bucket: str
+) -> ReviewPeriodsOut:
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=422,
+            detail="start_date must be on or before end_date",
+        )
+    if (end_date - start_date).days >= REVIEW_PERIODS_MAX_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range must be shorter than {REVIEW_PERIODS_MAX_DAYS} days",
+        )
+
+    dialect = db.get_bind().dialect.name
+    rows = db.execute(
+        _review_periods_query(dialect, start_date, end_date, bucket)
+    ).all()
+    by_period: dict[date, list] = {}
+    for row in rows:
+        period_start = row.period_start
+        if isinstance(period_start, str):
+            period_start = date.fromisoformat(period_start)
+        by_period.setdefault(period_start, []).append(row)
+
+    periods = []
+    current = _period_start(start_date, bucket)
+    while current <= end_date:
+        following = _next_period_start(current, bucket)
+        period_rows = by_period.get(current, [])
+        periods.append(
+            ReviewPeriodOut(
+                period_start=max(current, start_date),
+                period_end=min(following - timedelta(days=1), end_date),
+                total_amount=_format_amount(
+                    sum((row.total_amount for row in period_rows), Decimal("0"))
+                ),
+                by_category=[
+                    {
+                        "category_key": row.category_key,
+                        "total_amount": _format_amount(row.total_amount),
+                    }
+                    for row in period_rows
+                ],
+            )
+        )
+        current = following
+
+    return ReviewPeriodsOut(
+        start_date=start_date,
+        end_date=end_date,
+        bucket=bucket,
+        periods=periods,
+    )
+
+
+def _suggestion_job_out(job: SuggestionJob) -> SuggestionJobOut:
+    result = None
+    if job.suggestion is not None:
+        result = WeeklyReviewSuggestionOut(
+            start_date=job.start_date,
+            end_date=job.end_date,
+            summary=job.summary,
+            suggestion=job.suggestion,
+        )
+    return SuggestionJobOut(
+        id=job.id,
+        status=job.status,
+        start_date=job.start_date,
+        end_date=job.end_date,
+        result=result,
+        error=job.error,
+    )
+
+
+def _get_suggestion_job(job_id: str) -> SuggestionJob:
+    job = get_suggestion_jobs().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Suggestion job not found")
+    return job
+
+
+@router.post(
+    "/reviews/weekly/suggestion/jobs",
+    response_model=SuggestionJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(admit("reports"))],
+)
+async def create_weekly_review_suggestion_job(
+    response: Response,
+    start_date: date = Query(..., description="YYYY-MM-DD"),
+    end_date: date = Query(..., description="YYYY-MM-DD"),
+    db: Session = Depends(get_db),
+) -> SuggestionJobOut:
+    summary = await run_in_threadpool(
+        _cached_weekly_review_summary, db, start_date, end_date
+    )
+    try:
+        job = get_suggestion_jobs().submit(
+            start_date,
+            end_date,
+            summary,
+            lambda: afetch_weekly_suggestion(summary),
+        )
+    except JobsBusy as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(SUGGESTION_JOB_RETRY_AFTER_SECONDS)},
+        ) from exc
+    response.headers["Location"] = f"/api/reviews/weekly/suggestion/jobs/{job.id}"
+    return _suggestion_job_out(job)
+
+
+@router.get(
+    "/reviews/weekly/suggestion/jobs/{job_id}", response_model=SuggestionJobOut
+)
+def get_weekly_review_suggestion_job(job_id: str) -> SuggestionJobOut:
+    return _suggestion_job_out(_get_suggestion_job(job_id))
+
+
+@router.get("/reviews/weekly/suggestion/jobs/{job_id}/events")
+async def stream_weekly_review_suggestion_job(job_id: str) -> StreamingResponse:
+    job = _get_suggestion_job(job_id)
+
+    async def events():
+        sent_version = None
+        while True:
+            updated = job.updated
+            if job.version != sent_version:
+                sent_version = job.version
+                data = _suggestion_job_out(job).model_dump_json()
+                yield f"event: {job.status}\ndata: {data}\n\n"
+            if job.finished:
+                return
+            try:
+                await asyncio.wait_for(
+                    updated.wait(), SUGGESTION_JOB_KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.get(
+    "/reviews/periods",
+    response_model=ReviewPeriodsOut,
+    dependencies=[Depends(admit("reports"))],
+)
+def review_periods(
+    start_date: date = Query(..., description="YYYY-MM-DD"),
+    end_date: date = Query(..., description="YYYY-MM-DD"),
+    bucket: Literal["week", "month"] = Query("week"),
+    db: Session = Depends(get_db),
+) -> ReviewPeriodsOut:
+    return _review_periods_summary(db, start_date, end_date, bucket)
+
+
+@router.get(
+    "/reviews/periods/suggestions",
+    response_model=ReviewPeriodSuggestionsOut,
+    dependencies=[Depends(admit("suggestions"))],
+)
+def review_period_suggestions(
+    start_date: date = Query(..., description="YYYY-MM-DD"),
+    end_date: date = Query(..., description="YYYY-MM-DD"),
+    bucket: Literal["week", "month"] = Query("week"),
+    db: Session = Depends(get_db),
+) -> ReviewPeriodSuggestionsOut:
+    summary = _review_periods_summary(db, start_date, end_date, bucket)
+    suggestions = fetch_period_suggestions(summary.periods)
+    return ReviewPeriodSuggestionsOut(
+        start_date=start_date,
+        end_date=end_date,
+        bucket=bucket,
+        periods=[
+            ReviewPeriodSuggestionOut(
+                **period.model_dump(), suggestion=suggestion
+            )
+            for period, suggestion in zip(summary.periods, suggestions)
+        ],
+    )
@@ -0,0 +1,260 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Protocol
+
+
+class CacheBackend(Protocol):
+    """Key/value store with TTL, LRU eviction and a shared generation counter."""
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    def generation(self) -> int: ...
+
+    def bump_generation(self) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """Per-process LRU + TTL store."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """File-backed store that several worker processes on one host can share.
+
+    Entries and the generation counter live in a small SQLite database in WAL
+    mode; each thread keeps its own connection.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 1024) -> None:
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at "
+                "ON cache_entries (accessed_at)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta ("
+                "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value) "
+                "VALUES ('generation', 0)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            connection.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            connection.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def generation(self) -> int:
+        row = self._connect().execute(
+            "SELECT value FROM cache_meta WHERE name = 'generation'"
+        ).fetchone()
+        return row[0]
+
+    def bump_generation(self) -> int:
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE cache_meta SET value = value + 1 WHERE name = 'generation'"
+            )
+            row = connection.execute(
+                "SELECT value FROM cache_meta WHERE name = 'generation'"
+            ).fetchone()
+        return row[0]
+
+    def clear(self) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache_entries")
+
+
+class ResultCache:
+    """Caches serialised results under a generation-scoped key.
+
+    Bumping the generation makes every earlier entry unreachable; stale
+    entries then age out through TTL and LRU eviction.
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: float) -> None:
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str, generation: int | None = None) -> str:
+        if generation is None:
+            generation = self.backend.generation()
+        return f"{self.name}:{generation}:{key}"
+
+    def generation(self) -> int:
+        return self.backend.generation()
+
+    def get(self, key: str, generation: int | None = None) -> str | None:
+        value = self.backend.get(self._key(key, generation))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, generation: int | None = None) -> None:
+        """Store `value` under `generation`, the current one by default.
+
+        Callers caching a computed result pass the generation they read
+        before computing it, so an invalidation that lands mid-computation
+        leaves the result unreachable instead of serving it as fresh.
+        """
+        self.backend.set(self._key(key, generation), value, self.ttl)
+
+    def invalidate(self) -> None:
+        self.backend.bump_generation()
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "generation": self.backend.generation(),
+        }
+
+
+def create_cache_backend(prefix: str) -> CacheBackend:
+    """Build a backend from `<PREFIX>_CACHE_BACKEND` (memory or sqlite)."""
+    kind = os.environ.get(f"{prefix}_CACHE_BACKEND", "memory").strip().lower()
+    max_entries = int(os.environ.get(f"{prefix}_CACHE_MAX_ENTRIES", "1024"))
+    if kind == "sqlite":
+        path = os.environ.get(f"{prefix}_CACHE_PATH", f"{prefix.lower()}_cache.db")
+        return SQLiteCacheBackend(path, max_entries=max_entries)
+    if kind == "memory":
+        return MemoryCacheBackend(max_entries=max_entries)
+    raise RuntimeError(f"Unknown {prefix}_CACHE_BACKEND: {kind}")
+
+
+_review_cache: ResultCache | None = None
+
+
+def get_review_cache() -> ResultCache:
+    global _review_cache
+    if _review_cache is None:
+        _review_cache = ResultCache(
+            "weekly_review",
+            create_cache_backend("REVIEW"),
+            ttl=float(os.environ.get("REVIEW_CACHE_TTL_SECONDS", "300")),
+        )
+    return _review_cache
+
+
+_suggestion_cache: ResultCache | None = None
+
+
+def get_suggestion_cache() -> ResultCache:
+    global _suggestion_cache
+    if _suggestion_cache is None:
+        _suggestion_cache = ResultCache(
+            "suggestion",
+            create_cache_backend("SUGGESTION"),
+            ttl=float(os.environ.get("SUGGESTION_CACHE_TTL_SECONDS", "86400")),
+        )
+    return _suggestion_cache
+
+
+def content_key(text: str) -> str:
+    """Hash `text` after normalising case and whitespace."""
+    normalised = re.sub(r"\s+", " ", text).strip().casefold()
+    return hashlib.sha256(normalised.encode()).hexdigest()
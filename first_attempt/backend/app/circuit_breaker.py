@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker for a single downstream endpoint.
+
+    Outcomes are kept in a rolling time window. Once at least `min_calls`
+    are recorded and the failure ratio reaches `failure_ratio`, the breaker
+    opens and rejects calls for `open_seconds`. It then turns half-open and
+    lets a single trial call (or health probe) through: success closes it,
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_seconds: float = 30.0,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        open_seconds: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if now - self._opened_at < self.open_seconds:
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(self._clock())
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed; claims the half-open trial slot."""
+        with self._lock:
+            state = self._state(self._clock())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a claimed trial slot without judging the endpoint."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            now = self._clock()
+            if self._opened_at is not None:
+                self._opened_at = None
+                self._outcomes.clear()
+            self._trial_in_flight = False
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._trial_in_flight = False
+            if self._opened_at is not None:
+                # A failed half-open trial (or a straggler) re-arms the timer.
+                self._opened_at = now
+                return
+            self._outcomes.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_ratio
+            ):
+                self._opened_at = now
+
+    def snapshot(self) -> dict[str, str | int | float]:
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "endpoint": self.name,
+                "state": self._state(now),
+                "calls": calls,
+                "failure_ratio": round(failures / calls, 4) if calls else 0.0,
+            }
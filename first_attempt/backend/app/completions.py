@@ -0,0 +1,232 @@
+from collections.abc import Iterable
+from datetime import date
+from uuid import UUID, uuid4
+
+from sqlalchemy import Date, bindparam, delete, exists, literal, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import GUID, Habit, HabitCompletion, HabitCompletionMonth
+
+CHECKED = "checked"
+UNCHECKED = "unchecked"
+DELETE_CHUNK_ROWS = 500
+ALL_DAYS = (1 << 31) - 1
+
+
+def _insert(db: Session, model=HabitCompletion):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise RuntimeError(f"Unsupported dialect for habit completions: {dialect}")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _day_bit(day: date) -> int:
+    return 1 << (day.day - 1)
+
+
+def apply_completion_bits(
+    db: Session, changes: Iterable[tuple[UUID, date, bool]]
+) -> None:
+    """Set or clear `(habit_id, day)` bits in `habit_completion_months`.
+
+    Changes are folded per (habit, month) into a set mask and a keep mask and
+    written with one upsert, in the caller's transaction. Months left empty
+    are deleted.
+    """
+    masks: dict[tuple[UUID, date], list[int]] = {}
+    for habit_id, day, checked in changes:
+        bucket = masks.setdefault((habit_id, month_start(day)), [0, ALL_DAYS])
+        bit = _day_bit(day)
+        if checked:
+            bucket[0] |= bit
+            bucket[1] |= bit
+        else:
+            bucket[0] &= ~bit
+            bucket[1] &= ~bit
+    if not masks:
+        return
+
+    # A Core insert on the table: the ORM bulk path would drop `keep`.
+    table = HabitCompletionMonth.__table__
+    statement = _insert(db, table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["habit_id", "month"],
+        set_={
+            "days": table.c.days.op("&")(bindparam("keep")).op("|")(
+                statement.excluded.days
+            )
+        },
+    )
+    db.execute(
+        statement,
+        [
+            {"habit_id": habit_id, "month": month, "days": days, "keep": keep}
+            for (habit_id, month), (days, keep) in masks.items()
+        ],
+    )
+    cleared = [key for key, (_, keep) in masks.items() if keep != ALL_DAYS]
+    for offset in range(0, len(cleared), DELETE_CHUNK_ROWS):
+        db.execute(
+            delete(HabitCompletionMonth).where(
+                HabitCompletionMonth.days == 0,
+                tuple_(HabitCompletionMonth.habit_id, HabitCompletionMonth.month).in_(
+                    cleared[offset : offset + DELETE_CHUNK_ROWS]
+                ),
+            )
+        )
+
+
+def _decode_month(month: date, days: int) -> Iterable[date]:
+    while days:
+        bit = days & -days
+        yield month.replace(day=bit.bit_length())
+        days ^= bit
+
+
+def completed_dates(
+    db: Session,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    habit_id: UUID | None = None,
+) -> dict[UUID, list[date]]:
+    """Completed days per habit, in date order, decoded from the month bitsets."""
+    query = select(
+        HabitCompletionMonth.habit_id,
+        HabitCompletionMonth.month,
+        HabitCompletionMonth.days,
+    ).order_by(HabitCompletionMonth.habit_id, HabitCompletionMonth.month)
+    if start_date is not None:
+        query = query.where(HabitCompletionMonth.month >= month_start(start_date))
+    if end_date is not None:
+        query = query.where(HabitCompletionMonth.month <= end_date)
+    if habit_id is not None:
+        query = query.where(HabitCompletionMonth.habit_id == habit_id)
+
+    completed: dict[UUID, list[date]] = {}
+    for row_habit_id, month, days in db.execute(query):
+        completed.setdefault(row_habit_id, []).extend(
+            day
+            for day in _decode_month(month, days)
+            if (start_date is None or day >= start_date)
+            and (end_date is None or day <= end_date)
+        )
+    return completed
+
+
+def rebuild_completion_months(db: Session) -> int:
+    """Regenerate `habit_completion_months` from `habit_completions`."""
+    db.execute(delete(HabitCompletionMonth))
+    masks: dict[tuple[UUID, date], int] = {}
+    for habit_id, day in db.execute(
+        select(HabitCompletion.habit_id, HabitCompletion.date)
+    ):
+        key = (habit_id, month_start(day))
+        masks[key] = masks.get(key, 0) | _day_bit(day)
+    if masks:
+        db.execute(
+            _insert(db, HabitCompletionMonth),
+            [
+                {"habit_id": habit_id, "month": month, "days": days}
+                for (habit_id, month), days in masks.items()
+            ],
+        )
+    return len(masks)
+
+
+def _insert_if_due(db: Session, habit_id: UUID, day: date, due_clause, *extra):
+    """INSERT ... SELECT from `habits`: a missing or non-due habit inserts nothing."""
+    statement = _insert(db)
+    return (
+        statement.from_select(
+            ["id", "habit_id", "date"],
+            select(literal(uuid4(), GUID()), Habit.id, literal(day, Date())).where(
+                Habit.id == habit_id, due_clause, *extra
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["habit_id", "date"])
+        .returning(HabitCompletion.id)
+    )
+
+
+def toggle_completion(
+    db: Session, habit_id: UUID, day: date, due_clause
+) -> str | None:
+    """Flip one completion; returns None when nothing could be inserted.
+
+    `due_clause` is a SQL predicate on `Habit` for `day`. On Postgres the
+    delete and the conditional insert run as one statement through
+    data-modifying CTEs; SQLite runs them back to back in the caller's
+    transaction. The insert ignores unique conflicts, so a concurrent toggle
+    can no longer fail on `uq_habit_completions_habit_id_date`.
+    """
+    deleted_statement = (
+        delete(HabitCompletion)
+        .where(HabitCompletion.habit_id == habit_id, HabitCompletion.date == day)
+        .returning(HabitCompletion.id)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        deleted = deleted_statement.cte("deleted")
+        inserted = _insert_if_due(
+            db, habit_id, day, due_clause, ~exists(select(deleted.c.id))
+        ).cte("inserted")
+        was_deleted, was_inserted = db.execute(
+            select(exists(select(deleted.c.id)), exists(select(inserted.c.id)))
+        ).one()
+    else:
+        was_deleted = db.execute(deleted_statement).first() is not None
+        was_inserted = not was_deleted and (
+            db.execute(_insert_if_due(db, habit_id, day, due_clause)).first()
+            is not None
+        )
+
+    if was_deleted:
+        apply_completion_bits(db, [(habit_id, day, False)])
+        return UNCHECKED
+    if was_inserted:
+        apply_completion_bits(db, [(habit_id, day, True)])
+        return CHECKED
+    return None
+
+
+def check_completions(db: Session, pairs: Iterable[tuple[UUID, date]]) -> int:
+    """Insert completions, skipping existing ones; returns rows inserted."""
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+    statement = (
+        _insert(db)
+        .on_conflict_do_nothing(index_elements=["habit_id", "date"])
+        .returning(HabitCompletion.id)
+    )
+    rows = [
+        {"id": uuid4(), "habit_id": habit_id, "date": day} for habit_id, day in pairs
+    ]
+    inserted = len(db.execute(statement, rows).all())
+    apply_completion_bits(db, ((habit_id, day, True) for habit_id, day in pairs))
+    return inserted
+
+
+def uncheck_completions(db: Session, pairs: Iterable[tuple[UUID, date]]) -> int:
+    """Delete completions by (habit_id, date); returns rows deleted."""
+    pairs = list(pairs)
+    removed = 0
+    for offset in range(0, len(pairs), DELETE_CHUNK_ROWS):
+        chunk = pairs[offset : offset + DELETE_CHUNK_ROWS]
+        removed += len(
+            db.execute(
+                delete(HabitCompletion)
+                .where(
+                    tuple_(HabitCompletion.habit_id, HabitCompletion.date).in_(chunk)
+                )
+                .returning(HabitCompletion.id)
+            ).all()
+        )
+    apply_completion_bits(db, ((habit_id, day, False) for habit_id, day in pairs))
+    return removed
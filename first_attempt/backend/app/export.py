@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from collections.abc import Iterator
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy.engine import Result
+
+EXPORT_COLUMNS = (
+    "id",
+    "amount",
+    "occurred_at",
+    "description",
+    "label_id",
+    "created_at",
+)
+EXPORT_BATCH_ROWS = 1000
+
+
+def _json_value(value):
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_ndjson(result: Result) -> Iterator[str]:
+    """Yield one NDJSON chunk per fetched batch of `EXPORT_COLUMNS` rows.
+
+    Rows are plain tuples from a streamed (server-side cursor) result, so
+    neither ORM objects nor Pydantic models are built per row.
+    """
+    try:
+        for partition in result.partitions():
+            yield "".join(
+                json.dumps(
+                    {
+                        column: _json_value(value)
+                        for column, value in zip(EXPORT_COLUMNS, row)
+                    }
+                )
+                + "\n"
+                for row in partition
+            )
+    finally:
+        result.close()
+
+
+def iter_csv(result: Result) -> Iterator[str]:
+    """Yield a CSV header, then one CSV chunk per fetched batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    try:
+        for partition in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                [_json_value(value) for value in row] for row in partition
+            )
+            yield buffer.getvalue()
+    finally:
+        result.close()
@@ -0,0 +1,373 @@
+"""Closed-form occurrence arithmetic for habit schedules.
+
+A schedule is compiled once into a `CompiledSchedule`. Day and week
+schedules repeat every `period` days from an anchor date, so membership is a
+modulo and a set lookup, and range expansion steps whole periods. Month
+schedules step `interval` months and memoise each month's due days. Either
+way the cost of expanding a range is proportional to the number of
+occurrences rather than the number of days in it.
+"""
+
+import base64
+from bisect import bisect_right
+import calendar
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import math
+import re
+from typing import NamedTuple
+
+UNITS = ("day", "week", "month")
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+RRULE_FREQUENCIES = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month"}
+MAX_SET_POSITION = 5
+COMPILED_SCHEDULE_CACHE_SIZE = 4096
+
+
+def days_in_month(year: int, month: int) -> int:
+    return calendar.monthrange(year, month)[1]
+
+
+def _month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def values_to_mask(values: Iterable[int] | None, first: int = 0) -> int | None:
+    """Pack small integers into a bitmask; bit 0 stands for `first`."""
+    if values is None:
+        return None
+    mask = 0
+    for value in values:
+        mask |= 1 << (value - first)
+    return mask
+
+
+def mask_to_values(mask: int | None, first: int = 0) -> list[int] | None:
+    if mask is None:
+        return None
+    return [bit + first for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+def validate_schedule(
+    unit: str,
+    weekday_mask: int | None,
+    month_day_mask: int | None,
+    set_position: int | None,
+) -> None:
+    """Raise ValueError for combinations the evaluators do not support."""
+    if weekday_mask is not None and not 0 < weekday_mask < 1 << 7:
+        raise ValueError("weekdays must be between 0 (Monday) and 6 (Sunday)")
+    if month_day_mask is not None:
+        if unit != "month":
+            raise ValueError("month_days requires unit 'month'")
+        if not 0 < month_day_mask < 1 << 31:
+            raise ValueError("month_days must be between 1 and 31")
+    if set_position is not None:
+        if unit != "month" or weekday_mask is None or month_day_mask is not None:
+            raise ValueError(
+                "set_position requires unit 'month' and weekdays without month_days"
+            )
+        if set_position == 0 or abs(set_position) > MAX_SET_POSITION:
+            raise ValueError(
+                f"set_position must be between -{MAX_SET_POSITION} and "
+                f"{MAX_SET_POSITION}, excluding 0"
+            )
+
+
+def _rrule_int(name: str, value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid RRULE {name}: {value}") from None
+
+
+def parse_rrule(rule: str) -> dict:
+    """Translate the supported RRULE subset into habit schedule fields.
+
+    Supports FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL, BYDAY (a single ordinal
+    day such as `-1FR` in monthly rules), BYMONTHDAY (1-31), BYSETPOS and
+    UNTIL. Anything else raises ValueError.
+    """
+    parts: dict[str, str] = {}
+    for part in rule.strip().upper().removeprefix("RRULE:").split(";"):
+        if not part:
+            continue
+        name, separator, value = part.partition("=")
+        if not separator or not value or name in parts:
+            raise ValueError(f"Invalid RRULE part: {part}")
+        parts[name] = value
+
+    frequency = parts.pop("FREQ", None)
+    if frequency not in RRULE_FREQUENCIES:
+        raise ValueError("RRULE FREQ must be DAILY, WEEKLY or MONTHLY")
+    fields = {
+        "unit": RRULE_FREQUENCIES[frequency],
+        "interval": 1,
+        "end_date": None,
+        "weekday_mask": None,
+        "month_day_mask": None,
+        "set_position": None,
+    }
+    if "INTERVAL" in parts:
+        fields["interval"] = _rrule_int("INTERVAL", parts.pop("INTERVAL"))
+        if fields["interval"] < 1:
+            raise ValueError("RRULE INTERVAL must be at least 1")
+    if "BYDAY" in parts:
+        items = parts.pop("BYDAY").split(",")
+        weekdays = []
+        for item in items:
+            match = re.fullmatch(r"([+-]?\d)?(MO|TU|WE|TH|FR|SA|SU)", item)
+            if match is None:
+                raise ValueError(f"Invalid RRULE BYDAY value: {item}")
+            if match[1] is not None:
+                if len(items) > 1 or "BYSETPOS" in parts:
+                    raise ValueError(
+                        "An ordinal BYDAY must be the only day and excludes BYSETPOS"
+                    )
+                fields["set_position"] = int(match[1])
+            weekdays.append(WEEKDAY_CODES.index(match[2]))
+        fields["weekday_mask"] = values_to_mask(weekdays)
+    if "BYMONTHDAY" in parts:
+        month_days = [
+            _rrule_int("BYMONTHDAY", value)
+            for value in parts.pop("BYMONTHDAY").split(",")
+        ]
+        if any(not 1 <= day <= 31 for day in month_days):
+            raise ValueError("RRULE BYMONTHDAY values must be between 1 and 31")
+        fields["month_day_mask"] = values_to_mask(month_days, first=1)
+    if "BYSETPOS" in parts:
+        fields["set_position"] = _rrule_int("BYSETPOS", parts.pop("BYSETPOS"))
+    if "UNTIL" in parts:
+        until = parts.pop("UNTIL")
+        try:
+            fields["end_date"] = datetime.strptime(until[:8], "%Y%m%d").date()
+        except ValueError:
+            raise ValueError(f"Invalid RRULE UNTIL: {until}") from None
+    if parts:
+        raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(parts))}")
+
+    validate_schedule(
+        fields["unit"],
+        fields["weekday_mask"],
+        fields["month_day_mask"],
+        fields["set_position"],
+    )
+    return fields
+
+
+class Schedule(NamedTuple):
+    start_date: date
+    end_date: date | None
+    interval: int
+    unit: str
+    weekday_mask: int | None = None
+    month_day_mask: int | None = None
+    set_position: int | None = None
+
+    @classmethod
+    def of(cls, habit) -> "Schedule":
+        return cls(
+            habit.start_date,
+            habit.end_date,
+            habit.interval,
+            habit.unit,
+            habit.weekday_mask,
+            habit.month_day_mask,
+            habit.set_position,
+        )
+
+    @property
+    def is_simple(self) -> bool:
+        """True for plain every-N day/week/month schedules."""
+        return (
+            self.weekday_mask is None
+            and self.month_day_mask is None
+            and self.set_position is None
+        )
+
+
+class CompiledSchedule:
+    """Due-date evaluator for one `Schedule`; build it with `compile_schedule`."""
+
+    def __init__(self, schedule: Schedule) -> None:
+        self.schedule = schedule
+        self.start = schedule.start_date
+        self.end = schedule.end_date
+        self.interval = schedule.interval
+        self.period: int | None = None
+        self.anchor = schedule.start_date
+        self.residues: tuple[int, ...] = ()
+        self._start_month = _month_index(schedule.start_date)
+        self._month_days: dict[int, tuple[int, ...]] = {}
+
+        weekdays = schedule.weekday_mask
+        if schedule.unit == "day" and self.interval >= 1:
+            if weekdays is None:
+                self.period, residues = self.interval, [0]
+            else:
+                self.period = math.lcm(self.interval, 7)
+                residues = [
+                    offset
+                    for offset in range(0, self.period, self.interval)
+                    if weekdays >> (self.start + timedelta(days=offset)).weekday() & 1
+                ]
+            self.residues = tuple(residues)
+        elif schedule.unit == "week" and self.interval >= 1:
+            self.period = 7 * self.interval
+            if weekdays is None:
+                self.residues = (0,)
+            else:
+                # Weeks run Monday to Sunday, counted from the start's week.
+                self.anchor = self.start - timedelta(days=self.start.weekday())
+                self.residues = tuple(mask_to_values(weekdays))
+        self._residue_set = frozenset(self.residues)
+        self._residue_deltas = [timedelta(days=offset) for offset in self.residues]
+        self.never = (
+            self.interval < 1
+            or schedule.unit not in UNITS
+            or (self.period is not None and not self.residues)
+        )
+        # Inclusive bounds for `is_due`; empty when the schedule never fires.
+        self._first = date.max if self.never else self.start
+        self._last = date.min if self.never else self.end or date.max
+
+    def _due_days_in_month(self, index: int) -> tuple[int, ...]:
+        days = self._month_days.get(index)
+        if days is not None:
+            return days
+        year, month = divmod(index, 12)
+        first_weekday, length = calendar.monthrange(year, month + 1)
+        schedule = self.schedule
+        if schedule.is_simple:
+            days = (min(self.start.day, length),)
+        else:
+            weekdays, month_days = schedule.weekday_mask, schedule.month_day_mask
+            days = tuple(
+                day
+                for day in range(1, length + 1)
+                if (weekdays is None or weekdays >> (first_weekday + day - 1) % 7 & 1)
+                and (month_days is None or month_days >> (day - 1) & 1)
+            )
+            position = schedule.set_position
+            if position is not None:
+                if 0 < position <= len(days) or 0 < -position <= len(days):
+                    days = (days[position - 1 if position > 0 else position],)
+                else:
+                    days = ()
+        self._month_days[index] = days
+        return days
+
+    def _bounds(self, low: date, high: date) -> tuple[date, date]:
+        return max(low, self.start), high if self.end is None else min(high, self.end)
+
+    def is_due(self, day: date) -> bool:
+        if not self._first <= day <= self._last:
+            return False
+        if self.period is not None:
+            return (day - self.anchor).days % self.period in self._residue_set
+        index = _month_index(day)
+        if (index - self._start_month) % self.interval:
+            return False
+        return day.day in self._due_days_in_month(index)
+
+    def expand(self, range_start: date, range_end: date) -> list[date]:
+        """All due dates within `[range_start, range_end]`, in order."""
+        low, high = self._bounds(range_start, range_end)
+        if self.never or low > high:
+            return []
+        due: list[date] = []
+        if self.period is not None:
+            step = timedelta(days=self.period)
+            base = self.anchor + (low - self.anchor).days // self.period * step
+            while base <= high:
+                for delta in self._residue_deltas:
+                    day = base + delta
+                    if day > high:
+                        return due
+                    if day >= low:
+                        due.append(day)
+                base += step
+            return due
+
+        index = self._start_month + -(
+            -(_month_index(low) - self._start_month) // self.interval
+        ) * self.interval
+        last_index = _month_index(high)
+        while index <= last_index:
+            year, month = divmod(index, 12)
+            for day_of_month in self._due_days_in_month(index):
+                day = date(year, month + 1, day_of_month)
+                if low <= day <= high:
+                    due.append(day)
+            index += self.interval
+        return due
+
+    def last_on_or_before(self, day: date) -> date | None:
+        """Latest due date not after `day`, or None."""
+        high = day if self.end is None else min(day, self.end)
+        if self.never or high < self.start:
+            return None
+        if self.period is not None:
+            periods, remainder = divmod((high - self.anchor).days, self.period)
+            position = bisect_right(self.residues, remainder)
+            if position:
+                offset = periods * self.period + self.residues[position - 1]
+            else:
+                offset = (periods - 1) * self.period + self.residues[-1]
+            latest = self.anchor + timedelta(days=offset)
+            return latest if latest >= self.start else None
+
+        index = self._start_month + (
+            (_month_index(high) - self._start_month) // self.interval * self.interval
+        )
+        while index >= self._start_month:
+            year, month = divmod(index, 12)
+            for day_of_month in reversed(self._due_days_in_month(index)):
+                latest = date(year, month + 1, day_of_month)
+                if latest < self.start:
+                    return None
+                if latest <= high:
+                    return latest
+            index -= self.interval
+        return None
+
+    def count_through(self, day: date) -> int:
+        """Number of due dates from the start through `day`."""
+        high = day if self.end is None else min(day, self.end)
+        if self.never or high < self.start:
+            return 0
+        if self.period is not None:
+
+            def occurrences(elapsed: int) -> int:
+                periods, remainder = divmod(elapsed, self.period)
+                return periods * len(self.residues) + bisect_right(
+                    self.residues, remainder
+                )
+
+            return occurrences((high - self.anchor).days) - occurrences(
+                (self.start - self.anchor).days - 1
+            )
+        if self.schedule.is_simple:
+            last = self.last_on_or_before(high)
+            return (_month_index(last) - self._start_month) // self.interval + 1
+        return len(self.expand(self.start, high))
+
+
+@lru_cache(maxsize=COMPILED_SCHEDULE_CACHE_SIZE)
+def compile_schedule(schedule: Schedule) -> CompiledSchedule:
+    return CompiledSchedule(schedule)
+
+
+def encode_bitmap(offsets: Iterable[int], length: int) -> str:
+    """Pack day offsets into base64; bit `i % 8` of byte `i // 8` is day `i`."""
+    bits = bytearray((length + 7) // 8)
+    for offset in offsets:
+        if 0 <= offset < length:
+            bits[offset >> 3] |= 1 << (offset & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def decode_bitmap(encoded: str, length: int) -> list[int]:
+    bits = base64.b64decode(encoded)
+    return [offset for offset in range(length) if bits[offset >> 3] >> (offset & 7) & 1]
@@ -0,0 +1,112 @@
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.completions import completed_dates
+from app.habit_schedule import CompiledSchedule, Schedule, compile_schedule
+from app.models import Habit, HabitStats
+
+
+def _schedule(habit: Habit) -> CompiledSchedule:
+    return compile_schedule(Schedule.of(habit))
+
+
+def _previous_due(habit: Habit, day: date) -> date | None:
+    return _schedule(habit).last_on_or_before(day - timedelta(days=1))
+
+
+def _stats_from_dates(habit: Habit, days: Iterable[date]) -> HabitStats:
+    """Walk sorted completion dates once; consecutive due dates form a run."""
+    stats = HabitStats(
+        habit_id=habit.id,
+        completed_count=0,
+        longest_streak=0,
+        last_run_end=None,
+        last_run_length=0,
+    )
+    for day in days:
+        stats.completed_count += 1
+        if (
+            stats.last_run_end is not None
+            and _previous_due(habit, day) == stats.last_run_end
+        ):
+            stats.last_run_length += 1
+        else:
+            stats.last_run_length = 1
+        stats.last_run_end = day
+        stats.longest_streak = max(stats.longest_streak, stats.last_run_length)
+    return stats
+
+
+def refresh_habit_stats(db: Session, habit: Habit) -> HabitStats:
+    days = completed_dates(db, habit_id=habit.id).get(habit.id, ())
+    return db.merge(_stats_from_dates(habit, days))
+
+
+def record_toggle(db: Session, habit: Habit, day: date, checked: bool) -> None:
+    """Update counters for one toggle in the caller's transaction.
+
+    Checking a date after the latest completion and unchecking the tail of
+    a run that is not the longest are O(1); other edits (backfills, breaking
+    the longest run) recount this habit's completions.
+    """
+    stats = db.get(HabitStats, habit.id, with_for_update=True)
+    if stats is None:
+        refresh_habit_stats(db, habit)
+        return
+
+    if checked and (stats.last_run_end is None or day > stats.last_run_end):
+        stats.completed_count += 1
+        if (
+            stats.last_run_end is not None
+            and _previous_due(habit, day) == stats.last_run_end
+        ):
+            stats.last_run_length += 1
+        else:
+            stats.last_run_length = 1
+        stats.last_run_end = day
+        stats.longest_streak = max(stats.longest_streak, stats.last_run_length)
+    elif (
+        not checked
+        and day == stats.last_run_end
+        and 1 < stats.last_run_length < stats.longest_streak
+    ):
+        stats.completed_count -= 1
+        stats.last_run_length -= 1
+        stats.last_run_end = _previous_due(habit, day)
+    else:
+        refresh_habit_stats(db, habit)
+
+
+def rebuild_habit_stats(db: Session) -> int:
+    """Regenerate `habit_stats` for every habit; returns the row count."""
+    db.execute(delete(HabitStats))
+    habits = {habit.id: habit for habit in db.execute(select(Habit)).scalars()}
+    dates_by_habit = completed_dates(db)
+    db.add_all(
+        _stats_from_dates(habit, dates_by_habit.get(habit_id, ()))
+        for habit_id, habit in habits.items()
+    )
+    return len(habits)
+
+
+def current_streak(habit: Habit, stats: HabitStats, as_of: date) -> int:
+    """Length of the run still alive on `as_of`.
+
+    A run stays current until a due date is missed; a due date on `as_of`
+    itself does not break it before the day is over.
+    """
+    if stats.last_run_end is None:
+        return 0
+    latest = _schedule(habit).last_on_or_before(as_of)
+    if stats.last_run_end == latest:
+        return stats.last_run_length
+    if latest == as_of and _previous_due(habit, as_of) == stats.last_run_end:
+        return stats.last_run_length
+    return 0
+
+
+def due_count(habit: Habit, as_of: date) -> int:
+    return _schedule(habit).count_through(as_of)
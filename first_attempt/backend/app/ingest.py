@@ -0,0 +1,321 @@
+import codecs
+import csv
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.cache import get_review_cache
+from app.models import Label, Transaction
+from app.rollups import add_to_daily_totals
+from app.schemas import (
+    TransactionBulkError,
+    TransactionBulkItem,
+    TransactionImportOut,
+)
+
+TRANSACTION_COPY_COLUMNS = ("id", "amount", "occurred_at", "description", "label_id")
+MAX_REPORTED_ERRORS = 100
+IMPORT_CHUNK_ROWS = 1000
+# Parses as a UUID but never matches a row, so unmatched labels are reported
+# as "Label not found" rather than as a UUID validation error.
+UNRESOLVED_LABEL_ID = str(UUID(int=0))
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def validate_transaction_rows(
+    rows: Iterable[Mapping[str, Any]],
+    start_index: int = 0,
+) -> tuple[list[tuple[int, TransactionBulkItem]], list[TransactionBulkError]]:
+    valid: list[tuple[int, TransactionBulkItem]] = []
+    errors: list[TransactionBulkError] = []
+    for index, row in enumerate(rows, start=start_index):
+        try:
+            valid.append((index, TransactionBulkItem.model_validate(row)))
+        except ValidationError as exc:
+            errors.append(
+                TransactionBulkError(index=index, detail=_format_validation_error(exc))
+            )
+    return valid, errors
+
+
+def label_categories(db: Session, label_ids: set[UUID]) -> dict[UUID, UUID]:
+    """Map each existing label id in `label_ids` to its category id."""
+    if not label_ids:
+        return {}
+    rows = db.execute(
+        select(Label.id, Label.category_id).where(Label.id.in_(label_ids))
+    ).all()
+    return dict(rows)
+
+
+def _copy_transactions(db: Session, rows: list[dict[str, Any]]) -> None:
+    driver_connection = db.connection().connection.driver_connection
+    columns = ", ".join(TRANSACTION_COPY_COLUMNS)
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY transactions ({columns}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([row[column] for column in TRANSACTION_COPY_COLUMNS])
+
+
+def insert_transactions(db: Session, items: list[TransactionBulkItem]) -> None:
+    """Insert validated rows in one statement without touching the ORM.
+
+    Uses COPY on Postgres (psycopg 3) and an executemany INSERT elsewhere.
+    The caller owns the transaction and decides when to commit.
+    """
+    if not items:
+        return
+    rows = [
+        {
+            "id": uuid4(),
+            "amount": item.amount,
+            "occurred_at": item.occurred_at,
+            "description": item.description,
+            "label_id": item.label_id,
+        }
+        for item in items
+    ]
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg":
+        _copy_transactions(db, rows)
+    else:
+        db.execute(insert(Transaction), rows)
+
+
+def ingest_transaction_rows(
+    db: Session,
+    rows: Iterable[Mapping[str, Any]],
+    start_index: int = 0,
+) -> tuple[int, list[TransactionBulkError]]:
+    """Validate, resolve labels and insert one batch of raw transaction rows.
+
+    Rows that fail validation or reference an unknown label are reported by
+    their position and skipped; the rest are inserted in a single batch.
+    """
+    valid, errors = validate_transaction_rows(rows, start_index)
+    known_labels = label_categories(db, {item.label_id for _, item in valid})
+
+    accepted: list[TransactionBulkItem] = []
+    for index, item in valid:
+        if item.label_id in known_labels:
+            accepted.append(item)
+        else:
+            errors.append(TransactionBulkError(index=index, detail="Label not found"))
+
+    insert_transactions(db, accepted)
+    add_to_daily_totals(
+        db,
+        (
+            (item.occurred_at, item.label_id, known_labels[item.label_id], item.amount)
+            for item in accepted
+        ),
+    )
+    errors.sort(key=lambda error: error.index)
+    return len(accepted), errors
+
+
+def _iter_lines(
+    chunks: Iterable[bytes],
+    progress: TransactionImportOut,
+) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        progress.bytes_read += len(chunk)
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+class LabelLookup:
+    """Resolve label ids, names or descriptions to existing labels.
+
+    Labels are loaded once per import; the table is small compared to the
+    statements being imported, so a dict beats a query per row.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self._by_name = {
+            name.casefold(): label_id
+            for label_id, name in db.execute(select(Label.id, Label.label)).all()
+        }
+
+    def resolve(self, row: Mapping[str, str | None]) -> str:
+        if row.get("label_id"):
+            return row["label_id"]
+        for column in ("label", "description"):
+            value = (row.get(column) or "").strip().casefold()
+            if value and value in self._by_name:
+                return str(self._by_name[value])
+        return UNRESOLVED_LABEL_ID
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[dict[str, str | None]]:
+    """Yield CSV rows keyed by lower-cased header; `date` aliases `occurred_at`."""
+    for row in csv.DictReader(lines):
+        normalised = {
+            (key or "").strip().lower(): value.strip() if value else None
+            for key, value in row.items()
+        }
+        if "occurred_at" not in normalised and "date" in normalised:
+            normalised["occurred_at"] = normalised.pop("date")
+        yield normalised
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+
+OFX_CREDIT_TYPES = {"CREDIT", "DEP", "DIRECTDEP", "DIV", "INT"}
+
+
+def _ofx_is_credit(trntype: str, amount: str) -> bool:
+    if trntype.upper() in OFX_CREDIT_TYPES:
+        return True
+    try:
+        return Decimal(amount) > 0
+    except InvalidOperation:
+        return False
+
+
+def _ofx_amount(value: str) -> str:
+    # OFX signs debits as negative from the account's point of view;
+    # spending is stored as a positive amount here.
+    try:
+        return str(-Decimal(value))
+    except InvalidOperation:
+        return value
+
+
+def _ofx_date(value: str) -> str:
+    try:
+        return datetime.strptime(value.strip()[:8], "%Y%m%d").date().isoformat()
+    except ValueError:
+        return value
+
+
+def iter_ofx_rows(lines: Iterable[str]) -> Iterator[dict[str, str | None]]:
+    """Yield one row per <STMTTRN> block of an OFX (SGML or XML) statement.
+
+    Credits (deposits, interest, positive amounts) are not spending; they
+    are yielded with `skip` set so the importer can count and drop them.
+    """
+    current: dict[str, str] | None = None
+    for line in lines:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    amount = current.get("TRNAMT", "")
+                    yield {
+                        "occurred_at": _ofx_date(current.get("DTPOSTED", "")),
+                        "amount": _ofx_amount(amount),
+                        "description": current.get("NAME") or current.get("MEMO"),
+                        "label": current.get("MEMO"),
+                        "skip": _ofx_is_credit(current.get("TRNTYPE", ""), amount),
+                    }
+                    current = None
+                elif not closing:
+                    current = {}
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+
+def import_statement(
+    db: Session,
+    chunks: Iterable[bytes],
+    source_format: str = "csv",
+) -> Iterator[TransactionImportOut]:
+    """Stream a CSV or OFX statement into `transactions`, one chunk at a time.
+
+    Rows are validated and inserted in batches of `IMPORT_CHUNK_ROWS`, each
+    committed on its own, and a progress snapshot is yielded after every
+    batch; the last snapshot has `done` set. Error indexes are row positions
+    in the file. Only the first `MAX_REPORTED_ERRORS` errors are kept so
+    memory stays flat regardless of the file size.
+    """
+    progress = TransactionImportOut(
+        rows=0,
+        inserted=0,
+        failed=0,
+        skipped=0,
+        bytes_read=0,
+        done=False,
+        errors=[],
+    )
+    lookup = LabelLookup(db)
+    lines = _iter_lines(chunks, progress)
+    parsed = iter_ofx_rows(lines) if source_format == "ofx" else iter_csv_rows(lines)
+
+    batch: list[dict[str, Any]] = []
+    batch_indexes: list[int] = []
+
+    def report(errors: list[TransactionBulkError]) -> None:
+        progress.failed += len(errors)
+        room = MAX_REPORTED_ERRORS - len(progress.errors)
+        progress.errors.extend(errors[: max(room, 0)])
+
+    def flush() -> TransactionImportOut:
+        try:
+            inserted, errors = ingest_transaction_rows(db, batch)
+            db.commit()
+            if inserted:
+                get_review_cache().invalidate()
+        except DBAPIError:
+            db.rollback()
+            inserted = 0
+            errors = [
+                TransactionBulkError(index=position, detail="Rejected by the database")
+                for position in range(len(batch))
+            ]
+        progress.inserted += inserted
+        report(
+            [
+                TransactionBulkError(
+                    index=batch_indexes[error.index],
+                    detail=error.detail,
+                )
+                for error in errors
+            ]
+        )
+        batch.clear()
+        batch_indexes.clear()
+        return progress.model_copy(deep=True)
+
+    for index, row in enumerate(parsed):
+        progress.rows += 1
+        if row.get("skip"):
+            progress.skipped += 1
+            continue
+        batch.append(
+            {
+                "amount": row.get("amount"),
+                "occurred_at": row.get("occurred_at"),
+                "description": row.get("description"),
+                "label_id": lookup.resolve(row),
+            }
+        )
+        batch_indexes.append(index)
+        if len(batch) >= IMPORT_CHUNK_ROWS:
+            yield flush()
+
+    flush()
+    progress.done = True
+    yield progress
@@ -0,0 +1,163 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import date
+import os
+from typing import Any
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobsBusy(Exception):
+    """Raised when a job cannot be accepted without dropping unfinished work."""
+
+
+@dataclass
+class SuggestionJob:
+    start_date: date
+    end_date: date
+    summary: Any
+    work: Callable[[], Awaitable[str]]
+    id: str = field(default_factory=lambda: uuid4().hex)
+    status: str = PENDING
+    suggestion: str | None = None
+    error: str | None = None
+    version: int = 0
+    updated: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def transition(self, status: str, **fields: Any) -> None:
+        self.status = status
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        event, self.updated = self.updated, asyncio.Event()
+        event.set()
+
+
+class JobStore:
+    """Keeps at most `max_jobs` jobs, evicting the oldest finished ones first."""
+
+    def __init__(self, max_jobs: int) -> None:
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict[str, SuggestionJob] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, job_id: str) -> SuggestionJob | None:
+        return self._jobs.get(job_id)
+
+    def add(self, job: SuggestionJob) -> None:
+        if len(self._jobs) >= self.max_jobs:
+            evicted = next(
+                (key for key, item in self._jobs.items() if item.finished), None
+            )
+            if evicted is None:
+                raise JobsBusy("Too many unfinished suggestion jobs")
+            del self._jobs[evicted]
+        self._jobs[job.id] = job
+
+    def unfinished(self) -> list[SuggestionJob]:
+        return [job for job in self._jobs.values() if not job.finished]
+
+
+class SuggestionJobRunner:
+    """Runs suggestion jobs on a fixed pool of asyncio worker tasks.
+
+    Workers start lazily on the running event loop; a bounded queue keeps
+    bursts from growing memory without limit.
+    """
+
+    def __init__(self, *, workers: int, queue_size: int, max_jobs: int) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.store = JobStore(max_jobs)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[SuggestionJob] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def _ensure_started(self) -> asyncio.Queue[SuggestionJob]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            # Jobs queued on a previous loop can no longer run.
+            for job in self.store.unfinished():
+                job.transition(FAILED, error="Suggestion job interrupted")
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._tasks = [
+                loop.create_task(self._work(self._queue)) for _ in range(self.workers)
+            ]
+        return self._queue
+
+    def submit(
+        self,
+        start_date: date,
+        end_date: date,
+        summary: Any,
+        work: Callable[[], Awaitable[str]],
+    ) -> SuggestionJob:
+        queue = self._ensure_started()
+        if queue.full():
+            raise JobsBusy("Suggestion job queue is full")
+        job = SuggestionJob(start_date, end_date, summary, work)
+        self.store.add(job)
+        queue.put_nowait(job)
+        return job
+
+    async def _work(self, queue: asyncio.Queue[SuggestionJob]) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                job.transition(RUNNING)
+                suggestion = await job.work()
+            except HTTPException as exc:
+                job.transition(FAILED, error=str(exc.detail))
+            except asyncio.CancelledError:
+                job.transition(FAILED, error="Suggestion job cancelled")
+                raise
+            except Exception:
+                job.transition(FAILED, error="Suggestion job failed")
+            else:
+                job.transition(DONE, suggestion=suggestion)
+            finally:
+                queue.task_done()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "jobs": len(self.store),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "workers": self.workers,
+        }
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+
+_suggestion_jobs: SuggestionJobRunner | None = None
+
+
+def get_suggestion_jobs() -> SuggestionJobRunner:
+    global _suggestion_jobs
+    if _suggestion_jobs is None:
+        _suggestion_jobs = SuggestionJobRunner(
+            workers=int(os.environ.get("SUGGESTION_JOB_WORKERS", "4")),
+            queue_size=int(os.environ.get("SUGGESTION_JOB_QUEUE_SIZE", "100")),
+            max_jobs=int(os.environ.get("SUGGESTION_JOB_MAX_JOBS", "1000")),
+        )
+    return _suggestion_jobs
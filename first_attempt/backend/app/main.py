@@ -1,11 +1,29 @@
+from contextlib import asynccontextmanager
 import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import router as api_router
+from app.admission import admission_stats
+from app.api import NEXT_CURSOR_HEADER, router as api_router
+from app.cache import get_review_cache, get_suggestion_cache
+from app.jobs import get_suggestion_jobs
+from app.mcp_client import close_mcp_client, get_mcp_client
+from app.occurrences import get_occurrence_refresher
+from app.singleflight import get_single_flight
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    occurrence_refresher = get_occurrence_refresher()
+    occurrence_refresher.start()
+    yield
+    await occurrence_refresher.close()
+    await get_suggestion_jobs().close()
+    await close_mcp_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 _cors_origins_env = os.environ.get("CORS_ORIGINS", "").strip()
 if _cors_origins_env:
@@ -24,13 +42,26 @@ app.add_middleware(
     allow_origins=cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 app.include_router(api_router, prefix="/api")
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health() -> dict[str, object]:
+    return {"status": "ok", "mcp": get_mcp_client().health()}
+
+
+@app.get("/metrics")
+def metrics() -> dict[str, dict]:
+    return {
+        "review_cache": get_review_cache().stats(),
+        "suggestion_cache": get_suggestion_cache().stats(),
+        "suggestion_jobs": get_suggestion_jobs().stats(),
+        "admission": admission_stats(),
+        "singleflight": get_single_flight().stats(),
+        "habit_occurrences": get_occurrence_refresher().stats(),
+    }
 
 
 @app.get("/api/ping")
@@ -0,0 +1,325 @@
+import asyncio
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from app.admission import get_admission_gate
+from app.circuit_breaker import HALF_OPEN, CircuitBreaker
+
+DEFAULT_MCP_BASE_URLS = [
+    "http://localhost:8001",
+    "http://mcp_server:8001",
+    "https://ai-dev-tools-zoomcamp-project-1.onrender.com",
+]
+
+
+class MCPError(Exception):
+    """Raised when no MCP endpoint produced a usable response."""
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(detail)
+        self.detail = detail
+
+
+def _failure(errors: list[Exception]) -> MCPError:
+    if any(isinstance(error, httpx.HTTPStatusError) for error in errors):
+        error = MCPError("MCP server error")
+    else:
+        error = MCPError("MCP server unavailable")
+    if errors:
+        error.__cause__ = errors[-1]
+    return error
+
+
+def _decode(response: httpx.Response) -> Any:
+    response.raise_for_status()
+    return response.json()
+
+
+def _judged(breaker: CircuitBreaker, call: Callable[[], Any]) -> Any:
+    # Record the outcome before the future resolves, so hedged attempts that
+    # lose the race still count and callers observe an up-to-date breaker.
+    try:
+        result = call()
+    except (httpx.HTTPError, ValueError):
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record_success()
+    return result
+
+
+class MCPClient:
+    """Pooled keep-alive client that hedges requests across MCP endpoints.
+
+    The endpoint that answered last is tried first. If it has not answered
+    within `hedge_delay` seconds, or fails, the next endpoint is raced
+    against it; the first successful response wins. Latency is therefore
+    bounded by the fastest healthy endpoint rather than the sum of timeouts.
+
+    Each endpoint has a circuit breaker; endpoints whose breaker is open are
+    skipped, and when every breaker is open calls fail immediately.
+
+    Blocking calls run their attempts on a shared thread pool with one
+    worker per endpoint for each of `max_concurrency` concurrent callers, so
+    a hedged attempt never queues behind attempts stuck on a slow endpoint.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        *,
+        timeout: float = 5.0,
+        hedge_delay: float = 0.3,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+        breaker_options: dict[str, Any] | None = None,
+        max_concurrency: int = 4,
+    ) -> None:
+        if not base_urls:
+            raise ValueError("At least one MCP base URL is required")
+        self.base_urls = [url.rstrip("/") for url in base_urls]
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self._limits = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        self._client = httpx.Client(
+            timeout=timeout,
+            limits=self._limits,
+            transport=transport,
+        )
+        self._async_transport = async_transport
+        self._async_clients: WeakKeyDictionary = WeakKeyDictionary()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency * len(self.base_urls),
+            thread_name_prefix="mcp-hedge",
+        )
+        self._preferred = self.base_urls[0]
+        self._lock = threading.Lock()
+        self.breakers = {
+            url: CircuitBreaker(url, **(breaker_options or {}))
+            for url in self.base_urls
+        }
+        self._probe_stop = threading.Event()
+        self._probe_thread: threading.Thread | None = None
+
+    @property
+    def preferred(self) -> str:
+        return self._preferred
+
+    def ordered_base_urls(self) -> list[str]:
+        preferred = self._preferred
+        return [preferred] + [url for url in self.base_urls if url != preferred]
+
+    def _record_success(self, base_url: str) -> None:
+        with self._lock:
+            self._preferred = base_url
+
+    def post_json(self, path: str, payload: Any) -> Any:
+        """POST `payload` to `path`, hedged across endpoints (blocking)."""
+        remaining = self.ordered_base_urls()
+        launched: dict[Future, str] = {}
+        pending: set[Future] = set()
+        errors: list[Exception] = []
+
+        def launch() -> bool:
+            while remaining:
+                base_url = remaining.pop(0)
+                breaker = self.breakers[base_url]
+                if not breaker.allow():
+                    continue
+                future = self._executor.submit(
+                    _judged,
+                    breaker,
+                    lambda: _decode(self._client.post(base_url + path, json=payload)),
+                )
+                launched[future] = base_url
+                pending.add(future)
+                return True
+            return False
+
+        if not launch():
+            raise MCPError("MCP circuit open")
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=self.hedge_delay if remaining else None,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.discard(future)
+                try:
+                    data = future.result()
+                except (httpx.HTTPError, ValueError) as exc:
+                    errors.append(exc)
+                    continue
+                self._record_success(launched[future])
+                return data
+            launch()
+        raise _failure(errors)
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # httpx async pools are bound to the event loop that created them.
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self._limits,
+                transport=self._async_transport,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def apost_json(self, path: str, payload: Any) -> Any:
+        """Async counterpart of `post_json` for callers on the event loop."""
+        client = self._async_client()
+        remaining = self.ordered_base_urls()
+        launched: dict[asyncio.Task, str] = {}
+        pending: set[asyncio.Task] = set()
+        errors: list[Exception] = []
+
+        async def attempt(base_url: str, breaker: CircuitBreaker) -> Any:
+            try:
+                response = await client.post(base_url + path, json=payload)
+                data = _decode(response)
+            except (httpx.HTTPError, ValueError):
+                breaker.record_failure()
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            return data
+
+        def launch() -> bool:
+            while remaining:
+                base_url = remaining.pop(0)
+                breaker = self.breakers[base_url]
+                if not breaker.allow():
+                    continue
+                task = asyncio.create_task(attempt(base_url, breaker))
+                launched[task] = base_url
+                pending.add(task)
+                return True
+            return False
+
+        if not launch():
+            raise MCPError("MCP circuit open")
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        data = task.result()
+                    except (httpx.HTTPError, ValueError) as exc:
+                        errors.append(exc)
+                        continue
+                    self._record_success(launched[task])
+                    return data
+                launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise _failure(errors)
+
+    def probe_half_open(self) -> None:
+        """Send one /health probe to every endpoint whose breaker is half-open."""
+        for base_url, breaker in self.breakers.items():
+            if breaker.state != HALF_OPEN or not breaker.allow():
+                continue
+            try:
+                self._client.get(base_url + "/health").raise_for_status()
+            except httpx.HTTPError:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+    def start_health_probes(self, interval: float) -> None:
+        if self._probe_thread is not None:
+            return
+
+        def run() -> None:
+            while not self._probe_stop.wait(interval):
+                self.probe_half_open()
+
+        self._probe_thread = threading.Thread(
+            target=run,
+            name="mcp-health-probe",
+            daemon=True,
+        )
+        self._probe_thread.start()
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "preferred": self._preferred,
+            "endpoints": [breaker.snapshot() for breaker in self.breakers.values()],
+        }
+
+    def close(self) -> None:
+        self._probe_stop.set()
+        self._client.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def aclose(self) -> None:
+        """Close the running loop's async pool, then the blocking resources."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        self.close()
+
+
+def mcp_base_urls_from_env() -> list[str]:
+    """Read `MCP_BASE_URLS` (comma-separated) or `MCP_BASE_URL`."""
+    raw = os.environ.get("MCP_BASE_URLS") or os.environ.get("MCP_BASE_URL", "")
+    urls = [url.strip() for url in raw.split(",") if url.strip()]
+    return urls or list(DEFAULT_MCP_BASE_URLS)
+
+
+_mcp_client: MCPClient | None = None
+_mcp_client_lock = threading.Lock()
+
+
+def get_mcp_client() -> MCPClient:
+    global _mcp_client
+    if _mcp_client is None:
+        with _mcp_client_lock:
+            if _mcp_client is None:
+                client = MCPClient(
+                    mcp_base_urls_from_env(),
+                    timeout=float(os.environ.get("MCP_TIMEOUT_SECONDS", "5")),
+                    hedge_delay=float(
+                        os.environ.get("MCP_HEDGE_DELAY_SECONDS", "0.3")
+                    ),
+                    breaker_options={
+                        "open_seconds": float(
+                            os.environ.get("MCP_BREAKER_OPEN_SECONDS", "15")
+                        ),
+                    },
+                    # Blocking MCP calls only run behind the suggestions gate.
+                    max_concurrency=get_admission_gate("suggestions").limit,
+                )
+                client.start_health_probes(
+                    float(os.environ.get("MCP_PROBE_INTERVAL_SECONDS", "5"))
+                )
+                _mcp_client = client
+    return _mcp_client
+
+
+async def close_mcp_client() -> None:
+    global _mcp_client
+    with _mcp_client_lock:
+        client, _mcp_client = _mcp_client, None
+    if client is not None:
+        await client.aclose()
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -19,6 +20,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import CHAR, TypeDecorator
 
 from app.db import Base
+from app.habit_schedule import mask_to_values
 
 
 class GUID(TypeDecorator):
@@ -61,6 +63,7 @@ class Category(Base):
 
 class Label(Base):
     __tablename__ = "labels"
+    __table_args__ = (Index("ix_labels_category_id", "category_id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     label: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
@@ -81,6 +84,20 @@ class Label(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index(
+            "ix_transactions_occurred_at_id",
+            "occurred_at",
+            "id",
+            postgresql_include=["label_id", "amount"],
+        ),
+        Index(
+            "ix_transactions_label_id_occurred_at",
+            "label_id",
+            "occurred_at",
+            postgresql_include=["amount"],
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
@@ -115,6 +132,20 @@ class Habit(Base):
             "end_date IS NULL OR end_date >= start_date",
             name="ck_habits_end_date_after_start",
         ),
+        CheckConstraint(
+            "weekday_mask IS NULL OR weekday_mask BETWEEN 1 AND 127",
+            name="ck_habits_weekday_mask_range",
+        ),
+        CheckConstraint(
+            "month_day_mask IS NULL OR (unit = 'month' AND month_day_mask > 0)",
+            name="ck_habits_month_day_mask_monthly",
+        ),
+        CheckConstraint(
+            "set_position IS NULL OR (unit = 'month' AND weekday_mask IS NOT NULL "
+            "AND month_day_mask IS NULL AND set_position BETWEEN -5 AND 5 "
+            "AND set_position <> 0)",
+            name="ck_habits_set_position_monthly",
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
@@ -123,6 +154,14 @@ class Habit(Base):
     end_date: Mapped[date | None] = mapped_column(Date(), nullable=True)
     interval: Mapped[int] = mapped_column(Integer(), nullable=False)
     unit: Mapped[str] = mapped_column(Text(), nullable=False)
+    # Optional refinements: bit 0 of `weekday_mask` is Monday, bit 0 of
+    # `month_day_mask` is day 1; `set_position` picks the n-th (or, when
+    # negative, n-th from last) matching day of each month.
+    weekday_mask: Mapped[int | None] = mapped_column(Integer(), nullable=True)
+    month_day_mask: Mapped[int | None] = mapped_column(Integer(), nullable=True)
+    set_position: Mapped[int | None] = mapped_column(Integer(), nullable=True)
+    # Last day written to `habit_occurrences`; NULL until first materialised.
+    occurrences_through: Mapped[date | None] = mapped_column(Date(), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -134,6 +173,14 @@ class Habit(Base):
         cascade="all, delete-orphan",
     )
 
+    @property
+    def weekdays(self) -> list[int] | None:
+        return mask_to_values(self.weekday_mask)
+
+    @property
+    def month_days(self) -> list[int] | None:
+        return mask_to_values(self.month_day_mask, first=1)
+
 
 class HabitCompletion(Base):
     __tablename__ = "habit_completions"
@@ -143,6 +190,11 @@ class HabitCompletion(Base):
             "date",
             name="uq_habit_completions_habit_id_date",
         ),
+        Index(
+            "ix_habit_completions_date_habit_id",
+            "date",
+            "habit_id",
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
@@ -159,3 +211,76 @@ class HabitCompletion(Base):
     )
 
     habit: Mapped[Habit] = relationship(back_populates="completions")
+
+
+class HabitOccurrence(Base):
+    """A materialised due date, written ahead up to `Habit.occurrences_through`."""
+
+    __tablename__ = "habit_occurrences"
+    __table_args__ = (
+        Index("ix_habit_occurrences_due_date_habit_id", "due_date", "habit_id"),
+    )
+
+    habit_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    due_date: Mapped[date] = mapped_column(Date(), primary_key=True)
+
+
+class HabitCompletionMonth(Base):
+    """One month of a habit's completions as a bitset, kept in sync with
+    `habit_completions`: bit `d - 1` of `days` is set when day `d` is done.
+    """
+
+    __tablename__ = "habit_completion_months"
+    __table_args__ = (Index("ix_habit_completion_months_month", "month"),)
+
+    habit_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    month: Mapped[date] = mapped_column(Date(), primary_key=True)
+    days: Mapped[int] = mapped_column(Integer(), nullable=False)
+
+
+class HabitStats(Base):
+    """Per-habit completion counters maintained alongside `habit_completions`.
+
+    `last_run_end` is the latest completion and `last_run_length` the number
+    of consecutive due dates completed up to and including it.
+    """
+
+    __tablename__ = "habit_stats"
+
+    habit_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    completed_count: Mapped[int] = mapped_column(Integer(), nullable=False)
+    longest_streak: Mapped[int] = mapped_column(Integer(), nullable=False)
+    last_run_end: Mapped[date | None] = mapped_column(Date(), nullable=True)
+    last_run_length: Mapped[int] = mapped_column(Integer(), nullable=False)
+
+
+class SpendingDailyTotal(Base):
+    """Per-day, per-label spending rollup maintained alongside `transactions`."""
+
+    __tablename__ = "spending_daily_totals"
+
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    label_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey("labels.id"),
+        primary_key=True,
+    )
+    category_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey("categories.id"),
+        nullable=False,
+    )
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
+    count: Mapped[int] = mapped_column(Integer(), nullable=False)
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import date, timedelta
+import logging
+import os
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db import get_sessionmaker
+from app.habit_schedule import Schedule, compile_schedule
+from app.models import Habit, HabitOccurrence
+
+logger = logging.getLogger(__name__)
+
+HABIT_OCCURRENCE_HORIZON_DAYS = int(
+    os.environ.get("HABIT_OCCURRENCE_HORIZON_DAYS", "400")
+)
+
+
+def occurrence_horizon(today: date | None = None) -> date:
+    """Last day occurrences are materialised through."""
+    return (today or date.today()) + timedelta(days=HABIT_OCCURRENCE_HORIZON_DAYS)
+
+
+def _insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(HabitOccurrence)
+    if dialect == "sqlite":
+        return sqlite.insert(HabitOccurrence)
+    raise RuntimeError(f"Unsupported dialect for habit occurrences: {dialect}")
+
+
+def _write_occurrences(db: Session, habit: Habit, start: date, through: date) -> int:
+    rows = [
+        {"habit_id": habit.id, "due_date": due}
+        for due in compile_schedule(Schedule.of(habit)).expand(start, through)
+    ]
+    if rows:
+        # Another worker extending the same window writes identical rows.
+        db.execute(
+            _insert(db).on_conflict_do_nothing(index_elements=["habit_id", "due_date"]),
+            rows,
+        )
+    habit.occurrences_through = through
+    return len(rows)
+
+
+def materialise_occurrences(db: Session, habit: Habit, through: date) -> int:
+    """Rewrite `habit`'s occurrences from its start date through `through`.
+
+    Call it whenever a habit is created or its schedule changes; returns the
+    number of rows written. The caller commits.
+    """
+    db.execute(delete(HabitOccurrence).where(HabitOccurrence.habit_id == habit.id))
+    return _write_occurrences(db, habit, habit.start_date, through)
+
+
+def extend_occurrences(db: Session, through: date) -> int:
+    """Extend every habit that stops short of `through`; returns rows written.
+
+    Habits never materialised (e.g. created before the table existed) are
+    written from their start date.
+    """
+    habits = db.execute(
+        select(Habit).where(
+            or_(
+                Habit.occurrences_through.is_(None),
+                Habit.occurrences_through < through,
+            )
+        )
+    ).scalars()
+    written = 0
+    for habit in habits:
+        if habit.occurrences_through is None:
+            written += materialise_occurrences(db, habit, through)
+        else:
+            written += _write_occurrences(
+                db, habit, habit.occurrences_through + timedelta(days=1), through
+            )
+    return written
+
+
+def refresh_occurrences() -> int:
+    SessionLocal = get_sessionmaker()
+    with SessionLocal() as db:
+        written = extend_occurrences(db, occurrence_horizon())
+        db.commit()
+    return written
+
+
+class OccurrenceRefresher:
+    """Background task that keeps the occurrence horizon rolling forward."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.failures = 0
+        self.rows_written = 0
+
+    def start(self) -> None:
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.rows_written += await asyncio.to_thread(refresh_occurrences)
+                self.runs += 1
+            except Exception:
+                self.failures += 1
+                logger.exception("Extending habit occurrences failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "rows_written": self.rows_written,
+        }
+
+
+_occurrence_refresher: OccurrenceRefresher | None = None
+
+
+def get_occurrence_refresher() -> OccurrenceRefresher:
+    global _occurrence_refresher
+    if _occurrence_refresher is None:
+        _occurrence_refresher = OccurrenceRefresher(
+            interval_seconds=float(
+                os.environ.get("HABIT_OCCURRENCE_REFRESH_SECONDS", "3600")
+            )
+        )
+    return _occurrence_refresher
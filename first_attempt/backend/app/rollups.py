@@ -0,0 +1,83 @@
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Label, SpendingDailyTotal, Transaction
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(SpendingDailyTotal)
+    if dialect == "sqlite":
+        return sqlite.insert(SpendingDailyTotal)
+    raise RuntimeError(f"Unsupported dialect for rollups: {dialect}")
+
+
+def add_to_daily_totals(
+    db: Session,
+    entries: Iterable[tuple[date, UUID, UUID, Decimal]],
+) -> None:
+    """Fold new transactions into `spending_daily_totals`.
+
+    `entries` are `(day, label_id, category_id, amount)` tuples. They are
+    pre-aggregated per `(day, label_id)` and written with one upsert, in the
+    caller's transaction, so the rollup commits or rolls back with the rows.
+    """
+    grouped: dict[tuple[date, UUID], list] = {}
+    for day, label_id, category_id, amount in entries:
+        bucket = grouped.setdefault((day, label_id), [category_id, Decimal("0"), 0])
+        bucket[1] += amount
+        bucket[2] += 1
+    if not grouped:
+        return
+
+    statement = _upsert(db)
+    statement = statement.on_conflict_do_update(
+        index_elements=["day", "label_id"],
+        set_={
+            "total": SpendingDailyTotal.total + statement.excluded.total,
+            "count": SpendingDailyTotal.count + statement.excluded.count,
+        },
+    )
+    db.execute(
+        statement,
+        [
+            {
+                "day": day,
+                "label_id": label_id,
+                "category_id": category_id,
+                "total": total,
+                "count": count,
+            }
+            for (day, label_id), (category_id, total, count) in grouped.items()
+        ],
+    )
+
+
+def rebuild_daily_totals(db: Session) -> int:
+    """Regenerate `spending_daily_totals` from `transactions`; returns row count."""
+    db.execute(delete(SpendingDailyTotal))
+    aggregated = (
+        select(
+            Transaction.occurred_at,
+            Transaction.label_id,
+            Label.category_id,
+            func.sum(Transaction.amount),
+            func.count(),
+        )
+        .join(Label, Label.id == Transaction.label_id)
+        .group_by(Transaction.occurred_at, Transaction.label_id, Label.category_id)
+    )
+    result = db.execute(
+        insert(SpendingDailyTotal).from_select(
+            ["day", "label_id", "category_id", "total", "count"],
+            aggregated,
+        )
+    )
+    return result.rowcount
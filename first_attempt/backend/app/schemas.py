@@ -2,9 +2,16 @@ from datetime import date, datetime
 from decimal import Decimal
 from uuid import UUID
 
-from typing import Literal
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, WithJsonSchema, model_validator
+
+from app.habit_schedule import (
+    mask_to_values,
+    parse_rrule,
+    validate_schedule,
+    values_to_mask,
+)
 
 
 class CategoryOut(BaseModel):
@@ -49,15 +56,96 @@ class TransactionOut(TransactionBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TransactionBulkItem(TransactionCreate):
+    amount: Decimal = Field(..., max_digits=12, decimal_places=2)
+
+
+class TransactionBulkIn(BaseModel):
+    # Items stay untyped so one bad row is reported instead of failing the
+    # whole request; the documented schema is still TransactionBulkItem.
+    items: list[
+        Annotated[
+            dict[str, Any],
+            WithJsonSchema(TransactionBulkItem.model_json_schema()),
+        ]
+    ] = Field(..., max_length=10000)
+
+
+class TransactionBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class TransactionBulkOut(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[TransactionBulkError]
+
+
+class TransactionImportOut(BaseModel):
+    rows: int
+    inserted: int
+    failed: int
+    skipped: int
+    bytes_read: int
+    done: bool
+    errors: list[TransactionBulkError]
+
+
 class HabitCreate(BaseModel):
     name: str
     start_date: date
     end_date: date | None = None
     interval: int = Field(1, ge=1)
     unit: Literal["day", "week", "month"] = "day"
+    weekdays: list[Annotated[int, Field(ge=0, le=6)]] | None = Field(
+        None,
+        description="0=Monday ... 6=Sunday; filters day and month units, "
+        "picks the days of each week for the week unit",
+    )
+    month_days: list[Annotated[int, Field(ge=1, le=31)]] | None = Field(
+        None, description="Days of the month, month unit only"
+    )
+    set_position: int | None = Field(
+        None,
+        description="With unit 'month' and weekdays: the n-th matching day of "
+        "the month, counting from the end when negative (-1 = last)",
+    )
+    rrule: str | None = Field(
+        None,
+        description="RRULE subset (FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL, BYDAY, "
+        "BYMONTHDAY, BYSETPOS, UNTIL) replacing the fields above",
+        examples=["FREQ=WEEKLY;BYDAY=MO,WE,FR", "FREQ=MONTHLY;BYDAY=-1FR"],
+    )
 
     @model_validator(mode="after")
     def validate_dates(self) -> "HabitCreate":
+        if self.rrule is not None:
+            if self.model_fields_set & {
+                "interval",
+                "unit",
+                "weekdays",
+                "month_days",
+                "set_position",
+            }:
+                raise ValueError("rrule replaces interval, unit and the day fields")
+            fields = parse_rrule(self.rrule)
+            if fields["end_date"] is not None:
+                if self.end_date is not None:
+                    raise ValueError("Give either end_date or an RRULE UNTIL")
+                self.end_date = fields["end_date"]
+            self.interval = fields["interval"]
+            self.unit = fields["unit"]
+            self.weekdays = mask_to_values(fields["weekday_mask"])
+            self.month_days = mask_to_values(fields["month_day_mask"], first=1)
+            self.set_position = fields["set_position"]
+        else:
+            validate_schedule(
+                self.unit,
+                values_to_mask(self.weekdays),
+                values_to_mask(self.month_days, first=1),
+                self.set_position,
+            )
         if self.end_date and self.end_date < self.start_date:
             raise ValueError("end_date must be on or after start_date")
         return self
@@ -70,6 +158,9 @@ class HabitOut(BaseModel):
     end_date: date | None
     interval: int
     unit: Literal["day", "week", "month"]
+    weekdays: list[int] | None = None
+    month_days: list[int] | None = None
+    set_position: int | None = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -88,6 +179,45 @@ class HabitToggleOut(BaseModel):
     status: str
 
 
+class HabitDueOut(BaseModel):
+    date: date
+    id: UUID
+    name: str
+    checked: bool
+
+
+class HabitStatsOut(BaseModel):
+    id: UUID
+    name: str
+    completed: int
+    due: int
+    adherence: float
+    current_streak: int
+    longest_streak: int
+
+
+class HabitToggleBulkItem(BaseModel):
+    habit_id: UUID
+    date: date
+    checked: bool
+
+
+class HabitToggleBulkIn(BaseModel):
+    items: list[HabitToggleBulkItem] = Field(..., max_length=10000)
+
+
+class HabitToggleBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class HabitToggleBulkOut(BaseModel):
+    checked: int
+    unchecked: int
+    failed: int
+    errors: list[HabitToggleBulkError]
+
+
 class HabitForDateOut(BaseModel):
     id: UUID
     name: str
@@ -95,9 +225,26 @@ class HabitForDateOut(BaseModel):
     end_date: date | None
     interval: int
     unit: Literal["day", "week", "month"]
+    weekdays: list[int] | None = None
+    month_days: list[int] | None = None
+    set_position: int | None = None
     checked: bool
 
 
+class HabitCalendarEntryOut(BaseModel):
+    id: UUID
+    name: str
+    due: str = Field(..., description="Base64 bitmap; bit i%8 of byte i//8 is day i")
+    completed: str = Field(..., description="Base64 bitmap, same layout as due")
+
+
+class HabitCalendarOut(BaseModel):
+    start_date: date
+    end_date: date
+    days: int
+    habits: list[HabitCalendarEntryOut]
+
+
 class WeeklyReviewCategoryOut(BaseModel):
     category_key: str
     total_amount: str
@@ -110,8 +257,42 @@ class WeeklyReviewOut(BaseModel):
     by_category: list[WeeklyReviewCategoryOut]
 
 
+class ReviewPeriodOut(BaseModel):
+    period_start: date
+    period_end: date
+    total_amount: str
+    by_category: list[WeeklyReviewCategoryOut]
+
+
+class ReviewPeriodsOut(BaseModel):
+    start_date: date
+    end_date: date
+    bucket: Literal["week", "month"]
+    periods: list[ReviewPeriodOut]
+
+
+class ReviewPeriodSuggestionOut(ReviewPeriodOut):
+    suggestion: str
+
+
+class ReviewPeriodSuggestionsOut(BaseModel):
+    start_date: date
+    end_date: date
+    bucket: Literal["week", "month"]
+    periods: list[ReviewPeriodSuggestionOut]
+
+
 class WeeklyReviewSuggestionOut(BaseModel):
     start_date: date
     end_date: date
     summary: WeeklyReviewOut
     suggestion: str
+
+
+class SuggestionJobOut(BaseModel):
+    id: str
+    status: Literal["pending", "running", "done", "failed"]
+    start_date: date
+    end_date: date
+    result: WeeklyReviewSuggestionOut | None = None
+    error: str | None = None
@@ -0,0 +1,62 @@
+"""Add indexes for transaction, label and habit completion hot paths.
+
+Revision ID: a7b8c9d0e1f3
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a7b8c9d0e1f3"
+down_revision = "f6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, postgres INCLUDE columns)
+INDEXES = [
+    (
+        "ix_transactions_occurred_at_id",
+        "transactions",
+        ["occurred_at", "id"],
+        ["label_id", "amount"],
+    ),
+    (
+        "ix_transactions_label_id_occurred_at",
+        "transactions",
+        ["label_id", "occurred_at"],
+        ["amount"],
+    ),
+    ("ix_labels_category_id", "labels", ["category_id"], []),
+    (
+        "ix_habit_completions_date_habit_id",
+        "habit_completions",
+        ["date", "habit_id"],
+        [],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_include=include,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _include in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,50 @@
+"""Create spending_daily_totals rollup and backfill it from transactions.
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f3
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "spending_daily_totals",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "label_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("labels.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "category_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("categories.id"),
+            nullable=False,
+        ),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "label_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO spending_daily_totals (day, label_id, category_id, total, count)
+        SELECT t.occurred_at, t.label_id, l.category_id, SUM(t.amount), COUNT(*)
+        FROM transactions t
+        JOIN labels l ON l.id = t.label_id
+        GROUP BY t.occurred_at, t.label_id, l.category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("spending_daily_totals")
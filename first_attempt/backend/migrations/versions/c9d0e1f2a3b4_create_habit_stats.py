@@ -0,0 +1,39 @@
+"""Create habit_stats counters.
+
+Rows are filled lazily by GET /api/habits/stats or eagerly with
+scripts/rebuild_habit_stats.py.
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "c9d0e1f2a3b4"
+down_revision = "b8c9d0e1f2a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "habit_stats",
+        sa.Column(
+            "habit_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("habits.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("completed_count", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("last_run_end", sa.Date(), nullable=True),
+        sa.Column("last_run_length", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("habit_stats")
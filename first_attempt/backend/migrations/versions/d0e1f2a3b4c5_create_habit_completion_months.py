@@ -0,0 +1,53 @@
+"""Create habit_completion_months bitsets and backfill them from completions.
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-17 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "d0e1f2a3b4c5"
+down_revision = "c9d0e1f2a3b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "habit_completion_months",
+        sa.Column(
+            "habit_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("habits.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("days", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("habit_id", "month"),
+    )
+    op.create_index(
+        "ix_habit_completion_months_month",
+        "habit_completion_months",
+        ["month"],
+    )
+    op.execute(
+        """
+        INSERT INTO habit_completion_months (habit_id, month, days)
+        SELECT habit_id,
+               date_trunc('month', date)::date,
+               bit_or(1 << (extract(day FROM date)::int - 1))
+        FROM habit_completions
+        GROUP BY habit_id, date_trunc('month', date)::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_habit_completion_months_month",
+        table_name="habit_completion_months",
+    )
+    op.drop_table("habit_completion_months")
@@ -0,0 +1,59 @@
+"""Add weekday, month-day and position rules to habit schedules.
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-17 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e1f2a3b4c5d6"
+down_revision = "d0e1f2a3b4c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("habits", sa.Column("weekday_mask", sa.Integer(), nullable=True))
+    op.add_column("habits", sa.Column("month_day_mask", sa.Integer(), nullable=True))
+    op.add_column("habits", sa.Column("set_position", sa.Integer(), nullable=True))
+
+    op.create_check_constraint(
+        "ck_habits_weekday_mask_range",
+        "habits",
+        "weekday_mask IS NULL OR weekday_mask BETWEEN 1 AND 127",
+    )
+    op.create_check_constraint(
+        "ck_habits_month_day_mask_monthly",
+        "habits",
+        "month_day_mask IS NULL OR (unit = 'month' AND month_day_mask > 0)",
+    )
+    op.create_check_constraint(
+        "ck_habits_set_position_monthly",
+        "habits",
+        "set_position IS NULL OR (unit = 'month' AND weekday_mask IS NOT NULL "
+        "AND month_day_mask IS NULL AND set_position BETWEEN -5 AND 5 "
+        "AND set_position <> 0)",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "ck_habits_set_position_monthly",
+        "habits",
+        type_="check",
+    )
+    op.drop_constraint(
+        "ck_habits_month_day_mask_monthly",
+        "habits",
+        type_="check",
+    )
+    op.drop_constraint(
+        "ck_habits_weekday_mask_range",
+        "habits",
+        type_="check",
+    )
+    op.drop_column("habits", "set_position")
+    op.drop_column("habits", "month_day_mask")
+    op.drop_column("habits", "weekday_mask")
@@ -0,0 +1,50 @@
+"""Create habit_occurrences and track each habit's materialised horizon.
+
+Existing habits start with occurrences_through NULL; reads fall back to the
+computed due-date predicate until the background refresher (or
+scripts/extend_habit_occurrences.py) materialises them.
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "f2a3b4c5d6e7"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "habits", sa.Column("occurrences_through", sa.Date(), nullable=True)
+    )
+    op.create_table(
+        "habit_occurrences",
+        sa.Column(
+            "habit_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("habits.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("habit_id", "due_date"),
+    )
+    op.create_index(
+        "ix_habit_occurrences_due_date_habit_id",
+        "habit_occurrences",
+        ["due_date", "habit_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_habit_occurrences_due_date_habit_id",
+        table_name="habit_occurrences",
+    )
+    op.drop_table("habit_occurrences")
+    op.drop_column("habits", "occurrences_through")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+import timeit
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+
+from app.api import _is_habit_due  # noqa: E402
+from app.habit_schedule import (  # noqa: E402
+    Schedule,
+    compile_schedule,
+    days_in_month,
+    values_to_mask,
+)
+
+RANGE_START = date(2024, 1, 1)
+RANGE_END = date(2024, 12, 31)
+REPEATS = 50
+SCHEDULES = {
+    "every 3 days": Schedule(date(2023, 6, 1), None, 3, "day"),
+    "weekly": Schedule(date(2023, 6, 1), None, 1, "week"),
+    "monthly (31st)": Schedule(date(2023, 5, 31), None, 1, "month"),
+    "mon/wed/fri": Schedule(
+        date(2023, 6, 1), None, 1, "week", weekday_mask=values_to_mask([0, 2, 4])
+    ),
+    "last weekday": Schedule(
+        date(2023, 6, 1),
+        None,
+        1,
+        "month",
+        weekday_mask=values_to_mask(range(5)),
+        set_position=-1,
+    ),
+}
+
+
+def legacy_is_habit_due(habit, target_date: date) -> bool:
+    """`_is_habit_due` before schedules were compiled (plain schedules only)."""
+    if target_date < habit.start_date:
+        return False
+    if habit.end_date and target_date > habit.end_date:
+        return False
+    if habit.interval < 1:
+        return False
+
+    if habit.unit == "day":
+        delta_days = (target_date - habit.start_date).days
+        return delta_days % habit.interval == 0
+
+    if habit.unit == "week":
+        delta_days = (target_date - habit.start_date).days
+        return delta_days % (7 * habit.interval) == 0
+
+    if habit.unit == "month":
+        month_diff = (target_date.year - habit.start_date.year) * 12 + (
+            target_date.month - habit.start_date.month
+        )
+        if month_diff % habit.interval != 0:
+            return False
+        due_day = min(
+            habit.start_date.day,
+            days_in_month(target_date.year, target_date.month),
+        )
+        return target_date.day == due_day
+
+    return False
+
+
+def per_day(check, habit) -> list[date]:
+    """Day-by-day scan of the range, the way callers used `_is_habit_due`."""
+    due = []
+    day = RANGE_START
+    while day <= RANGE_END:
+        if check(habit, day):
+            due.append(day)
+        day += timedelta(days=1)
+    return due
+
+
+def main() -> None:
+    print(
+        f"{'schedule':<16} {'legacy scan ms':>15} {'_is_habit_due scan ms':>22}"
+        f" {'is_due scan ms':>15} {'expand ms':>10}"
+    )
+    for name, schedule in SCHEDULES.items():
+        habit = SimpleNamespace(**schedule._asdict())
+        compiled = compile_schedule(schedule)
+        expected = compiled.expand(RANGE_START, RANGE_END)
+        assert per_day(_is_habit_due, habit) == expected
+        if schedule.is_simple:
+            assert per_day(legacy_is_habit_due, habit) == expected
+            legacy = timeit.timeit(
+                lambda: per_day(legacy_is_habit_due, habit), number=REPEATS
+            )
+            legacy_ms = f"{legacy / REPEATS * 1e3:>15.3f}"
+        else:
+            legacy_ms = f"{'n/a':>15}"
+        scan = timeit.timeit(lambda: per_day(_is_habit_due, habit), number=REPEATS)
+        compiled_scan = timeit.timeit(
+            lambda: per_day(lambda _, day: compiled.is_due(day), habit),
+            number=REPEATS,
+        )
+        expand = timeit.timeit(
+            lambda: compiled.expand(RANGE_START, RANGE_END), number=REPEATS
+        )
+        print(
+            f"{name:<16} {legacy_ms} {scan / REPEATS * 1e3:>22.3f}"
+            f" {compiled_scan / REPEATS * 1e3:>15.3f}"
+            f" {expand / REPEATS * 1e3:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
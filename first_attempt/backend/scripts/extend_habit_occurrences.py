@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+
+from app.occurrences import refresh_occurrences  # noqa: E402
+
+
+def main() -> None:
+    rows = refresh_occurrences()
+    print(f"Extended habit_occurrences ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
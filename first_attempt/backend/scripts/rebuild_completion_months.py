@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+
+from app.completions import rebuild_completion_months  # noqa: E402
+from app.db import get_sessionmaker  # noqa: E402
+
+
+def main() -> None:
+    SessionLocal = get_sessionmaker()
+    with SessionLocal() as db:
+        rows = rebuild_completion_months(db)
+        db.commit()
+    print(f"Rebuilt habit_completion_months ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
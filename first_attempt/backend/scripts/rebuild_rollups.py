@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+
+from app.db import get_sessionmaker  # noqa: E402
+from app.rollups import rebuild_daily_totals  # noqa: E402
+
+
+def main() -> None:
+    SessionLocal = get_sessionmaker()
+    with SessionLocal() as db:
+        rows = rebuild_daily_totals(db)
+        db.commit()
+    print(f"Rebuilt spending_daily_totals ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
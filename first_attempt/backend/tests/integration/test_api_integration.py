@@ -17,6 +17,7 @@ if not DATABASE_URL.startswith("postgresql"):
 
 BACKEND_DIR = Path(__file__).resolve().parents[2]
 
+from app.cache import get_review_cache  # noqa: E402
 from app.main import app  # noqa: E402
 
 
@@ -44,6 +45,7 @@ def cleanup_tables() -> None:
                 "RESTART IDENTITY CASCADE"
             )
         )
+    get_review_cache().clear()
     yield
 
 
@@ -51,7 +53,7 @@ def cleanup_tables() -> None:
 def test_health_ok(client: TestClient) -> None:
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    assert response.json()["status"] == "ok"
 
 
 @pytest.mark.integration
@@ -85,6 +87,59 @@ def test_create_label_and_transaction_flow(client: TestClient) -> None:
     assert data[0]["label_id"] == label_id
 
 
+@pytest.mark.integration
+def test_bulk_transactions_copy(client: TestClient) -> None:
+    categories = client.get("/api/categories").json()
+    label_response = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    )
+    label_id = label_response.json()["id"]
+
+    items = [
+        {
+            "amount": "1.25",
+            "occurred_at": "2024-01-01",
+            "description": None if index % 2 else "Row",
+            "label_id": label_id,
+        }
+        for index in range(1000)
+    ]
+    response = client.post("/api/transactions/bulk", json={"items": items})
+    assert response.status_code == 201
+    assert response.json() == {"inserted": 1000, "failed": 0, "errors": []}
+
+    weekly = client.get(
+        "/api/reviews/weekly?start_date=2024-01-01&end_date=2024-01-07"
+    )
+    assert weekly.json()["total_amount"] == "1250.00"
+
+
+@pytest.mark.integration
+def test_review_periods_date_trunc(client: TestClient) -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+    client.post(
+        "/api/transactions/bulk",
+        json={
+            "items": [
+                {"amount": "2.00", "occurred_at": "2024-01-07", "label_id": label_id},
+                {"amount": "3.00", "occurred_at": "2024-01-08", "label_id": label_id},
+            ]
+        },
+    )
+
+    response = client.get(
+        "/api/reviews/periods?start_date=2024-01-01&end_date=2024-01-14"
+    )
+    assert response.status_code == 200
+    totals = [period["total_amount"] for period in response.json()["periods"]]
+    assert totals == ["2.00", "3.00"]
+
+
 def _mcp_available() -> bool:
     try:
         response = httpx.get(
@@ -0,0 +1,105 @@
+import ast
+from datetime import date
+import os
+from pathlib import Path
+import subprocess
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+if not DATABASE_URL.startswith("postgresql"):
+    pytest.skip(
+        "DATABASE_URL must point to Postgres to run integration tests.",
+        allow_module_level=True,
+    )
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+MCP_QUERIES = BACKEND_DIR.parent / "mcp_server" / "app" / "queries.py"
+
+from app.habit_schedule import Schedule, compile_schedule  # noqa: E402
+from app.models import Habit  # noqa: E402
+from app.occurrences import materialise_occurrences  # noqa: E402
+
+RANGE_START, RANGE_END = date(2024, 1, 15), date(2024, 12, 20)
+
+SCHEDULES = {
+    "every other day": dict(interval=2, unit="day"),
+    "weekdays": dict(interval=1, unit="day", weekday_mask=0b0011111),
+    "fortnightly": dict(interval=2, unit="week"),
+    "tue/thu every 3 weeks": dict(interval=3, unit="week", weekday_mask=0b0001010),
+    "month end": dict(interval=1, unit="month", start_date=date(2023, 12, 31)),
+    "1st and 15th": dict(interval=1, unit="month", month_day_mask=1 | 1 << 14),
+    "29th-31st bimonthly": dict(interval=2, unit="month", month_day_mask=7 << 28),
+    "2nd tuesday": dict(interval=1, unit="month", weekday_mask=0b10, set_position=2),
+    "last weekend day": dict(
+        interval=1, unit="month", weekday_mask=0b1100000, set_position=-1
+    ),
+    "5th monday": dict(interval=1, unit="month", weekday_mask=0b1, set_position=5),
+    "any friday, quarterly": dict(interval=3, unit="month", weekday_mask=0b10000),
+    "ends in june": dict(
+        interval=1, unit="week", weekday_mask=0b1000001, end_date=date(2024, 6, 30)
+    ),
+}
+
+
+def _mcp_sql(name: str) -> str:
+    # The MCP server is a separate package whose `app` would shadow ours, so
+    # read the statement from its source.
+    for node in ast.parse(MCP_QUERIES.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == name
+            for target in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise LookupError(name)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def apply_migrations() -> None:
+    subprocess.run(
+        ["alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        check=True,
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "through",
+    [None, date(2024, 5, 10)],
+    ids=["computed", "partly-materialised"],
+)
+def test_mcp_habit_adherence_matches_compile_schedule(through: date | None) -> None:
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as connection:
+        connection.execute(text("TRUNCATE TABLE habits RESTART IDENTITY CASCADE"))
+
+    with Session(engine) as db:
+        habits = []
+        for name, fields in SCHEDULES.items():
+            habit = Habit(name=name, **{"start_date": date(2024, 1, 3), **fields})
+            db.add(habit)
+            habits.append(habit)
+        db.flush()
+        if through is not None:
+            for habit in habits:
+                materialise_occurrences(db, habit, through)
+        db.commit()
+        expected = {
+            habit.id: len(
+                compile_schedule(Schedule.of(habit)).expand(RANGE_START, RANGE_END)
+            )
+            for habit in habits
+        }
+
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            _mcp_sql("HABIT_ADHERENCE_SQL"),
+            {"start_date": RANGE_START, "end_date": RANGE_END},
+        ).mappings()
+        due = {row["id"]: row["due"] for row in rows}
+
+    assert due == {habit_id: count for habit_id, count in expected.items() if count}
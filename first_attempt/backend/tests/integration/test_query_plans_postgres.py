@@ -0,0 +1,73 @@
+import os
+import subprocess
+from datetime import date
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+if not DATABASE_URL.startswith("postgresql"):
+    pytest.skip(
+        "DATABASE_URL must point to Postgres to run integration tests.",
+        allow_module_level=True,
+    )
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+from app.api import (  # noqa: E402
+    _completed_habit_ids_query,
+    _transactions_query,
+    _weekly_review_totals_query,
+)
+from app.models import Label  # noqa: E402
+
+HOT_QUERIES = {
+    "weekly_review_totals": _weekly_review_totals_query(
+        date(2024, 1, 1), date(2024, 1, 7)
+    ),
+    "completed_habit_ids": _completed_habit_ids_query(date(2024, 1, 1)),
+    "labels_by_category": select(Label.id).where(Label.category_id == uuid4()),
+    "transactions_page": _transactions_query(
+        after=(date(2024, 1, 1), uuid4())
+    ).limit(100),
+    "transactions_by_label": _transactions_query(
+        label_id=uuid4(), start_date=date(2024, 1, 1)
+    ).limit(100),
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def apply_migrations() -> None:
+    subprocess.run(
+        ["alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        check=True,
+    )
+
+
+def _node_types(node: dict) -> list[str]:
+    types = [node["Node Type"]]
+    for child in node.get("Plans", []):
+        types.extend(_node_types(child))
+    return types
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index_on_postgres(name: str) -> None:
+    engine = create_engine(DATABASE_URL)
+    compiled = HOT_QUERIES[name].compile(
+        dialect=engine.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    with engine.connect() as connection:
+        # Test tables are tiny, so ask the planner to prove an index path
+        # exists rather than letting it prefer a cheap sequential scan.
+        connection.exec_driver_sql("SET enable_seqscan = off")
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+
+    node_types = _node_types(plan[0]["Plan"])
+    assert "Seq Scan" not in node_types, node_types
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import pytest
+
+from app.admission import AdmissionGate, admit
+import app.admission as admission_module
+
+
+def test_gate_queues_then_rejects() -> None:
+    async def scenario():
+        gate = AdmissionGate("suggestions", limit=1, queue_size=1, queue_timeout=0.05)
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.queued == 1
+        with pytest.raises(HTTPException) as queue_full:
+            await gate.acquire()
+        with pytest.raises(HTTPException) as timed_out:
+            await waiter
+        gate.release()
+        await gate.acquire()
+        return gate, queue_full.value, timed_out.value
+
+    gate, queue_full, timed_out = asyncio.run(scenario())
+    assert queue_full.status_code == timed_out.status_code == 503
+    assert queue_full.headers == {"Retry-After": "1"}
+    assert gate.stats() == {
+        "limit": 1,
+        "in_flight": 1,
+        "queued": 0,
+        "admitted": 2,
+        "rejected_queue_full": 1,
+        "rejected_timeout": 1,
+    }
+
+
+def test_saturated_group_sheds_load_without_blocking_cheap_reads(
+    monkeypatch,
+) -> None:
+    gate = AdmissionGate("suggestions", limit=1, queue_size=0, queue_timeout=0.1)
+    monkeypatch.setitem(admission_module._gates, "suggestions", gate)
+    release = threading.Event()
+    app = FastAPI()
+
+    @app.get("/slow", dependencies=[Depends(admit("suggestions"))])
+    def slow() -> dict[str, str]:
+        release.wait(5)
+        return {"status": "slow"}
+
+    @app.get("/fast")
+    def fast() -> dict[str, str]:
+        return {"status": "fast"}
+
+    with TestClient(app) as client:
+        worker = threading.Thread(target=client.get, args=("/slow",))
+        worker.start()
+        deadline = time.monotonic() + 5
+        while gate.in_flight == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        shed = client.get("/slow")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "1"
+        assert client.get("/fast").json() == {"status": "fast"}
+
+        release.set()
+        worker.join(5)
+    assert gate.in_flight == 0
+    assert gate.rejected_queue_full == 1
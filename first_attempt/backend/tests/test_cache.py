@@ -0,0 +1,67 @@
+import pytest
+
+from app.cache import MemoryCacheBackend, ResultCache, SQLiteCacheBackend
+import app.cache as cache_module
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteCacheBackend(tmp_path / "cache.db", max_entries=2)
+    return MemoryCacheBackend(max_entries=2)
+
+
+def test_lru_eviction(backend) -> None:
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    assert backend.get("a") == "1"
+    backend.set("c", "3", ttl=60)
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.get("c") == "3"
+
+
+def test_ttl_expiry(backend, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    backend.set("a", "1", ttl=5)
+    assert backend.get("a") == "1"
+    now[0] += 6
+    assert backend.get("a") is None
+
+
+def test_generation_invalidates_and_counts(backend) -> None:
+    cache = ResultCache("review", backend, ttl=60)
+    assert cache.get("week") is None
+    cache.set("week", "cached")
+    assert cache.get("week") == "cached"
+    cache.invalidate()
+    assert cache.get("week") is None
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "hit_ratio": 0.3333,
+        "generation": 1,
+    }
+
+
+def test_set_uses_generation_read_before_compute(backend) -> None:
+    cache = ResultCache("review", backend, ttl=60)
+    generation = cache.generation()
+    assert cache.get("week", generation) is None
+    # A write commits and invalidates while the result is being computed.
+    cache.invalidate()
+    cache.set("week", "stale", generation)
+    assert cache.get("week") is None
+    cache.set("week", "fresh")
+    assert cache.get("week") == "fresh"
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path) -> None:
+    first = SQLiteCacheBackend(tmp_path / "cache.db")
+    second = SQLiteCacheBackend(tmp_path / "cache.db")
+    first.set("a", "1", ttl=60)
+    assert second.get("a") == "1"
+    first.bump_generation()
+    assert second.generation() == 1
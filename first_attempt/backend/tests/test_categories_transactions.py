@@ -1,14 +1,39 @@
-from uuid import uuid4
+import json
+from datetime import date, timedelta
+from uuid import UUID, uuid4
 
 from fastapi.testclient import TestClient
+import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.api import _is_habit_due
+from app.cache import get_review_cache, get_suggestion_cache
+from app.completions import completed_dates, rebuild_completion_months
 from app.db import Base, get_db
+from app.habit_schedule import decode_bitmap, values_to_mask
+from app.habit_stats import rebuild_habit_stats
+from app.jobs import SuggestionJobRunner
 from app.main import app as fastapi_app
-from app.models import Category
+from app.models import (
+    Category,
+    Habit,
+    HabitCompletionMonth,
+    HabitOccurrence,
+    HabitStats,
+    SpendingDailyTotal,
+)
+from app.occurrences import (
+    OccurrenceRefresher,
+    extend_occurrences,
+    occurrence_horizon,
+)
+from app.rollups import rebuild_daily_totals
 import app.api as api_module
+import app.ingest as ingest_module
+import app.main as main_module
 import app.models  # noqa: F401
 
 SQLALCHEMY_DATABASE_URL = "sqlite+pysqlite:///:memory:"
@@ -30,6 +55,8 @@ def setup_function():
     db.add_all([Category(id=uuid4(), key=key) for key in CATEGORY_KEYS])
     db.commit()
     db.close()
+    get_review_cache().clear()
+    get_suggestion_cache().clear()
 
 
 def override_get_db():
@@ -99,6 +126,297 @@ def test_create_and_list_transactions() -> None:
     assert data[0]["label_id"] == label_id
 
 
+def test_list_transactions_keyset_pagination_and_filters() -> None:
+    categories = client.get("/api/categories").json()
+    by_key = {item["key"]: item["id"] for item in categories}
+
+    groceries_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": by_key["supermarket"]},
+    ).json()["id"]
+    gym_id = client.post(
+        "/api/labels",
+        json={"label": "Gym", "category_id": by_key["health"]},
+    ).json()["id"]
+
+    for day, amount, label_id in [
+        ("2024-01-01", "10.00", groceries_id),
+        ("2024-01-02", "20.00", gym_id),
+        ("2024-01-02", "30.00", groceries_id),
+        ("2024-01-03", "40.00", groceries_id),
+        ("2024-01-04", "50.00", gym_id),
+    ]:
+        client.post(
+            "/api/transactions",
+            json={"amount": amount, "occurred_at": day, "label_id": label_id},
+        )
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/transactions", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len({item["id"] for item in seen}) == 5
+    dates = [item["occurred_at"] for item in seen]
+    assert dates == sorted(dates, reverse=True)
+
+    filtered = client.get(
+        "/api/transactions",
+        params={
+            "category_id": by_key["supermarket"],
+            "start_date": "2024-01-02",
+            "min_amount": "35",
+        },
+    )
+    assert filtered.status_code == 200
+    assert [item["amount"] for item in filtered.json()] == ["40.00"]
+    assert "X-Next-Cursor" not in filtered.headers
+
+    by_label = client.get("/api/transactions", params={"label_id": gym_id})
+    assert {item["amount"] for item in by_label.json()} == {"20.00", "50.00"}
+
+    invalid = client.get("/api/transactions", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+    inverted_dates = client.get(
+        "/api/transactions",
+        params={"start_date": "2024-01-05", "end_date": "2024-01-01"},
+    )
+    assert inverted_dates.status_code == 422
+
+    inverted_amounts = client.get(
+        "/api/transactions",
+        params={"min_amount": "10", "max_amount": "5"},
+    )
+    assert inverted_amounts.status_code == 422
+
+
+def test_bulk_create_transactions_reports_row_errors() -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+
+    items = [
+        {"amount": "1.00", "occurred_at": "2024-01-01", "label_id": label_id}
+        for _ in range(50)
+    ]
+    items.append(
+        {"amount": "2.00", "occurred_at": "2024-01-02", "label_id": str(uuid4())}
+    )
+    items.append(
+        {"amount": "oops", "occurred_at": "2024-01-02", "label_id": label_id}
+    )
+
+    response = client.post("/api/transactions/bulk", json={"items": items})
+    assert response.status_code == 201
+    data = response.json()
+    assert data["inserted"] == 50
+    assert data["failed"] == 2
+    assert [error["index"] for error in data["errors"]] == [50, 51]
+    assert data["errors"][0]["detail"] == "Label not found"
+    assert data["errors"][1]["detail"].startswith("amount")
+
+    listed = client.get("/api/transactions", params={"limit": 500}).json()
+    assert len(listed) == 50
+
+
+def test_bulk_create_transactions_caps_errors_and_status() -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+
+    too_precise = {
+        "amount": "1.001",
+        "occurred_at": "2024-01-01",
+        "label_id": label_id,
+    }
+    too_large = {
+        "amount": "12345678901.00",
+        "occurred_at": "2024-01-01",
+        "label_id": label_id,
+    }
+    response = client.post(
+        "/api/transactions/bulk",
+        json={"items": [too_precise, too_large] * 150},
+    )
+    assert response.status_code == 422
+    data = response.json()
+    assert data["inserted"] == 0
+    assert data["failed"] == 300
+    assert len(data["errors"]) == 100
+
+    empty = client.post("/api/transactions/bulk", json={"items": []})
+    assert empty.status_code == 200
+
+
+def test_bulk_create_transactions_database_error(monkeypatch) -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+
+    def fail_insert(db, items) -> None:
+        raise DBAPIError("COPY transactions", {}, Exception("numeric overflow"))
+
+    monkeypatch.setattr(ingest_module, "insert_transactions", fail_insert)
+    response = client.post(
+        "/api/transactions/bulk",
+        json={
+            "items": [
+                {"amount": "1.00", "occurred_at": "2024-01-01", "label_id": label_id}
+            ]
+        },
+    )
+    assert response.status_code == 422
+    assert client.get("/api/transactions").json() == []
+
+
+def test_import_csv_statement_maps_labels(monkeypatch) -> None:
+    categories = client.get("/api/categories").json()
+    client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    )
+    client.post(
+        "/api/labels",
+        json={"label": "Netflix", "category_id": categories[1]["id"]},
+    )
+    monkeypatch.setattr(ingest_module, "IMPORT_CHUNK_ROWS", 2)
+    monkeypatch.setattr(api_module, "IMPORT_READ_CHUNK_BYTES", 7)
+
+    body = (
+        "Date,Amount,Description,Label\n"
+        "2024-01-01,10.00,Weekly shop,groceries\n"
+        '2024-01-02,12.99,"Netflix",\n'
+        "2024-01-03,5.00,Mystery,\n"
+        "2024-01-04,not-a-number,Weekly shop,Groceries\n"
+        "2024-01-05,3.50,\"Multi\nline\",Groceries\n"
+    )
+    response = client.post(
+        "/api/transactions/import?progress=true",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["rows"] for event in events] == [2, 4, 5]
+    final = events[-1]
+    assert final["done"] is True
+    assert final["inserted"] == 3
+    assert final["failed"] == 2
+    assert final["bytes_read"] == len(body.encode())
+    assert [error["index"] for error in final["errors"]] == [2, 3]
+    assert final["errors"][0]["detail"] == "Label not found"
+
+    descriptions = {
+        item["description"] for item in client.get("/api/transactions").json()
+    }
+    assert descriptions == {"Weekly shop", "Netflix", "Multi\nline"}
+
+
+def test_import_ofx_statement() -> None:
+    categories = client.get("/api/categories").json()
+    client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    )
+    body = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240102120000
+<TRNAMT>-42.10
+<NAME>Corner shop
+<MEMO>Groceries
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240103
+<TRNAMT>1500.00
+<NAME>Salary
+<MEMO>Groceries
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>OTHER
+<DTPOSTED>20240104
+<TRNAMT>20.00
+<NAME>Refund
+<MEMO>Groceries
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+    response = client.post("/api/transactions/import?format=ofx", content=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rows"] == 3
+    assert data["inserted"] == 1
+    assert data["skipped"] == 2
+    assert data["failed"] == 0
+
+    transactions = client.get("/api/transactions").json()
+    assert len(transactions) == 1
+    transaction = transactions[0]
+    assert transaction["amount"] == "42.10"
+    assert transaction["occurred_at"] == "2024-01-02"
+    assert transaction["description"] == "Corner shop"
+
+
+def test_export_transactions_ndjson_and_csv(monkeypatch) -> None:
+    monkeypatch.setattr(api_module, "EXPORT_BATCH_ROWS", 2)
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+    items = [
+        {
+            "amount": f"{day}.50",
+            "occurred_at": f"2024-01-0{day}",
+            "description": "Shop, corner" if day == 1 else None,
+            "label_id": label_id,
+        }
+        for day in range(1, 6)
+    ]
+    client.post("/api/transactions/bulk", json={"items": items})
+
+    ndjson = client.get("/api/transactions/export?start_date=2024-01-02")
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [row["occurred_at"] for row in rows] == [
+        "2024-01-05",
+        "2024-01-04",
+        "2024-01-03",
+        "2024-01-02",
+    ]
+    assert rows[0]["amount"] == "5.50"
+    assert rows[0]["label_id"] == label_id
+
+    exported = client.get("/api/transactions/export?format=csv")
+    assert exported.status_code == 200
+    assert "transactions.csv" in exported.headers["content-disposition"]
+    lines = exported.text.splitlines()
+    assert lines[0] == "id,amount,occurred_at,description,label_id,created_at"
+    assert len(lines) == 6
+    assert '"Shop, corner"' in lines[-1]
+
+
 def test_weekly_review_totals() -> None:
     categories = client.get("/api/categories").json()
     supermarket = next(
@@ -143,6 +461,185 @@ def test_weekly_review_totals() -> None:
     assert by_category["supermarket"]["total_amount"] == "15.50"
 
 
+def test_daily_rollup_matches_rebuild() -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+    client.post(
+        "/api/transactions",
+        json={"amount": "4.00", "occurred_at": "2024-01-02", "label_id": label_id},
+    )
+    client.post(
+        "/api/transactions/bulk",
+        json={
+            "items": [
+                {"amount": "1.25", "occurred_at": "2024-01-02", "label_id": label_id},
+                {"amount": "2.00", "occurred_at": "2024-01-03", "label_id": label_id},
+            ]
+        },
+    )
+
+    def snapshot() -> list[tuple]:
+        db = TestingSessionLocal()
+        try:
+            rows = db.query(SpendingDailyTotal).order_by(SpendingDailyTotal.day)
+            return [(row.day.isoformat(), str(row.total), row.count) for row in rows]
+        finally:
+            db.close()
+
+    incremental = snapshot()
+    assert incremental == [("2024-01-02", "5.25", 2), ("2024-01-03", "2.00", 1)]
+
+    db = TestingSessionLocal()
+    assert rebuild_daily_totals(db) == 2
+    db.commit()
+    db.close()
+    assert snapshot() == incremental
+
+
+def test_weekly_review_cache_invalidated_by_new_transaction() -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+    url = "/api/reviews/weekly?start_date=2024-01-01&end_date=2024-01-07"
+
+    assert client.get(url).json()["total_amount"] == "0.00"
+    assert client.get(url).json()["total_amount"] == "0.00"
+    stats = client.get("/metrics").json()["review_cache"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    client.post(
+        "/api/transactions",
+        json={"amount": "3.00", "occurred_at": "2024-01-02", "label_id": label_id},
+    )
+    assert client.get(url).json()["total_amount"] == "3.00"
+    stats = client.get("/metrics").json()["review_cache"]
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_weekly_review_write_during_compute_is_not_cached(monkeypatch) -> None:
+    categories = client.get("/api/categories").json()
+    label_id = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories[0]["id"]},
+    ).json()["id"]
+    url = "/api/reviews/weekly?start_date=2024-01-01&end_date=2024-01-07"
+    original = api_module._weekly_review_summary
+
+    def summary_then_write(db, start_date, end_date):
+        summary = original(db, start_date, end_date)
+        # A transaction commits after the rows were read, before caching.
+        client.post(
+            "/api/transactions",
+            json={"amount": "3.00", "occurred_at": "2024-01-02", "label_id": label_id},
+        )
+        return summary
+
+    monkeypatch.setattr(api_module, "_weekly_review_summary", summary_then_write)
+    assert client.get(url).json()["total_amount"] == "0.00"
+    monkeypatch.setattr(api_module, "_weekly_review_summary", original)
+    assert client.get(url).json()["total_amount"] == "3.00"
+
+
+def test_review_periods_weekly_and_monthly_buckets() -> None:
+    categories = {
+        item["key"]: item["id"] for item in client.get("/api/categories").json()
+    }
+    groceries = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories["supermarket"]},
+    ).json()["id"]
+    rent = client.post(
+        "/api/labels",
+        json={"label": "Rent", "category_id": categories["house"]},
+    ).json()["id"]
+    items = [
+        {"amount": "10.00", "occurred_at": "2024-01-07", "label_id": groceries},
+        {"amount": "5.00", "occurred_at": "2024-01-08", "label_id": groceries},
+        {"amount": "500.00", "occurred_at": "2024-01-14", "label_id": rent},
+        {"amount": "7.00", "occurred_at": "2024-02-01", "label_id": groceries},
+    ]
+    client.post("/api/transactions/bulk", json={"items": items})
+
+    weekly = client.get(
+        "/api/reviews/periods?start_date=2024-01-03&end_date=2024-01-21"
+    )
+    assert weekly.status_code == 200
+    periods = weekly.json()["periods"]
+    assert [(p["period_start"], p["period_end"]) for p in periods] == [
+        ("2024-01-03", "2024-01-07"),
+        ("2024-01-08", "2024-01-14"),
+        ("2024-01-15", "2024-01-21"),
+    ]
+    assert [p["total_amount"] for p in periods] == ["10.00", "505.00", "0.00"]
+    assert [c["category_key"] for c in periods[1]["by_category"]] == [
+        "house",
+        "supermarket",
+    ]
+
+    monthly = client.get(
+        "/api/reviews/periods?start_date=2024-01-01&end_date=2024-02-29&bucket=month"
+    )
+    assert [p["total_amount"] for p in monthly.json()["periods"]] == [
+        "515.00",
+        "7.00",
+    ]
+
+    inverted = client.get(
+        "/api/reviews/periods?start_date=2024-02-01&end_date=2024-01-01"
+    )
+    assert inverted.status_code == 422
+
+
+def test_review_period_suggestions_batch_uncached_prompts(monkeypatch) -> None:
+    calls = []
+
+    class FakeMCPClient:
+        def post_json(self, path: str, payload: dict) -> dict:
+            calls.append((path, payload["summaries"]))
+            return {
+                "suggestions": [
+                    f"Advice {summary['total_amount']}"
+                    for summary in payload["summaries"]
+                ]
+            }
+
+    monkeypatch.setattr(api_module, "get_mcp_client", FakeMCPClient)
+    categories = {
+        item["key"]: item["id"] for item in client.get("/api/categories").json()
+    }
+    groceries = client.post(
+        "/api/labels",
+        json={"label": "Groceries", "category_id": categories["supermarket"]},
+    ).json()["id"]
+    client.post(
+        "/api/transactions",
+        json={"amount": "12.00", "occurred_at": "2024-01-09", "label_id": groceries},
+    )
+    url = "/api/reviews/periods/suggestions?start_date=2024-01-01&end_date=2024-01-21"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    periods = response.json()["periods"]
+    assert [p["total_amount"] for p in periods] == ["0.00", "12.00", "0.00"]
+    assert all(p["suggestion"].startswith("Advice") for p in periods)
+    assert periods[0]["suggestion"] == periods[2]["suggestion"]
+    # Two empty weeks share one summary, so only two go out in one call.
+    assert len(calls) == 1
+    assert calls[0][0] == "/suggest-weekly-review/batch"
+    assert calls[0][1] == [
+        {"version": 1, "total_amount": 0.0, "categories": {}},
+        {"version": 1, "total_amount": 12.0, "categories": {"supermarket": 12.0}},
+    ]
+
+    assert client.get(url).status_code == 200
+    assert len(calls) == 1
+
+
 def test_weekly_review_suggestion(monkeypatch) -> None:
     categories = client.get("/api/categories").json()
     supermarket = next(
@@ -180,6 +677,69 @@ def test_weekly_review_suggestion(monkeypatch) -> None:
     assert data["summary"]["total_amount"] == "8.00"
 
 
+def test_weekly_review_suggestion_served_from_content_cache(monkeypatch) -> None:
+    prompts = []
+
+    class FakeMCPClient:
+        def post_json(self, path: str, payload: dict) -> dict:
+            prompts.append(payload["summary"])
+            return {"suggestion": "Cached advice"}
+
+    monkeypatch.setattr(api_module, "get_mcp_client", FakeMCPClient)
+    url = "/api/reviews/weekly/suggestion?start_date=2024-01-01&end_date=2024-01-07"
+
+    first = client.get(url)
+    # Another week with the same totals produces the same summary payload.
+    second = client.get(
+        "/api/reviews/weekly/suggestion?start_date=2024-02-05&end_date=2024-02-11"
+    )
+    assert first.json()["suggestion"] == "Cached advice"
+    assert second.json()["suggestion"] == "Cached advice"
+    assert len(prompts) == 1
+
+    stats = client.get("/metrics").json()["suggestion_cache"]
+    assert stats["hits"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_weekly_review_suggestion_job_poll_and_events(monkeypatch) -> None:
+    class FakeMCPClient:
+        async def apost_json(self, path: str, payload: dict) -> dict:
+            return {"suggestion": "Async advice"}
+
+    runner = SuggestionJobRunner(workers=1, queue_size=4, max_jobs=4)
+    monkeypatch.setattr(api_module, "get_mcp_client", FakeMCPClient)
+    monkeypatch.setattr(api_module, "get_suggestion_jobs", lambda: runner)
+    monkeypatch.setattr(
+        main_module,
+        "get_occurrence_refresher",
+        lambda: OccurrenceRefresher(interval_seconds=0),
+    )
+
+    with TestClient(fastapi_app) as job_client:
+        created = job_client.post(
+            "/api/reviews/weekly/suggestion/jobs"
+            "?start_date=2024-01-01&end_date=2024-01-07"
+        )
+        assert created.status_code == 202
+        job_id = created.json()["id"]
+        assert created.headers["location"].endswith(f"/jobs/{job_id}")
+
+        with job_client.stream(
+            "GET", f"/api/reviews/weekly/suggestion/jobs/{job_id}/events"
+        ) as events:
+            body = "".join(events.iter_text())
+        assert "event: done" in body
+
+        polled = job_client.get(f"/api/reviews/weekly/suggestion/jobs/{job_id}")
+        assert polled.json()["status"] == "done"
+        assert polled.json()["result"]["suggestion"] == "Async advice"
+        assert polled.json()["result"]["summary"]["total_amount"] == "0.00"
+
+    missing = client.get("/api/reviews/weekly/suggestion/jobs/unknown")
+    assert missing.status_code == 404
+
+
 def create_habit(
     *,
     name: str,
@@ -187,12 +747,14 @@ def create_habit(
     end_date: str | None = None,
     interval: int = 1,
     unit: str = "day",
+    **schedule,
 ) -> dict:
     payload = {
         "name": name,
         "start_date": start_date,
         "interval": interval,
         "unit": unit,
+        **schedule,
     }
     if end_date is not None:
         payload["end_date"] = end_date
@@ -311,9 +873,368 @@ def test_habits_monthly_last_day_rule() -> None:
     assert habit_id not in not_due_ids
 
 
+@pytest.mark.parametrize("materialised", [True, False])
+def test_habits_for_date_sql_predicate_matches_python_rule(materialised: bool) -> None:
+    habits = [
+        create_habit(name="Daily", start_date="2024-01-30", interval=3),
+        create_habit(
+            name="Weekly", start_date="2024-01-29", end_date="2024-03-31", unit="week"
+        ),
+        create_habit(
+            name="Quarterly", start_date="2023-11-30", interval=3, unit="month"
+        ),
+        create_habit(
+            name="Weekdays", start_date="2024-01-31", interval=2, weekdays=[0, 2, 4]
+        ),
+        create_habit(
+            name="Fortnightly",
+            start_date="2024-02-01",
+            interval=2,
+            unit="week",
+            weekdays=[1, 3, 6],
+        ),
+        create_habit(
+            name="Last weekday",
+            start_date="2024-01-15",
+            unit="month",
+            weekdays=[0, 1, 2, 3, 4],
+            set_position=-1,
+        ),
+        create_habit(
+            name="Second Monday",
+            start_date="2024-01-01",
+            unit="month",
+            weekdays=[0],
+            set_position=2,
+        ),
+        create_habit(
+            name="Paydays",
+            start_date="2024-01-01",
+            interval=2,
+            unit="month",
+            month_days=[1, 15, 31],
+        ),
+    ]
+    by_id = {
+        habit["id"]: Habit(
+            start_date=date.fromisoformat(habit["start_date"]),
+            end_date=habit["end_date"] and date.fromisoformat(habit["end_date"]),
+            interval=habit["interval"],
+            unit=habit["unit"],
+            weekday_mask=values_to_mask(habit["weekdays"]),
+            month_day_mask=values_to_mask(habit["month_days"], first=1),
+            set_position=habit["set_position"],
+        )
+        for habit in habits
+    }
+    if not materialised:
+        # Past the horizon the computed SQL predicate answers instead.
+        db = TestingSessionLocal()
+        db.query(HabitOccurrence).delete()
+        db.query(Habit).update({Habit.occurrences_through: None})
+        db.commit()
+        db.close()
+    day = date(2024, 1, 25)
+    while day <= date(2024, 6, 5):
+        response = client.get(f"/api/habits/for-date?date={day.isoformat()}")
+        due_ids = {item["id"] for item in response.json()}
+        expected = {
+            habit_id for habit_id, habit in by_id.items() if _is_habit_due(habit, day)
+        }
+        assert due_ids == expected, day
+        day += timedelta(days=1)
+
+
+def test_create_habit_from_rrule() -> None:
+    response = client.post(
+        "/api/habits",
+        json={
+            "name": "Review budget",
+            "start_date": "2024-01-01",
+            "rrule": "FREQ=MONTHLY;BYDAY=-1FR;UNTIL=20241231",
+        },
+    )
+    assert response.status_code == 201
+    habit = response.json()
+    assert habit["unit"] == "month"
+    assert habit["weekdays"] == [4]
+    assert habit["set_position"] == -1
+    assert habit["end_date"] == "2024-12-31"
+
+    due = client.get("/api/habits/for-date?date=2024-05-31").json()
+    assert habit["id"] in {item["id"] for item in due}
+    not_due = client.get("/api/habits/for-date?date=2024-05-24").json()
+    assert habit["id"] not in {item["id"] for item in not_due}
+
+    calendar = client.get(
+        "/api/habits/calendar?start_date=2024-01-01&end_date=2024-03-31"
+    ).json()
+    entry = next(item for item in calendar["habits"] if item["id"] == habit["id"])
+    assert decode_bitmap(entry["due"], calendar["days"]) == [25, 53, 88]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"rrule": "FREQ=YEARLY"},
+        {"rrule": "FREQ=WEEKLY;COUNT=3"},
+        {"rrule": "FREQ=WEEKLY", "unit": "week"},
+        {"unit": "week", "month_days": [1]},
+        {"unit": "month", "set_position": 1},
+        {"weekdays": [7]},
+    ],
+)
+def test_create_habit_rejects_unsupported_schedules(payload: dict) -> None:
+    response = client.post(
+        "/api/habits", json={"name": "Bad", "start_date": "2024-01-01", **payload}
+    )
+    assert response.status_code == 422
+
+
+def test_habit_occurrences_materialised_and_extended() -> None:
+    habit = create_habit(name="Walk", start_date="2024-01-01")
+    habit_id = UUID(habit["id"])
+    horizon = occurrence_horizon()
+
+    db = TestingSessionLocal()
+    assert db.get(Habit, habit_id).occurrences_through == horizon
+    assert (
+        db.query(HabitOccurrence).filter_by(habit_id=habit_id).count()
+        == (horizon - date(2024, 1, 1)).days + 1
+    )
+    # Reads trust the table: without the row the habit is not due that day.
+    db.query(HabitOccurrence).filter_by(
+        habit_id=habit_id, due_date=date(2024, 1, 5)
+    ).delete()
+    db.commit()
+    for_date = client.get("/api/habits/for-date?date=2024-01-05").json()
+    assert habit["id"] not in {item["id"] for item in for_date}
+    toggle = client.post(
+        f"/api/habits/{habit['id']}/toggle", json={"date": "2024-01-05"}
+    )
+    assert toggle.status_code == 400
+
+    db.query(HabitOccurrence).filter(
+        HabitOccurrence.habit_id == habit_id,
+        HabitOccurrence.due_date > date(2024, 1, 10),
+    ).delete()
+    db.get(Habit, habit_id).occurrences_through = date(2024, 1, 10)
+    db.commit()
+    for_date = client.get("/api/habits/for-date?date=2024-02-01").json()
+    assert habit["id"] in {item["id"] for item in for_date}
+
+    assert extend_occurrences(db, date(2024, 3, 1)) == 51
+    db.commit()
+    assert db.get(Habit, habit_id).occurrences_through == date(2024, 3, 1)
+    assert extend_occurrences(db, date(2024, 3, 1)) == 0
+    db.close()
+
+
+def test_list_habits_due_for_range() -> None:
+    gym = create_habit(name="Gym", start_date="2024-03-01", weekdays=[0, 2, 4])
+    read = create_habit(name="Read", start_date="2024-03-05", interval=2)
+    client.post(f"/api/habits/{gym['id']}/toggle", json={"date": "2024-03-04"})
+    client.post(f"/api/habits/{read['id']}/toggle", json={"date": "2024-03-07"})
+    db = TestingSessionLocal()
+    db.query(HabitOccurrence).filter_by(habit_id=UUID(read["id"])).delete()
+    db.get(Habit, UUID(read["id"])).occurrences_through = None
+    db.commit()
+    db.close()
+
+    response = client.get("/api/habits/due?start_date=2024-03-04&end_date=2024-03-10")
+    assert response.status_code == 200
+    assert [
+        (item["date"], item["name"], item["checked"]) for item in response.json()
+    ] == [
+        ("2024-03-04", "Gym", True),
+        ("2024-03-05", "Read", False),
+        ("2024-03-06", "Gym", False),
+        ("2024-03-07", "Read", True),
+        ("2024-03-08", "Gym", False),
+        ("2024-03-09", "Read", False),
+    ]
+
+    inverted = client.get("/api/habits/due?start_date=2024-03-10&end_date=2024-03-04")
+    assert inverted.status_code == 422
+
+
+def test_habits_toggle_bulk() -> None:
+    daily = create_habit(name="Read", start_date="2024-03-01")
+    weekly = create_habit(name="Review", start_date="2024-03-04", unit="week")
+    client.post(f"/api/habits/{daily['id']}/toggle", json={"date": "2024-03-01"})
+
+    response = client.post(
+        "/api/habits/toggle/bulk",
+        json={
+            "items": [
+                {"habit_id": daily["id"], "date": "2024-03-01", "checked": False},
+                {"habit_id": daily["id"], "date": "2024-03-02", "checked": False},
+                {"habit_id": daily["id"], "date": "2024-03-02", "checked": True},
+                {"habit_id": daily["id"], "date": "2024-03-03", "checked": True},
+                {"habit_id": weekly["id"], "date": "2024-03-05", "checked": True},
+                {"habit_id": str(uuid4()), "date": "2024-03-05", "checked": True},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "checked": 2,
+        "unchecked": 1,
+        "failed": 2,
+        "errors": [
+            {"index": 4, "detail": "Habit not scheduled for this date"},
+            {"index": 5, "detail": "Habit not found"},
+        ],
+    }
+    completed = [
+        client.get(f"/api/habits/completions?date=2024-03-0{day}").json()[
+            "completed_habit_ids"
+        ]
+        for day in (1, 2, 3)
+    ]
+    assert completed == [[], [daily["id"]], [daily["id"]]]
+
+    rejected = client.post(
+        "/api/habits/toggle/bulk",
+        json={
+            "items": [
+                {"habit_id": weekly["id"], "date": "2024-03-05", "checked": True}
+            ]
+        },
+    )
+    assert rejected.status_code == 422
+
+
+def test_habit_stats_streaks_and_adherence() -> None:
+    habit = create_habit(name="Meditate", start_date="2024-03-01")
+    create_habit(name="Stretch", start_date="2024-03-01", interval=2)
+
+    def toggle(day: str) -> None:
+        client.post(f"/api/habits/{habit['id']}/toggle", json={"date": day})
+
+    def stats(as_of: str) -> dict:
+        response = client.get(f"/api/habits/stats?date={as_of}")
+        assert response.status_code == 200
+        return next(item for item in response.json() if item["id"] == habit["id"])
+
+    for day in ("2024-03-01", "2024-03-02", "2024-03-03"):
+        toggle(day)
+    assert stats("2024-03-03") == {
+        "id": habit["id"],
+        "name": "Meditate",
+        "completed": 3,
+        "due": 3,
+        "adherence": 1.0,
+        "current_streak": 3,
+        "longest_streak": 3,
+    }
+    assert stats("2024-03-04")["current_streak"] == 3
+    assert stats("2024-03-05")["current_streak"] == 0
+    assert stats("2024-03-05")["adherence"] == 0.6
+
+    toggle("2024-03-02")
+    assert stats("2024-03-03")["longest_streak"] == 1
+    toggle("2024-03-05")
+    toggle("2024-03-02")
+    assert stats("2024-03-05")["longest_streak"] == 3
+    assert stats("2024-03-05")["current_streak"] == 1
+
+    db = TestingSessionLocal()
+    incremental = {
+        row.habit_id: (
+            row.completed_count,
+            row.longest_streak,
+            row.last_run_end,
+            row.last_run_length,
+        )
+        for row in db.query(HabitStats)
+    }
+    assert rebuild_habit_stats(db) == 2
+    db.commit()
+    rebuilt = {
+        row.habit_id: (
+            row.completed_count,
+            row.longest_streak,
+            row.last_run_end,
+            row.last_run_length,
+        )
+        for row in db.query(HabitStats)
+    }
+    db.close()
+    assert incremental == rebuilt
+
+
+def test_habit_completion_months_track_toggles() -> None:
+    habit = create_habit(name="Journal", start_date="2024-01-01")
+    for day in ("2024-01-01", "2024-01-31", "2024-02-01", "2024-02-29"):
+        client.post(f"/api/habits/{habit['id']}/toggle", json={"date": day})
+    client.post(f"/api/habits/{habit['id']}/toggle", json={"date": "2024-02-01"})
+    client.post(
+        "/api/habits/toggle/bulk",
+        json={
+            "items": [
+                {"habit_id": habit["id"], "date": "2024-03-05", "checked": True},
+                {"habit_id": habit["id"], "date": "2024-02-29", "checked": False},
+            ]
+        },
+    )
+
+    db = TestingSessionLocal()
+    months = {
+        row.month.isoformat(): row.days
+        for row in db.query(HabitCompletionMonth).filter_by(
+            habit_id=UUID(habit["id"])
+        )
+    }
+    # February is emptied again, so its row is gone.
+    assert months == {"2024-01-01": 1 | 1 << 30, "2024-03-01": 1 << 4}
+    assert completed_dates(db, date(2024, 1, 15), date(2024, 3, 5)) == {
+        UUID(habit["id"]): [date(2024, 1, 31), date(2024, 3, 5)]
+    }
+
+    rebuild_completion_months(db)
+    db.commit()
+    rebuilt = {
+        row.month.isoformat(): row.days
+        for row in db.query(HabitCompletionMonth).filter_by(
+            habit_id=UUID(habit["id"])
+        )
+    }
+    db.close()
+    assert rebuilt == months
+
+
 def test_habit_toggle_unknown_habit() -> None:
     response = client.post(
         f"/api/habits/{uuid4()}/toggle",
         json={"date": "2024-02-01"},
     )
     assert response.status_code == 404
+
+
+def test_habit_calendar_bitmaps() -> None:
+    daily = create_habit(name="Walk", start_date="2024-03-02", interval=2)
+    monthly = create_habit(
+        name="Budget", start_date="2024-01-31", interval=1, unit="month"
+    )
+    create_habit(name="Old", start_date="2023-01-01", end_date="2023-12-31")
+    client.post(f"/api/habits/{daily['id']}/toggle", json={"date": "2024-03-04"})
+
+    response = client.get(
+        "/api/habits/calendar?start_date=2024-02-28&end_date=2024-03-05"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["days"] == 7
+    by_name = {entry["name"]: entry for entry in data["habits"]}
+    assert set(by_name) == {"Walk", "Budget"}
+    assert decode_bitmap(by_name["Walk"]["due"], 7) == [3, 5]
+    assert decode_bitmap(by_name["Walk"]["completed"], 7) == [5]
+    assert decode_bitmap(by_name["Budget"]["due"], 7) == [1]
+    assert decode_bitmap(by_name["Budget"]["completed"], 7) == []
+
+    inverted = client.get(
+        "/api/habits/calendar?start_date=2024-03-05&end_date=2024-03-01"
+    )
+    assert inverted.status_code == 422
+
@@ -0,0 +1,98 @@
+import time
+
+import httpx
+import pytest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.mcp_client import MCPClient, MCPError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "mcp",
+        window_seconds=10,
+        min_calls=4,
+        failure_ratio=0.5,
+        open_seconds=5,
+        clock=clock,
+    )
+
+
+def test_opens_on_error_rate_and_recovers_through_half_open() -> None:
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    clock.now += 5
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 5
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls"] == 1
+
+
+def test_old_outcomes_leave_the_window() -> None:
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 11
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls"] == 1
+
+
+def test_client_fails_fast_when_every_breaker_is_open() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "ok"})
+        raise httpx.ConnectError("refused", request=request)
+
+    client = MCPClient(
+        ["http://mcp:8001"],
+        transport=httpx.MockTransport(handler),
+        breaker_options={"min_calls": 2, "open_seconds": 0.05},
+    )
+    try:
+        for _ in range(2):
+            with pytest.raises(MCPError):
+                client.post_json("/suggest-weekly-review", {"input": "x"})
+        assert client.breakers["http://mcp:8001"].state == OPEN
+
+        calls.clear()
+        started = time.perf_counter()
+        with pytest.raises(MCPError) as excinfo:
+            client.post_json("/suggest-weekly-review", {"input": "x"})
+        assert time.perf_counter() - started < 0.05
+        assert excinfo.value.detail == "MCP circuit open"
+        assert calls == []
+
+        time.sleep(0.06)
+        client.probe_half_open()
+        assert calls == ["/health"]
+        assert client.health()["endpoints"][0]["state"] == CLOSED
+    finally:
+        client.close()
@@ -0,0 +1,212 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import _is_habit_due
+from app.habit_schedule import (
+    Schedule,
+    compile_schedule,
+    days_in_month,
+    decode_bitmap,
+    encode_bitmap,
+    parse_rrule,
+    values_to_mask,
+)
+
+
+def test_monthly_occurrences_clamp_to_month_end() -> None:
+    schedule = compile_schedule(Schedule(date(2024, 1, 31), None, 1, "month"))
+    due = schedule.expand(date(2024, 1, 1), date(2024, 4, 30))
+    assert due == [
+        date(2024, 1, 31),
+        date(2024, 2, 29),
+        date(2024, 3, 31),
+        date(2024, 4, 30),
+    ]
+
+
+@pytest.mark.parametrize("unit", ["day", "week", "month"])
+@pytest.mark.parametrize("interval", [1, 2, 3])
+def test_occurrences_match_is_habit_due(unit: str, interval: int) -> None:
+    habit = SimpleNamespace(
+        start_date=date(2023, 11, 30),
+        end_date=date(2024, 9, 15),
+        interval=interval,
+        unit=unit,
+        weekday_mask=None,
+        month_day_mask=None,
+        set_position=None,
+    )
+    range_start, range_end = date(2024, 1, 10), date(2024, 12, 31)
+    expected = [
+        range_start + timedelta(days=offset)
+        for offset in range((range_end - range_start).days + 1)
+        if _is_habit_due(habit, range_start + timedelta(days=offset))
+    ]
+    schedule = compile_schedule(Schedule.of(habit))
+    assert schedule.expand(range_start, range_end) == expected
+
+
+def test_bitmap_round_trip() -> None:
+    encoded = encode_bitmap([0, 7, 8, 30], 31)
+    assert decode_bitmap(encoded, 31) == [0, 7, 8, 30]
+    assert encode_bitmap([], 0) == ""
+
+
+@pytest.mark.parametrize(
+    ("interval", "unit", "on_or_before", "expected_last", "expected_count"),
+    [
+        (3, "day", date(2024, 1, 9), date(2024, 1, 7), 3),
+        (1, "week", date(2024, 1, 31), date(2024, 1, 29), 5),
+        (1, "month", date(2024, 4, 29), date(2024, 3, 31), 3),
+        (2, "month", date(2024, 3, 31), date(2024, 3, 31), 2),
+        (1, "day", date(2023, 12, 31), None, 0),
+    ],
+)
+def test_last_on_or_before_and_count_through(
+    interval: int,
+    unit: str,
+    on_or_before: date,
+    expected_last: date | None,
+    expected_count: int,
+) -> None:
+    start_date = date(2024, 1, 1) if unit != "month" else date(2024, 1, 31)
+    schedule = compile_schedule(Schedule(start_date, None, interval, unit))
+    assert schedule.last_on_or_before(on_or_before) == expected_last
+    assert schedule.count_through(on_or_before) == expected_count
+
+
+def _reference_is_due(schedule: Schedule, day: date) -> bool:
+    """Day-by-day statement of the schedule rules, independent of compilation."""
+    if day < schedule.start_date:
+        return False
+    if schedule.end_date is not None and day > schedule.end_date:
+        return False
+    weekdays = schedule.weekday_mask
+    on_weekday = weekdays is None or bool(weekdays >> day.weekday() & 1)
+    if schedule.unit == "day":
+        elapsed = (day - schedule.start_date).days
+        return elapsed % schedule.interval == 0 and on_weekday
+    if schedule.unit == "week":
+        if weekdays is None:
+            return (day - schedule.start_date).days % (7 * schedule.interval) == 0
+        start = schedule.start_date
+        weeks = (day - (start - timedelta(days=start.weekday()))).days // 7
+        return on_weekday and weeks % schedule.interval == 0
+    months = (day.year - schedule.start_date.year) * 12 + (
+        day.month - schedule.start_date.month
+    )
+    if months % schedule.interval:
+        return False
+    length = days_in_month(day.year, day.month)
+    if schedule.is_simple:
+        return day.day == min(schedule.start_date.day, length)
+    candidates = [
+        candidate
+        for candidate in (day.replace(day=number) for number in range(1, length + 1))
+        if (weekdays is None or weekdays >> candidate.weekday() & 1)
+        and (
+            schedule.month_day_mask is None
+            or schedule.month_day_mask >> (candidate.day - 1) & 1
+        )
+    ]
+    position = schedule.set_position
+    if position is not None:
+        index = position - 1 if position > 0 else len(candidates) + position
+        in_month = 0 <= index < len(candidates)
+        candidates = candidates[index : index + 1] if in_month else []
+    return day in candidates
+
+
+RICH_SCHEDULES = [
+    Schedule(date(2024, 1, 3), None, 1, "week", weekday_mask=values_to_mask([0, 2, 4])),
+    Schedule(date(2024, 1, 3), None, 2, "week", weekday_mask=values_to_mask([1, 3])),
+    Schedule(date(2024, 1, 2), None, 3, "day", weekday_mask=values_to_mask(range(5))),
+    Schedule(
+        date(2024, 1, 10),
+        date(2025, 2, 20),
+        1,
+        "month",
+        weekday_mask=values_to_mask(range(5)),
+        set_position=-1,
+    ),
+    Schedule(
+        date(2024, 1, 1),
+        None,
+        1,
+        "month",
+        weekday_mask=values_to_mask([0]),
+        set_position=2,
+    ),
+    Schedule(
+        date(2024, 1, 20),
+        None,
+        2,
+        "month",
+        month_day_mask=values_to_mask([1, 15, 31], 1),
+    ),
+    Schedule(
+        date(2024, 1, 1),
+        None,
+        1,
+        "month",
+        weekday_mask=values_to_mask([5, 6]),
+        month_day_mask=values_to_mask(range(1, 8), 1),
+    ),
+    Schedule(date(2023, 12, 31), None, 1, "month"),
+]
+
+
+@pytest.mark.parametrize("schedule", RICH_SCHEDULES)
+def test_compiled_schedule_matches_reference(schedule: Schedule) -> None:
+    compiled = compile_schedule(schedule)
+    range_start, range_end = date(2023, 12, 1), date(2025, 3, 31)
+    days = [
+        range_start + timedelta(days=offset)
+        for offset in range((range_end - range_start).days + 1)
+    ]
+    expected = [day for day in days if _reference_is_due(schedule, day)]
+
+    assert expected
+    assert [day for day in days if compiled.is_due(day)] == expected
+    assert compiled.expand(range_start, range_end) == expected
+    assert compiled.expand(date(2024, 2, 10), date(2024, 2, 20)) == [
+        day for day in expected if date(2024, 2, 10) <= day <= date(2024, 2, 20)
+    ]
+    for probe in (date(2024, 1, 31), date(2024, 2, 29), date(2024, 9, 14), range_end):
+        before = [day for day in expected if day <= probe]
+        assert compiled.last_on_or_before(probe) == (before[-1] if before else None)
+        assert compiled.count_through(probe) == len(before)
+
+
+def test_compile_schedule_is_cached() -> None:
+    schedule = RICH_SCHEDULES[0]
+    assert compile_schedule(schedule) is compile_schedule(
+        Schedule(**schedule._asdict())
+    )
+
+
+def test_parse_rrule() -> None:
+    assert parse_rrule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,FR") == {
+        "unit": "week",
+        "interval": 2,
+        "end_date": None,
+        "weekday_mask": values_to_mask([0, 2, 4]),
+        "month_day_mask": None,
+        "set_position": None,
+    }
+    last_weekday = parse_rrule("FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1")
+    assert last_weekday["weekday_mask"] == 0b11111
+    assert last_weekday["set_position"] == -1
+    assert parse_rrule("FREQ=MONTHLY;BYMONTHDAY=1,15;UNTIL=20241231T000000Z") == {
+        "unit": "month",
+        "interval": 1,
+        "end_date": date(2024, 12, 31),
+        "weekday_mask": None,
+        "month_day_mask": values_to_mask([1, 15], 1),
+        "set_position": None,
+    }
+    for rule in ("FREQ=DAILY;BYHOUR=9", "FREQ=WEEKLY;BYDAY=1MO,FR", "INTERVAL=2"):
+        with pytest.raises(ValueError):
+            parse_rrule(rule)
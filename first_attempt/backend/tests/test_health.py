@@ -7,4 +7,8 @@ def test_health_ok() -> None:
     client = TestClient(app)
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["mcp"]["endpoints"]
+    for endpoint in data["mcp"]["endpoints"]:
+        assert endpoint["state"] in {"closed", "open", "half_open"}
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import date
+
+from fastapi import HTTPException
+import pytest
+
+from app.jobs import DONE, FAILED, JobsBusy, SuggestionJobRunner
+
+WEEK = (date(2024, 1, 1), date(2024, 1, 7))
+
+
+async def _wait_finished(job) -> None:
+    while not job.finished:
+        await job.updated.wait()
+
+
+def test_jobs_run_on_worker_pool() -> None:
+    async def scenario():
+        runner = SuggestionJobRunner(workers=2, queue_size=10, max_jobs=10)
+
+        async def succeed() -> str:
+            return "advice"
+
+        async def fail() -> str:
+            raise HTTPException(status_code=502, detail="MCP unavailable")
+
+        ok = runner.submit(*WEEK, None, succeed)
+        bad = runner.submit(*WEEK, None, fail)
+        await asyncio.wait_for(
+            asyncio.gather(_wait_finished(ok), _wait_finished(bad)), 1
+        )
+        await runner.close()
+        return ok, bad
+
+    ok, bad = asyncio.run(scenario())
+    assert (ok.status, ok.suggestion) == (DONE, "advice")
+    assert (bad.status, bad.error) == (FAILED, "MCP unavailable")
+
+
+def test_store_evicts_finished_jobs_and_rejects_when_busy() -> None:
+    async def scenario():
+        runner = SuggestionJobRunner(workers=1, queue_size=10, max_jobs=2)
+        release = asyncio.Event()
+
+        async def quick() -> str:
+            return "done"
+
+        async def blocked() -> str:
+            await release.wait()
+            return "late"
+
+        first = runner.submit(*WEEK, None, quick)
+        await asyncio.wait_for(_wait_finished(first), 1)
+        runner.submit(*WEEK, None, blocked)
+        runner.submit(*WEEK, None, blocked)
+        assert runner.store.get(first.id) is None
+        with pytest.raises(JobsBusy):
+            runner.submit(*WEEK, None, blocked)
+        release.set()
+        await runner.close()
+
+    asyncio.run(scenario())
+
+
+def test_bounded_queue_rejects_overflow() -> None:
+    async def scenario():
+        runner = SuggestionJobRunner(workers=1, queue_size=1, max_jobs=10)
+        release = asyncio.Event()
+
+        async def blocked() -> str:
+            await release.wait()
+            return "late"
+
+        running = runner.submit(*WEEK, None, blocked)
+        await asyncio.wait_for(running.updated.wait(), 1)
+        runner.submit(*WEEK, None, blocked)
+        with pytest.raises(JobsBusy):
+            runner.submit(*WEEK, None, blocked)
+        release.set()
+        await runner.close()
+
+    asyncio.run(scenario())
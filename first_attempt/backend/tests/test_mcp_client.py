@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import app.mcp_client as mcp_client_module
+from app.admission import get_admission_gate
+from app.mcp_client import MCPClient, MCPError
+
+FAST = "http://fast:8001"
+SLOW = "http://slow:8001"
+DOWN = "http://down:8001"
+
+
+def sync_handler(release: threading.Event):
+    def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host == "down":
+            raise httpx.ConnectError("refused", request=request)
+        if host == "slow":
+            release.wait(timeout=5)
+        return httpx.Response(200, json={"suggestion": f"from {host}"})
+
+    return handler
+
+
+def test_hedges_to_next_endpoint_and_remembers_it() -> None:
+    release = threading.Event()
+    client = MCPClient(
+        [SLOW, FAST],
+        hedge_delay=0.05,
+        transport=httpx.MockTransport(sync_handler(release)),
+    )
+    try:
+        started = time.perf_counter()
+        data = client.post_json("/suggest-weekly-review", {"input": "x"})
+        elapsed = time.perf_counter() - started
+    finally:
+        release.set()
+        client.close()
+
+    assert data == {"suggestion": "from fast"}
+    assert elapsed < 1
+    assert client.preferred == FAST
+    assert client.ordered_base_urls() == [FAST, SLOW]
+
+
+def test_failed_endpoint_falls_through_without_waiting_for_hedge() -> None:
+    client = MCPClient(
+        [DOWN, FAST],
+        hedge_delay=10,
+        transport=httpx.MockTransport(sync_handler(threading.Event())),
+    )
+    try:
+        started = time.perf_counter()
+        data = client.post_json("/suggest-weekly-review", {"input": "x"})
+        assert time.perf_counter() - started < 1
+    finally:
+        client.close()
+    assert data == {"suggestion": "from fast"}
+
+
+def test_all_endpoints_down_raises() -> None:
+    client = MCPClient(
+        [DOWN, DOWN + "/other"],
+        hedge_delay=0.01,
+        transport=httpx.MockTransport(sync_handler(threading.Event())),
+    )
+    try:
+        with pytest.raises(MCPError) as excinfo:
+            client.post_json("/suggest-weekly-review", {"input": "x"})
+    finally:
+        client.close()
+    assert excinfo.value.detail == "MCP server unavailable"
+
+
+def test_async_hedging() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "slow":
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"suggestion": request.url.host})
+
+    client = MCPClient(
+        [SLOW, FAST],
+        hedge_delay=0.05,
+        async_transport=httpx.MockTransport(handler),
+    )
+
+    async def run():
+        return await client.apost_json("/suggest-weekly-review", {"input": "x"})
+
+    try:
+        assert asyncio.run(asyncio.wait_for(run(), timeout=2)) == {
+            "suggestion": "fast"
+        }
+    finally:
+        client.close()
+    assert client.preferred == FAST
+
+
+def test_pool_fits_every_admitted_caller_across_endpoints() -> None:
+    release = threading.Event()
+    client = MCPClient(
+        [SLOW, FAST],
+        hedge_delay=0.05,
+        transport=httpx.MockTransport(sync_handler(release)),
+        max_concurrency=6,
+    )
+    results: list = []
+
+    def call() -> None:
+        results.append(client.post_json("/suggest-weekly-review", {"input": "x"}))
+
+    try:
+        # Every caller parks an attempt on the slow endpoint first; the hedged
+        # attempts must still find free workers.
+        client._preferred = SLOW
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=2)
+        elapsed = time.perf_counter() - started
+    finally:
+        release.set()
+        client.close()
+
+    assert results == [{"suggestion": "from fast"}] * 6
+    assert elapsed < 1
+
+
+def test_get_mcp_client_creates_one_instance_and_closes_it(monkeypatch) -> None:
+    created = []
+
+    class RecordingClient(MCPClient):
+        def __init__(self, *args, **kwargs) -> None:
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(mcp_client_module, "MCPClient", RecordingClient)
+    monkeypatch.setattr(mcp_client_module, "_mcp_client", None)
+    clients: list = []
+    threads = [
+        threading.Thread(
+            target=lambda: clients.append(mcp_client_module.get_mcp_client())
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+    assert created[0]._executor._max_workers == get_admission_gate(
+        "suggestions"
+    ).limit * len(created[0].base_urls)
+
+    asyncio.run(mcp_client_module.close_mcp_client())
+    assert mcp_client_module._mcp_client is None
+    assert created[0]._client.is_closed
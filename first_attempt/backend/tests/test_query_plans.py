@@ -0,0 +1,55 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.api import (
+    _completed_habit_ids_query,
+    _transactions_query,
+    _weekly_review_totals_query,
+)
+from app.db import Base
+from app.models import Label
+import app.models  # noqa: F401
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+HOT_QUERIES = {
+    "weekly_review_totals": _weekly_review_totals_query(
+        date(2024, 1, 1), date(2024, 1, 7)
+    ),
+    "completed_habit_ids": _completed_habit_ids_query(date(2024, 1, 1)),
+    "labels_by_category": select(Label.id).where(Label.category_id == uuid4()),
+    "transactions_page": _transactions_query(
+        after=(date(2024, 1, 1), uuid4())
+    ).limit(100),
+    "transactions_by_label": _transactions_query(
+        label_id=uuid4(), start_date=date(2024, 1, 1)
+    ).limit(100),
+}
+
+
+def setup_module():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index_on_sqlite(name: str) -> None:
+    compiled = HOT_QUERIES[name].compile(
+        dialect=engine.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    plan = [row[-1] for row in rows]
+    table_steps = [step for step in plan if step.startswith(("SCAN", "SEARCH"))]
+    assert table_steps, plan
+    for step in table_steps:
+        assert step.startswith("SEARCH") and "INDEX" in step, plan
@@ -0,0 +1,103 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from app.cache import get_suggestion_cache
+from app.schemas import WeeklyReviewOut
+from app.singleflight import SingleFlight
+import app.api as api_module
+
+
+def _wait_for(predicate) -> None:
+    deadline = time.monotonic() + 5
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute() -> str:
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, "key", compute) for _ in range(5)]
+        _wait_for(lambda: flight.coalesced == 4)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4}
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_errors_are_shared_with_waiters() -> None:
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail() -> str:
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flight.do, "key", fail) for _ in range(2)]
+        _wait_for(lambda: flight.coalesced == 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(5)
+
+
+def test_async_calls_coalesce_on_one_loop() -> None:
+    flight = SingleFlight()
+    calls = []
+
+    async def compute() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.ado("key", compute) for _ in range(3)))
+
+    assert asyncio.run(scenario()) == ["result"] * 3
+    assert len(calls) == 1
+
+
+def test_weekly_suggestion_herd_makes_one_mcp_call(monkeypatch) -> None:
+    release = threading.Event()
+    calls = []
+
+    class FakeMCPClient:
+        def post_json(self, path: str, payload: dict) -> dict:
+            calls.append(path)
+            release.wait(5)
+            return {"suggestion": "Shared advice"}
+
+    flight = SingleFlight()
+    monkeypatch.setattr(api_module, "get_mcp_client", FakeMCPClient)
+    monkeypatch.setattr(api_module, "get_single_flight", lambda: flight)
+    get_suggestion_cache().clear()
+    summary = WeeklyReviewOut(
+        start_date="2024-01-01",
+        end_date="2024-01-07",
+        total_amount="9.00",
+        by_category=[{"category_key": "fun", "total_amount": "9.00"}],
+    )
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [
+            pool.submit(api_module.fetch_weekly_suggestion, summary) for _ in range(4)
+        ]
+        _wait_for(lambda: flight.coalesced == 3)
+        release.set()
+        assert [future.result(5) for future in futures] == ["Shared advice"] * 4
+    assert len(calls) == 1
@@ -0,0 +1,34 @@
+import { afterEach, describe, expect, it, vi } from "vitest";
+
+import { listTransactions } from "../api";
+
+const page = (ids: string[], nextCursor: string | null) =>
+  new Response(JSON.stringify(ids.map((id) => ({ id }))), {
+    status: 200,
+    headers: nextCursor ? { "X-Next-Cursor": nextCursor } : {},
+  });
+
+describe("listTransactions", () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it("follows X-Next-Cursor until the last page", async () => {
+    const fetchMock = vi
+      .fn()
+      .mockResolvedValueOnce(page(["a", "b"], "cursor-1"))
+      .mockResolvedValueOnce(page(["c"], null));
+    vi.stubGlobal("fetch", fetchMock);
+
+    const transactions = await listTransactions();
+
+    expect(transactions.map((transaction) => transaction.id)).toEqual([
+      "a",
+      "b",
+      "c",
+    ]);
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    expect(fetchMock.mock.calls[0][0]).toMatch(/\/api\/transactions\?limit=500$/);
+    expect(fetchMock.mock.calls[1][0]).toMatch(/cursor=cursor-1/);
+  });
+});
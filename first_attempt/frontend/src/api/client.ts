@@ -31,10 +31,10 @@ const buildUrl = (baseUrl: string, path: string) => {
 };
 
 export const createJsonClient = (baseUrl: string) => {
-  const request = async <T>(
+  const send = async <T>(
     path: string,
     options: RequestInit = {}
-  ): Promise<T> => {
+  ): Promise<{ data: T; headers: Headers }> => {
     const response = await fetch(buildUrl(baseUrl, path), {
       ...options,
       headers: {
@@ -60,11 +60,15 @@ export const createJsonClient = (baseUrl: string) => {
       throw new Error(message);
     }
 
-    return data as T;
+    return { data: data as T, headers: response.headers };
   };
 
+  const request = async <T>(path: string, options: RequestInit = {}) =>
+    (await send<T>(path, options)).data;
+
   return {
     get: <T>(path: string) => request<T>(path),
+    getWithHeaders: <T>(path: string) => send<T>(path),
     post: <T>(path: string, body?: unknown) =>
       request<T>(path, {
         method: "POST",
@@ -25,8 +25,26 @@ export const createLabel = (payload: {
   category_id: string;
 }) => backendClient.post<Label>("/api/labels", payload);
 
-export const listTransactions = () =>
-  backendClient.get<Transaction[]>("/api/transactions");
+const TRANSACTIONS_PAGE_SIZE = 500;
+const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+
+// The endpoint is keyset-paginated; follow the cursor until the last page.
+export const listTransactions = async () => {
+  const transactions: Transaction[] = [];
+  let cursor: string | null = null;
+  do {
+    const query = new URLSearchParams({ limit: String(TRANSACTIONS_PAGE_SIZE) });
+    if (cursor) {
+      query.set("cursor", cursor);
+    }
+    const { data, headers } = await backendClient.getWithHeaders<Transaction[]>(
+      `/api/transactions?${query}`
+    );
+    transactions.push(...data);
+    cursor = headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+  return transactions;
+};
 
 export const createTransaction = (payload: {
   amount: number;
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+_pool: AsyncConnectionPool | None = None
+_pool_lock = asyncio.Lock()
+
+
+def database_conninfo() -> str:
+    return make_conninfo(
+        host=os.environ.get("POSTGRES_HOST", "localhost"),
+        port=os.environ.get("POSTGRES_PORT", "5432"),
+        user=os.environ.get("POSTGRES_USER", "app"),
+        password=os.environ.get("POSTGRES_PASSWORD", "app"),
+        dbname=os.environ.get("POSTGRES_DB", "app"),
+        application_name="mcp_server",
+        # Every session is read-only: the tools only ever query the schema.
+        options="-c default_transaction_read_only=on",
+    )
+
+
+async def get_pool() -> AsyncConnectionPool:
+    """Return the shared read-only pool, opening it on first use."""
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            pool = AsyncConnectionPool(
+                database_conninfo(),
+                min_size=int(os.environ.get("MCP_DB_POOL_MIN_SIZE", "1")),
+                max_size=int(os.environ.get("MCP_DB_POOL_MAX_SIZE", "5")),
+                # Prepare each statement on its first execution per connection.
+                kwargs={
+                    "autocommit": True,
+                    "prepare_threshold": 0,
+                    "row_factory": dict_row,
+                },
+                name="mcp-read",
+                open=False,
+            )
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
@@ -1,3 +1,8 @@
+from contextlib import asynccontextmanager
+from datetime import date
+import os
+from typing import Any
+
 from mcp.server.fastmcp import FastMCP
 from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
@@ -5,23 +10,80 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 from starlette.routing import Mount, Route
 
+from app import queries
+from app.db import close_pool
+from app.rules import DEFAULT_RULES_PATH, RuleEngine
+
 mcp = FastMCP("ai-dev-tools-mcp")
 
+MAX_BATCH_INPUTS = 500
+SUMMARY_VERSION = 1
+RULES = RuleEngine.from_file(os.environ.get("MCP_RULES_PATH", DEFAULT_RULES_PATH))
+
+
+def summary_totals(summary: Any) -> dict[str, float]:
+    """Validate a structured weekly summary and return its category totals."""
+    if not isinstance(summary, dict):
+        raise ValueError("summary must be an object")
+    if summary.get("version") != SUMMARY_VERSION:
+        raise ValueError(f"Unsupported summary version: {summary.get('version')!r}")
+    categories = summary.get("categories")
+    if not isinstance(categories, dict) or not all(
+        isinstance(key, str)
+        and isinstance(amount, (int, float))
+        and not isinstance(amount, bool)
+        for key, amount in categories.items()
+    ):
+        raise ValueError("summary.categories must map category keys to numbers")
+    return categories
+
+
+@mcp.tool()
+def weekly_review_suggestion(
+    input: str = "", summary: dict[str, Any] | None = None
+) -> str:
+    if summary is not None:
+        return RULES.suggest_for_totals(summary_totals(summary))
+    return RULES.suggest(input)
+
+
+@mcp.tool()
+def weekly_review_suggestions(
+    inputs: list[str] | None = None,
+    summaries: list[dict[str, Any]] | None = None,
+) -> list[str]:
+    if summaries is not None:
+        return [weekly_review_suggestion(summary=summary) for summary in summaries]
+    return [weekly_review_suggestion(input_text) for input_text in inputs or []]
+
 
 @mcp.tool()
-def weekly_review_suggestion(input: str) -> str:
-    text = input.lower()
-    if "supermarket" in text:
-        return "Supermarket spending stands out—try a tighter grocery list next week."
-    if "subscriptions" in text:
-        return "Consider reviewing subscriptions to see if any can be paused."
-    if "health" in text:
-        return "Great focus on health—keep that momentum going with small wins."
-    if "fun" in text:
-        return "Plan one low-cost fun activity to keep spending balanced."
-    if "house" in text:
-        return "House expenses look active—set aside a small buffer for surprises."
-    return "Nice work tracking your week—set one small goal for next week."
+async def weekly_summary(start_date: date, end_date: date) -> dict:
+    """Spending totals by category for an inclusive date range."""
+    return await queries.weekly_summary(start_date, end_date)
+
+
+@mcp.tool()
+async def habit_adherence(start_date: date, end_date: date) -> dict:
+    """Due and completed counts per habit for an inclusive date range."""
+    return await queries.habit_adherence(start_date, end_date)
+
+
+@mcp.tool()
+async def search_transactions(
+    query: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """Newest transactions whose description or label contains `query`."""
+    return await queries.search_transactions(query, start_date, end_date, limit)
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    yield
+    await close_pool()
 
 
 async def health(request: Request) -> JSONResponse:
@@ -30,17 +92,61 @@ async def health(request: Request) -> JSONResponse:
 
 async def suggest_weekly_review(request: Request) -> JSONResponse:
     payload = await request.json()
-    input_text = payload.get("input", "") if isinstance(payload, dict) else ""
-    suggestion = weekly_review_suggestion(input_text)
+    if not isinstance(payload, dict):
+        payload = {}
+    try:
+        suggestion = weekly_review_suggestion(
+            payload.get("input", ""), payload.get("summary")
+        )
+    except ValueError as exc:
+        return JSONResponse({"detail": str(exc)}, status_code=422)
     return JSONResponse({"suggestion": suggestion})
 
 
+async def suggest_weekly_review_batch(request: Request) -> JSONResponse:
+    payload = await request.json()
+    if not isinstance(payload, dict):
+        payload = {}
+    summaries = payload.get("summaries")
+    inputs = payload.get("inputs")
+    if summaries is not None:
+        if not isinstance(summaries, list):
+            return JSONResponse(
+                {"detail": "summaries must be a list"}, status_code=422
+            )
+        items = summaries
+    elif isinstance(inputs, list) and all(
+        isinstance(input_text, str) for input_text in inputs
+    ):
+        items = inputs
+    else:
+        return JSONResponse(
+            {"detail": "inputs must be a list of strings"}, status_code=422
+        )
+    if len(items) > MAX_BATCH_INPUTS:
+        return JSONResponse(
+            {"detail": f"At most {MAX_BATCH_INPUTS} inputs per batch"},
+            status_code=413,
+        )
+    try:
+        suggestions = weekly_review_suggestions(inputs=inputs, summaries=summaries)
+    except ValueError as exc:
+        return JSONResponse({"detail": str(exc)}, status_code=422)
+    return JSONResponse({"suggestions": suggestions})
+
+
 app = Starlette(
     routes=[
         Route("/health", health, methods=["GET"]),
         Route("/suggest-weekly-review", suggest_weekly_review, methods=["POST"]),
+        Route(
+            "/suggest-weekly-review/batch",
+            suggest_weekly_review_batch,
+            methods=["POST"],
+        ),
         Mount("/", app=mcp.streamable_http_app()),
-    ]
+    ],
+    lifespan=lifespan,
 )
 app.add_middleware(
     CORSMiddleware,
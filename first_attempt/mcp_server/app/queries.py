@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from app.db import get_pool
+
+MAX_RANGE_DAYS = 366
+SEARCH_LIMIT_MAX = 100
+
+# Reads the per-day rollup through its (day, label_id) primary key.
+WEEKLY_SUMMARY_SQL = """
+SELECT c.key AS category_key,
+       SUM(s.total) AS total_amount,
+       SUM(s.count) AS transactions
+FROM spending_daily_totals AS s
+JOIN categories AS c ON c.id = s.category_id
+WHERE s.day >= %(start_date)s AND s.day <= %(end_date)s
+GROUP BY c.key
+ORDER BY total_amount DESC, c.key
+"""
+
+# Due dates come from the backend's `habit_occurrences` table (walking
+# `ix_habit_occurrences_due_date_habit_id`) up to each habit's
+# `occurrences_through`. Days past that horizon are computed with the same
+# rules as the backend's `_habit_due_predicate`: `calendar` covers whole
+# months so `set_position` can rank a day among the month's matching days.
+# Completions probe `uq_habit_completions_habit_id_date`.
+HABIT_ADHERENCE_SQL = """
+WITH materialised AS (
+    SELECT o.habit_id, o.due_date AS day
+    FROM habit_occurrences AS o
+    JOIN habits AS h ON h.id = o.habit_id
+    WHERE o.due_date >= %(start_date)s AND o.due_date <= %(end_date)s
+      AND o.due_date <= h.occurrences_through
+),
+calendar AS (
+    SELECT day::date AS day,
+           extract(isodow FROM day)::int - 1 AS weekday,
+           extract(day FROM day)::int AS month_day,
+           extract(
+               day FROM date_trunc('month', day) + interval '1 month - 1 day'
+           )::int AS month_length
+    FROM generate_series(
+        date_trunc('month', %(start_date)s::date),
+        date_trunc('month', %(end_date)s::date) + interval '1 month - 1 day',
+        interval '1 day'
+    ) AS day
+),
+candidates AS (
+    SELECT h.id AS habit_id, h.start_date, h.end_date, h.interval, h.unit,
+           h.weekday_mask, h.month_day_mask, h.set_position,
+           h.occurrences_through, c.day, c.weekday, c.month_day, c.month_length,
+           extract(isodow FROM h.start_date)::int - 1 AS start_weekday,
+           (
+               (extract(year FROM c.day) - extract(year FROM h.start_date)) * 12
+               + extract(month FROM c.day) - extract(month FROM h.start_date)
+           )::int AS elapsed_months,
+           row_number() OVER (month_days ORDER BY c.day) AS rank_from_start,
+           row_number() OVER (month_days ORDER BY c.day DESC) AS rank_from_end
+    FROM habits AS h
+    JOIN calendar AS c
+      ON (h.weekday_mask IS NULL OR h.weekday_mask & (1 << c.weekday) <> 0)
+     AND (
+         h.month_day_mask IS NULL
+         OR h.month_day_mask & (1 << (c.month_day - 1)) <> 0
+     )
+    WHERE h.occurrences_through IS NULL OR h.occurrences_through < %(end_date)s
+    WINDOW month_days AS (PARTITION BY h.id, date_trunc('month', c.day))
+),
+computed AS (
+    SELECT c.habit_id, c.day
+    FROM candidates AS c
+    WHERE c.day >= %(start_date)s AND c.day <= %(end_date)s
+      AND c.day >= c.start_date
+      AND (c.end_date IS NULL OR c.day <= c.end_date)
+      AND (c.occurrences_through IS NULL OR c.day > c.occurrences_through)
+      AND CASE c.unit
+        WHEN 'day' THEN (c.day - c.start_date) %% c.interval = 0
+        WHEN 'week' THEN
+            CASE
+                WHEN c.weekday_mask IS NULL
+                    THEN (c.day - c.start_date) %% (7 * c.interval) = 0
+                -- Whole weeks between the Mondays of the start and this week.
+                ELSE (c.day - c.start_date + c.start_weekday - c.weekday)
+                    %% (7 * c.interval) = 0
+            END
+        WHEN 'month' THEN
+            c.elapsed_months %% c.interval = 0
+            AND CASE
+                -- Plain monthly habits fall on their start day, clamped to
+                -- the month's length.
+                WHEN c.weekday_mask IS NULL AND c.month_day_mask IS NULL
+                    THEN c.month_day = LEAST(
+                        extract(day FROM c.start_date), c.month_length
+                    )
+                ELSE c.set_position IS NULL
+                    OR c.set_position IN (c.rank_from_start, -c.rank_from_end)
+            END
+        ELSE false
+    END
+),
+due AS (
+    SELECT habit_id, day FROM materialised
+    UNION ALL
+    SELECT habit_id, day FROM computed
+)
+SELECT h.id, h.name, COUNT(*) AS due, COUNT(hc.id) AS completed
+FROM due
+JOIN habits AS h ON h.id = due.habit_id
+LEFT JOIN habit_completions AS hc
+  ON hc.habit_id = due.habit_id AND hc.date = due.day
+GROUP BY h.id, h.name
+ORDER BY h.name, h.id
+"""
+
+# Walks `ix_transactions_occurred_at_id` newest first and stops at the limit.
+SEARCH_TRANSACTIONS_SQL = """
+SELECT t.id, t.occurred_at, t.amount, t.description,
+       l.label, c.key AS category_key
+FROM transactions AS t
+JOIN labels AS l ON l.id = t.label_id
+JOIN categories AS c ON c.id = l.category_id
+WHERE (t.description ILIKE %(pattern)s OR l.label ILIKE %(pattern)s)
+  AND t.occurred_at >= %(start_date)s AND t.occurred_at <= %(end_date)s
+ORDER BY t.occurred_at DESC, t.id DESC
+LIMIT %(limit)s
+"""
+
+
+def _format_amount(value: Decimal | None) -> str:
+    return f"{value or Decimal('0'):.2f}"
+
+
+def _check_range(start_date: date, end_date: date) -> None:
+    if start_date > end_date:
+        raise ValueError("start_date must be on or before end_date")
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Range must be shorter than {MAX_RANGE_DAYS} days")
+
+
+def _like_pattern(query: str) -> str:
+    escaped = (
+        query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    return f"%{escaped}%"
+
+
+async def weekly_summary(start_date: date, end_date: date) -> dict:
+    _check_range(start_date, end_date)
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cursor = await conn.execute(
+            WEEKLY_SUMMARY_SQL, {"start_date": start_date, "end_date": end_date}
+        )
+        rows = await cursor.fetchall()
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "total_amount": _format_amount(sum(row["total_amount"] for row in rows)),
+        "by_category": [
+            {
+                "category_key": row["category_key"],
+                "total_amount": _format_amount(row["total_amount"]),
+                "transactions": int(row["transactions"]),
+            }
+            for row in rows
+        ],
+    }
+
+
+async def habit_adherence(start_date: date, end_date: date) -> dict:
+    _check_range(start_date, end_date)
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cursor = await conn.execute(
+            HABIT_ADHERENCE_SQL, {"start_date": start_date, "end_date": end_date}
+        )
+        rows = await cursor.fetchall()
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "habits": [
+            {
+                "id": str(row["id"]),
+                "name": row["name"],
+                "due": row["due"],
+                "completed": row["completed"],
+                "adherence": round(row["completed"] / row["due"], 4),
+            }
+            for row in rows
+        ],
+    }
+
+
+async def search_transactions(
+    query: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    if not query.strip():
+        raise ValueError("query must not be empty")
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cursor = await conn.execute(
+            SEARCH_TRANSACTIONS_SQL,
+            {
+                "pattern": _like_pattern(query.strip()),
+                "start_date": start_date or date.min,
+                "end_date": end_date or date.max,
+                "limit": max(1, min(limit, SEARCH_LIMIT_MAX)),
+            },
+        )
+        rows = await cursor.fetchall()
+    return [
+        {
+            "id": str(row["id"]),
+            "occurred_at": row["occurred_at"].isoformat(),
+            "amount": _format_amount(row["amount"]),
+            "description": row["description"],
+            "label": row["label"],
+            "category_key": row["category_key"],
+        }
+        for row in rows
+    ]
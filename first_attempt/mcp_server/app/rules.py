@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import re
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("rules.json")
+
+_AMOUNT_PATTERN = r"(?:\s*:\s*(?P<amount>-?\d+(?:\.\d+)?))?"
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    keywords: tuple[str, ...]
+    suggestion: str
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation that shares common prefixes.
+
+    Each branch point only offers one alternative per distinct next
+    character, so matching cost depends on the alphabet rather than the
+    number of keywords.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class RuleEngine:
+    def __init__(self, rules: Iterable[Rule], default: str) -> None:
+        self.rules = tuple(rules)
+        self.default = default
+        self._rule_for_keyword: dict[str, int] = {}
+        for index, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                self._rule_for_keyword.setdefault(keyword.casefold(), index)
+        if self._rule_for_keyword:
+            keywords = _trie_pattern(self._rule_for_keyword)
+            self._pattern = re.compile(
+                rf"(?<!\w)(?P<keyword>{keywords})(?!\w){_AMOUNT_PATTERN}",
+                re.IGNORECASE,
+            )
+        else:
+            self._pattern = None
+
+    @classmethod
+    def from_file(cls, path: str | Path = DEFAULT_RULES_PATH) -> RuleEngine:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        rules = [
+            Rule(
+                name=entry["name"],
+                keywords=tuple(entry["keywords"]),
+                suggestion=entry["suggestion"],
+            )
+            for entry in data["rules"]
+        ]
+        return cls(rules, data["default"])
+
+    def rule_for(self, key: str) -> int | None:
+        return self._rule_for_keyword.get(key.casefold())
+
+    def match(self, text: str) -> dict[int, float]:
+        """Return the summed amount per matching rule index in one pass.
+
+        Keywords without a trailing `: <amount>` count as zero.
+        """
+        amounts: dict[int, float] = {}
+        if self._pattern is None:
+            return amounts
+        # Older backends join prompt lines with an escaped "\\n".
+        text = text.replace("\\n", "\n")
+        for found in self._pattern.finditer(text):
+            index = self._rule_for_keyword[found.group("keyword").casefold()]
+            amount = found.group("amount")
+            amounts[index] = amounts.get(index, 0.0) + (
+                float(amount) if amount else 0.0
+            )
+        return amounts
+
+    def best(self, amounts: Mapping[int, float], total: float | None = None) -> str:
+        """Pick the rule with the largest share of spending.
+
+        Ties, including inputs without amounts, fall back to table order.
+        """
+        if not amounts:
+            return self.default
+        if total is None:
+            total = sum(max(amount, 0.0) for amount in amounts.values())
+        index = min(
+            amounts,
+            key=lambda item: (
+                -(max(amounts[item], 0.0) / total if total > 0 else 0.0),
+                item,
+            ),
+        )
+        return self.rules[index].suggestion
+
+    def suggest(self, text: str) -> str:
+        return self.best(self.match(text))
+
+    def suggest_for_totals(self, totals: Mapping[str, float]) -> str:
+        amounts: dict[int, float] = {}
+        for key, amount in totals.items():
+            index = self.rule_for(key)
+            if index is not None:
+                amounts[index] = amounts.get(index, 0.0) + float(amount)
+        total = sum(max(float(amount), 0.0) for amount in totals.values())
+        return self.best(amounts, total)
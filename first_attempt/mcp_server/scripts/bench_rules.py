@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import timeit
+
+MCP_SERVER_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(MCP_SERVER_DIR))
+
+from app.rules import Rule, RuleEngine  # noqa: E402
+
+RULE_COUNTS = (5, 50, 200, 800)
+CALLS = 20_000
+SAMPLE_INPUT = (
+    "Weekly totals:\n"
+    "Total: 742.50\n"
+    "house: 500.00\n"
+    "supermarket: 180.25\n"
+    "subscriptions: 32.25\n"
+    "fun: 30.00"
+)
+
+
+def synthetic_rules(count: int) -> list[Rule]:
+    base = RuleEngine.from_file().rules
+    extra = [
+        Rule(
+            name=f"category{index}",
+            keywords=(f"category{index}", f"merchant{index}"),
+            suggestion=f"Suggestion {index}",
+        )
+        for index in range(max(count - len(base), 0))
+    ]
+    return [*base, *extra][:count]
+
+
+def naive_suggest(rules: list[Rule], default: str, text: str) -> str:
+    """Substring checks per rule; every rule is visited so matches can be ranked."""
+    lowered = text.lower()
+    matched = [
+        rule for rule in rules if any(keyword in lowered for keyword in rule.keywords)
+    ]
+    return matched[0].suggestion if matched else default
+
+
+def main() -> None:
+    print(f"{'rules':>6} {'compiled us/call':>17} {'naive us/call':>14}")
+    for count in RULE_COUNTS:
+        rules = synthetic_rules(count)
+        engine = RuleEngine(rules, "default")
+        compiled = timeit.timeit(lambda: engine.suggest(SAMPLE_INPUT), number=CALLS)
+        naive = timeit.timeit(
+            lambda: naive_suggest(rules, "default", SAMPLE_INPUT), number=CALLS
+        )
+        print(
+            f"{count:>6} {compiled / CALLS * 1e6:>17.2f} {naive / CALLS * 1e6:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
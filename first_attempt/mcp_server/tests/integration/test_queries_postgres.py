@@ -0,0 +1,133 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+import os
+from uuid import uuid4
+
+import pytest
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+if not DATABASE_URL.startswith("postgresql"):
+    pytest.skip(
+        "DATABASE_URL must point to Postgres to run integration tests.",
+        allow_module_level=True,
+    )
+
+import psycopg  # noqa: E402
+
+from app import queries  # noqa: E402
+from app.db import close_pool  # noqa: E402
+
+# The schema comes from the backend's migrations (`alembic upgrade head`).
+CONNINFO = DATABASE_URL.replace("postgresql+psycopg://", "postgresql://", 1)
+
+
+def run(query):
+    async def scenario():
+        try:
+            return await query
+        finally:
+            await close_pool()
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def conn():
+    with psycopg.connect(CONNINFO, autocommit=True) as conn:
+        conn.execute(
+            "TRUNCATE TABLE categories, labels, transactions, habits, "
+            "habit_completions RESTART IDENTITY CASCADE"
+        )
+        yield conn
+
+
+def add_habit(conn, name: str, start_date: date, interval: int, unit: str, **extra):
+    habit_id = uuid4()
+    conn.execute(
+        "INSERT INTO habits (id, name, start_date, interval, unit, "
+        "occurrences_through) VALUES (%s, %s, %s, %s, %s, %s)",
+        (habit_id, name, start_date, interval, unit, extra.get("through")),
+    )
+    for due in extra.get("occurrences", []):
+        conn.execute(
+            "INSERT INTO habit_occurrences (habit_id, due_date) VALUES (%s, %s)",
+            (habit_id, due),
+        )
+    for done in extra.get("completions", []):
+        conn.execute(
+            "INSERT INTO habit_completions (id, habit_id, date) VALUES (%s, %s, %s)",
+            (uuid4(), habit_id, done),
+        )
+    return habit_id
+
+
+@pytest.mark.integration
+def test_weekly_summary_and_search_read_the_backend_schema(conn) -> None:
+    category_id, label_id = uuid4(), uuid4()
+    conn.execute(
+        "INSERT INTO categories (id, key) VALUES (%s, 'house')", (category_id,)
+    )
+    conn.execute(
+        "INSERT INTO labels (id, label, category_id) VALUES (%s, 'Rent', %s)",
+        (label_id, category_id),
+    )
+    for day, amount, description in [
+        (date(2024, 1, 2), Decimal("500.00"), "January rent"),
+        (date(2024, 1, 9), Decimal("25.50"), "Plumber"),
+    ]:
+        conn.execute(
+            "INSERT INTO transactions (id, amount, occurred_at, description, "
+            "label_id) VALUES (%s, %s, %s, %s, %s)",
+            (uuid4(), amount, day, description, label_id),
+        )
+        conn.execute(
+            "INSERT INTO spending_daily_totals (day, label_id, category_id, total, "
+            "count) VALUES (%s, %s, %s, %s, 1)",
+            (day, label_id, category_id, amount),
+        )
+
+    summary = run(queries.weekly_summary(date(2024, 1, 1), date(2024, 1, 7)))
+    found = run(queries.search_transactions("rent"))
+
+    assert summary["by_category"] == [
+        {"category_key": "house", "total_amount": "500.00", "transactions": 1}
+    ]
+    assert [row["description"] for row in found] == ["Plumber", "January rent"]
+
+
+@pytest.mark.integration
+def test_habit_adherence_uses_occurrences_then_the_schedule(conn) -> None:
+    # Materialised through Jan 4, computed (every other day) afterwards.
+    partly = add_habit(
+        conn,
+        "Partly materialised",
+        date(2024, 1, 1),
+        2,
+        "day",
+        through=date(2024, 1, 4),
+        occurrences=[date(2024, 1, 1), date(2024, 1, 3)],
+        completions=[date(2024, 1, 3), date(2024, 1, 5), date(2024, 1, 6)],
+    )
+    # The table wins wherever it is materialised.
+    table_only = add_habit(
+        conn,
+        "Table only",
+        date(2024, 1, 1),
+        1,
+        "day",
+        through=date(2024, 1, 31),
+        occurrences=[date(2024, 1, 2)],
+        completions=[date(2024, 1, 2)],
+    )
+    never = add_habit(conn, "Never materialised", date(2024, 1, 1), 1, "week")
+
+    result = run(queries.habit_adherence(date(2024, 1, 1), date(2024, 1, 10)))
+
+    counts = {row["id"]: (row["due"], row["completed"]) for row in result["habits"]}
+    assert counts == {
+        str(partly): (5, 2),
+        str(table_only): (1, 1),
+        str(never): (2, 0),
+    }
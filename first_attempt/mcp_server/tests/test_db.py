@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("psycopg_pool")
+
+from psycopg.conninfo import conninfo_to_dict  # noqa: E402
+
+from app import db  # noqa: E402
+
+
+class RecordingPool:
+    created: list["RecordingPool"] = []
+
+    def __init__(self, conninfo: str, **kwargs) -> None:
+        self.conninfo = conninfo
+        self.kwargs = kwargs
+        self.opened = 0
+        self.closed = 0
+        RecordingPool.created.append(self)
+
+    async def open(self) -> None:
+        await asyncio.sleep(0.01)
+        self.opened += 1
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+@pytest.fixture
+def recording_pool(monkeypatch):
+    RecordingPool.created = []
+    monkeypatch.setattr(db, "AsyncConnectionPool", RecordingPool)
+    monkeypatch.setattr(db, "_pool", None)
+    monkeypatch.setattr(db, "_pool_lock", asyncio.Lock())
+    return RecordingPool
+
+
+def test_conninfo_comes_from_postgres_settings(monkeypatch) -> None:
+    monkeypatch.setenv("POSTGRES_HOST", "db")
+    monkeypatch.setenv("POSTGRES_PORT", "6543")
+    monkeypatch.setenv("POSTGRES_USER", "reader")
+    monkeypatch.setenv("POSTGRES_PASSWORD", "secret")
+    monkeypatch.setenv("POSTGRES_DB", "ledger")
+
+    conninfo = conninfo_to_dict(db.database_conninfo())
+
+    assert conninfo == {
+        "host": "db",
+        "port": "6543",
+        "user": "reader",
+        "password": "secret",
+        "dbname": "ledger",
+        "application_name": "mcp_server",
+        "options": "-c default_transaction_read_only=on",
+    }
+
+
+def test_get_pool_opens_one_read_only_pool(monkeypatch, recording_pool) -> None:
+    monkeypatch.setenv("MCP_DB_POOL_MAX_SIZE", "9")
+
+    async def scenario():
+        pools = await asyncio.gather(*(db.get_pool() for _ in range(5)))
+        await db.close_pool()
+        return pools
+
+    pools = asyncio.run(scenario())
+
+    assert len(recording_pool.created) == 1
+    pool = recording_pool.created[0]
+    assert all(item is pool for item in pools)
+    assert pool.opened == 1 and pool.closed == 1
+    assert pool.kwargs["max_size"] == 9
+    assert pool.kwargs["open"] is False
+    assert pool.kwargs["kwargs"]["autocommit"] is True
+    assert pool.kwargs["kwargs"]["prepare_threshold"] == 0
+    assert "default_transaction_read_only=on" in pool.conninfo
+    assert db._pool is None
+
+
+def test_close_pool_without_a_pool_is_a_no_op(recording_pool) -> None:
+    asyncio.run(db.close_pool())
+
+    assert recording_pool.created == []
@@ -0,0 +1,152 @@
+import pytest
+
+pytest.importorskip("mcp")
+pytest.importorskip("psycopg_pool")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from app.main import (  # noqa: E402
+    MAX_BATCH_INPUTS,
+    RULES,
+    SUMMARY_VERSION,
+    app,
+    summary_totals,
+)
+
+client = TestClient(app)
+
+SUPERMARKET = RULES.rules[0].suggestion
+SUBSCRIPTIONS = RULES.rules[1].suggestion
+
+
+def summary(categories: dict) -> dict:
+    return {"version": SUMMARY_VERSION, "categories": categories}
+
+
+def test_summary_totals_returns_categories() -> None:
+    categories = {"supermarket": 12.5, "fun": 3}
+
+    assert summary_totals(summary(categories)) == categories
+
+
+@pytest.mark.parametrize(
+    "value, message",
+    [
+        (None, "object"),
+        ([], "object"),
+        ("version: 1", "object"),
+        ({"categories": {}}, "version"),
+        ({"version": "1", "categories": {}}, "version"),
+        ({"version": SUMMARY_VERSION + 1, "categories": {}}, "version"),
+        ({"version": SUMMARY_VERSION}, "categories"),
+        ({"version": SUMMARY_VERSION, "categories": []}, "categories"),
+        ({"version": SUMMARY_VERSION, "categories": {"fun": "3"}}, "categories"),
+        ({"version": SUMMARY_VERSION, "categories": {"fun": None}}, "categories"),
+        ({"version": SUMMARY_VERSION, "categories": {"fun": True}}, "categories"),
+    ],
+)
+def test_summary_totals_rejects_malformed_summaries(value, message) -> None:
+    with pytest.raises(ValueError, match=message):
+        summary_totals(value)
+
+
+def test_single_endpoint_rejects_malformed_summary() -> None:
+    response = client.post(
+        "/suggest-weekly-review",
+        json={"summary": {"version": SUMMARY_VERSION, "categories": {"fun": "3"}}},
+    )
+
+    assert response.status_code == 422
+    assert "categories" in response.json()["detail"]
+
+
+def test_batch_returns_suggestions_in_input_order() -> None:
+    response = client.post(
+        "/suggest-weekly-review/batch",
+        json={
+            "inputs": [
+                "supermarket: 80\\nsubscriptions: 20",
+                "nothing to see here",
+                "subscriptions: 50",
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "suggestions": [SUPERMARKET, RULES.default, SUBSCRIPTIONS]
+    }
+
+
+def test_batch_of_summaries_matches_single_endpoint() -> None:
+    summaries = [
+        summary({"supermarket": 10.0, "subscriptions": 90.0}),
+        summary({}),
+        summary({"supermarket": 5}),
+    ]
+
+    response = client.post(
+        "/suggest-weekly-review/batch", json={"summaries": summaries}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["suggestions"] == [
+        client.post("/suggest-weekly-review", json={"summary": item}).json()[
+            "suggestion"
+        ]
+        for item in summaries
+    ]
+
+
+def test_batch_with_an_invalid_summary_is_rejected_whole() -> None:
+    response = client.post(
+        "/suggest-weekly-review/batch",
+        json={
+            "summaries": [
+                summary({"supermarket": 10.0}),
+                {"version": 99, "categories": {}},
+                summary({"subscriptions": 5.0}),
+            ]
+        },
+    )
+
+    assert response.status_code == 422
+    assert "version" in response.json()["detail"]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {},
+        [],
+        {"inputs": "supermarket"},
+        {"inputs": ["supermarket", 3]},
+        {"summaries": {"version": 1, "categories": {}}},
+    ],
+)
+def test_batch_rejects_malformed_payloads(payload) -> None:
+    response = client.post("/suggest-weekly-review/batch", json=payload)
+
+    assert response.status_code == 422
+
+
+def test_batch_accepts_the_size_limit() -> None:
+    response = client.post(
+        "/suggest-weekly-review/batch",
+        json={"inputs": ["fun: 1"] * MAX_BATCH_INPUTS},
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["suggestions"]) == MAX_BATCH_INPUTS
+
+
+@pytest.mark.parametrize("field", ["inputs", "summaries"])
+def test_batch_over_the_size_limit_is_rejected(field) -> None:
+    item = "fun: 1" if field == "inputs" else summary({"fun": 1})
+    response = client.post(
+        "/suggest-weekly-review/batch",
+        json={field: [item] * (MAX_BATCH_INPUTS + 1)},
+    )
+
+    assert response.status_code == 413
+    assert str(MAX_BATCH_INPUTS) in response.json()["detail"]
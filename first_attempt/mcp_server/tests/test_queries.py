@@ -0,0 +1,208 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+import re
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("psycopg_pool")
+
+from app import queries  # noqa: E402
+
+PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+
+class FakeConnection:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.executed: list[tuple[str, dict]] = []
+
+    async def execute(self, sql: str, params: dict):
+        self.executed.append((sql, params))
+        rows = self.rows
+
+        class Cursor:
+            async def fetchall(self) -> list[dict]:
+                return rows
+
+        return Cursor()
+
+
+class FakePool:
+    def __init__(self, rows: list[dict]) -> None:
+        self.conn = FakeConnection(rows)
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool([])
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(queries, "get_pool", get_pool)
+    return pool
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        queries.WEEKLY_SUMMARY_SQL,
+        queries.HABIT_ADHERENCE_SQL,
+        queries.SEARCH_TRANSACTIONS_SQL,
+    ],
+)
+def test_queries_only_use_named_placeholders(sql: str) -> None:
+    # psycopg treats any other `%` as a placeholder; literal ones are doubled.
+    assert "%" not in PLACEHOLDER.sub("", sql).replace("%%", "")
+
+
+def test_adherence_reads_occurrences_up_to_each_habit_horizon() -> None:
+    sql = queries.HABIT_ADHERENCE_SQL
+
+    assert "FROM habit_occurrences" in sql
+    assert "o.due_date <= h.occurrences_through" in sql
+    assert "c.day > c.occurrences_through" in sql
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [
+        (date(2024, 1, 8), date(2024, 1, 7)),
+        (date(2024, 1, 1), date(2025, 1, 1)),
+    ],
+)
+def test_ranges_are_checked_before_querying(pool, start_date, end_date) -> None:
+    for query in (queries.weekly_summary, queries.habit_adherence):
+        with pytest.raises(ValueError):
+            asyncio.run(query(start_date, end_date))
+
+    assert pool.conn.executed == []
+
+
+def test_weekly_summary_formats_totals(pool) -> None:
+    pool.conn.rows = [
+        {
+            "category_key": "house",
+            "total_amount": Decimal("500"),
+            "transactions": 1,
+        },
+        {
+            "category_key": "fun",
+            "total_amount": Decimal("12.5"),
+            "transactions": 3,
+        },
+    ]
+
+    result = asyncio.run(
+        queries.weekly_summary(date(2024, 1, 1), date(2024, 12, 31))
+    )
+
+    sql, params = pool.conn.executed[0]
+    assert sql == queries.WEEKLY_SUMMARY_SQL
+    assert params == {"start_date": date(2024, 1, 1), "end_date": date(2024, 12, 31)}
+    assert set(PLACEHOLDER.findall(sql)) == set(params)
+    assert result == {
+        "start_date": "2024-01-01",
+        "end_date": "2024-12-31",
+        "total_amount": "512.50",
+        "by_category": [
+            {"category_key": "house", "total_amount": "500.00", "transactions": 1},
+            {"category_key": "fun", "total_amount": "12.50", "transactions": 3},
+        ],
+    }
+
+
+def test_weekly_summary_of_an_empty_range(pool) -> None:
+    result = asyncio.run(queries.weekly_summary(date(2024, 1, 1), date(2024, 1, 1)))
+
+    assert result["total_amount"] == "0.00"
+    assert result["by_category"] == []
+
+
+def test_habit_adherence_formats_rows(pool) -> None:
+    habit_id = uuid4()
+    pool.conn.rows = [{"id": habit_id, "name": "Read", "due": 3, "completed": 2}]
+
+    result = asyncio.run(queries.habit_adherence(date(2024, 1, 1), date(2024, 1, 7)))
+
+    sql, params = pool.conn.executed[0]
+    assert sql == queries.HABIT_ADHERENCE_SQL
+    assert set(PLACEHOLDER.findall(sql)) == set(params)
+    assert result == {
+        "start_date": "2024-01-01",
+        "end_date": "2024-01-07",
+        "habits": [
+            {
+                "id": str(habit_id),
+                "name": "Read",
+                "due": 3,
+                "completed": 2,
+                "adherence": 0.6667,
+            }
+        ],
+    }
+
+
+def test_search_transactions_builds_parameters(pool) -> None:
+    transaction_id = uuid4()
+    pool.conn.rows = [
+        {
+            "id": transaction_id,
+            "occurred_at": date(2024, 1, 3),
+            "amount": Decimal("4.2"),
+            "description": "100% juice",
+            "label": "Cafe",
+            "category_key": "fun",
+        }
+    ]
+
+    result = asyncio.run(queries.search_transactions("  100%_\\  ", limit=1000))
+
+    sql, params = pool.conn.executed[0]
+    assert sql == queries.SEARCH_TRANSACTIONS_SQL
+    assert set(PLACEHOLDER.findall(sql)) == set(params)
+    assert params == {
+        "pattern": "%100\\%\\_\\\\%",
+        "start_date": date.min,
+        "end_date": date.max,
+        "limit": queries.SEARCH_LIMIT_MAX,
+    }
+    assert result == [
+        {
+            "id": str(transaction_id),
+            "occurred_at": "2024-01-03",
+            "amount": "4.20",
+            "description": "100% juice",
+            "label": "Cafe",
+            "category_key": "fun",
+        }
+    ]
+
+
+@pytest.mark.parametrize("limit, expected", [(0, 1), (-5, 1), (20, 20)])
+def test_search_transactions_clamps_limit(pool, limit, expected) -> None:
+    asyncio.run(
+        queries.search_transactions(
+            "rent", date(2024, 1, 1), date(2024, 1, 31), limit=limit
+        )
+    )
+
+    _, params = pool.conn.executed[0]
+    assert params["limit"] == expected
+    assert params["start_date"] == date(2024, 1, 1)
+    assert params["end_date"] == date(2024, 1, 31)
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_search_transactions_rejects_blank_queries(pool, query) -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(queries.search_transactions(query))
+
+    assert pool.conn.executed == []
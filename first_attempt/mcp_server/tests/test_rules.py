@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from app.rules import DEFAULT_RULES_PATH, Rule, RuleEngine
+
+DEFAULT = "default"
+
+
+def engine(*rules: tuple[str, ...]) -> RuleEngine:
+    return RuleEngine(
+        [
+            Rule(name=keywords[0], keywords=keywords, suggestion=keywords[0])
+            for keywords in rules
+        ],
+        DEFAULT,
+    )
+
+
+def test_from_file_loads_the_rule_table() -> None:
+    data = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+
+    rules = RuleEngine.from_file()
+
+    assert rules.default == data["default"]
+    assert [rule.name for rule in rules.rules] == [
+        entry["name"] for entry in data["rules"]
+    ]
+    assert rules.suggest("groceries") == rules.rules[0].suggestion
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Grocery run", "grocery"),
+        ("GROCERIES: 10", "grocery"),
+        ("groceriesx", DEFAULT),
+        ("supergrocery", DEFAULT),
+        ("grocer", DEFAULT),
+        ("rent-free week", "house"),
+        ("", DEFAULT),
+    ],
+)
+def test_keywords_match_whole_words_case_insensitively(text, expected) -> None:
+    rules = engine(("grocery", "groceries"), ("house", "rent"))
+
+    assert rules.suggest(text) == expected
+
+
+def test_match_sums_amounts_per_rule() -> None:
+    rules = engine(("grocery", "groceries"), ("house", "rent"))
+
+    amounts = rules.match("grocery: 10\\ngroceries : 2.5\nrent: 700\nhouse")
+
+    assert amounts == {0: 12.5, 1: 700.0}
+
+
+def test_duplicate_keyword_belongs_to_the_first_rule() -> None:
+    rules = engine(("fun", "cinema"), ("outings", "cinema"))
+
+    assert rules.match("cinema: 5") == {0: 5.0}
+
+
+def test_largest_amount_share_wins_regardless_of_order() -> None:
+    rules = engine(("grocery",), ("house",), ("fun",))
+
+    assert rules.suggest("grocery: 20\nhouse: 500\nfun: 30") == "house"
+    assert rules.suggest("fun: 30\nhouse: 5\ngrocery: 20") == "fun"
+
+
+def test_negative_amounts_do_not_outrank_spending() -> None:
+    rules = engine(("refund",), ("fun",))
+
+    assert rules.suggest("refund: -500\nfun: 10") == "fun"
+
+
+def test_suggest_for_totals_ranks_by_share_of_all_spending() -> None:
+    rules = engine(("grocery",), ("house", "rent"))
+
+    assert rules.suggest_for_totals({"grocery": 40, "rent": 60}) == "house"
+    assert rules.suggest_for_totals({"GROCERY": 40, "unknown": 500}) == "grocery"
+    assert rules.suggest_for_totals({"unknown": 500}) == DEFAULT
+    assert rules.suggest_for_totals({}) == DEFAULT
+
+
+def test_ties_fall_back_to_table_order() -> None:
+    rules = engine(("grocery",), ("house",), ("fun",))
+
+    assert rules.suggest("fun: 10\nhouse: 10") == "house"
+    assert rules.suggest("fun\nhouse\ngrocery") == "grocery"
+    assert rules.suggest_for_totals({"fun": 0, "house": 0}) == "house"
+
+
+def test_empty_engine_returns_default() -> None:
+    rules = RuleEngine([], DEFAULT)
+
+    assert rules.match("grocery: 10") == {}
+    assert rules.suggest("grocery: 10") == DEFAULT
+
+
+def test_many_rules_with_shared_prefixes_match_like_a_lookup() -> None:
+    keywords = [(f"merchant{index}", f"merchant{index}x") for index in range(500)]
+    rules = engine(*keywords)
+    lookup = {
+        keyword: index
+        for index, pair in enumerate(keywords)
+        for keyword in pair
+    }
+    text = "\n".join(f"{keyword}: {len(keyword)}" for keyword in lookup)
+
+    amounts = rules.match(text)
+
+    assert amounts == {
+        index: float(len(first) + len(second))
+        for index, (first, second) in enumerate(keywords)
+    }
+    assert rules.suggest("merchant1: 5\nmerchant499x: 6\nmerchant49: 1") == (
+        "merchant499"
+    )
+    assert rules.suggest("merchant5000") == DEFAULT